@@ -0,0 +1,59 @@
+"""add_stock_reservations
+
+Revision ID: a4d7e2b95c30
+Revises: f3a6c0d82b19
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a4d7e2b95c30"
+down_revision: Union[str, None] = "f3a6c0d82b19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing orders were placed without holds, so every row starts with nothing reserved.
+    with op.batch_alter_table("inventory_levels", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("reserved_stock", sa.Integer(), server_default="0", nullable=False))
+
+    op.create_table(
+        "stock_reservations",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("order_id", sa.Integer(), nullable=False),
+        sa.Column("warehouse_id", sa.Integer(), nullable=False),
+        sa.Column("sku_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("closed_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["order_id"], ["customer_orders.id"]),
+        sa.ForeignKeyConstraint(["sku_id"], ["skus.id"]),
+        sa.ForeignKeyConstraint(["warehouse_id"], ["warehouses.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_stock_reservations_id"), "stock_reservations", ["id"], unique=False)
+    op.create_index(op.f("ix_stock_reservations_order_id"), "stock_reservations", ["order_id"], unique=False)
+    op.create_index(
+        "ix_stock_reservations_status_expires",
+        "stock_reservations",
+        ["status", "expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stock_reservations_status_expires", table_name="stock_reservations")
+    op.drop_index(op.f("ix_stock_reservations_order_id"), table_name="stock_reservations")
+    op.drop_index(op.f("ix_stock_reservations_id"), table_name="stock_reservations")
+    op.drop_table("stock_reservations")
+
+    with op.batch_alter_table("inventory_levels", schema=None) as batch_op:
+        batch_op.drop_column("reserved_stock")
@@ -0,0 +1,56 @@
+"""add_log_archive_partitions
+
+Revision ID: a7c3e5b19d42
+Revises: e2f8a9d41c6b
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7c3e5b19d42"
+down_revision: Union[str, None] = "e2f8a9d41c6b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "log_archive_partitions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("entity", sa.String(), nullable=False),
+        sa.Column("partition_date", sa.Date(), nullable=False),
+        sa.Column("file_path", sa.String(), nullable=False),
+        sa.Column("row_count", sa.Integer(), nullable=False),
+        sa.Column("min_row_id", sa.Integer(), nullable=True),
+        sa.Column("max_row_id", sa.Integer(), nullable=True),
+        sa.Column("size_bytes", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("entity", "partition_date", name="uq_log_archive_partitions_entity_date"),
+    )
+
+    with op.batch_alter_table("log_archive_partitions", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_log_archive_partitions_id"), ["id"], unique=False)
+        batch_op.create_index(batch_op.f("ix_log_archive_partitions_entity"), ["entity"], unique=False)
+        batch_op.create_index(batch_op.f("ix_log_archive_partitions_partition_date"), ["partition_date"], unique=False)
+
+    with op.batch_alter_table("ingestion_runs", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_ingestion_runs_started_at"), ["started_at"], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("ingestion_runs", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_ingestion_runs_started_at"))
+
+    with op.batch_alter_table("log_archive_partitions", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_log_archive_partitions_partition_date"))
+        batch_op.drop_index(batch_op.f("ix_log_archive_partitions_entity"))
+        batch_op.drop_index(batch_op.f("ix_log_archive_partitions_id"))
+
+    op.drop_table("log_archive_partitions")
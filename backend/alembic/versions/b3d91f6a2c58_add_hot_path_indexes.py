@@ -0,0 +1,116 @@
+"""add_hot_path_indexes
+
+Revision ID: b3d91f6a2c58
+Revises: a7c3e5b19d42
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b3d91f6a2c58"
+down_revision: Union[str, None] = "a7c3e5b19d42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Every service resolves stock by (warehouse_id, sku_id) and expects at most one row.
+    duplicates = op.get_bind().execute(
+        sa.text(
+            "SELECT warehouse_id, sku_id FROM inventory_levels"
+            " GROUP BY warehouse_id, sku_id HAVING COUNT(*) > 1 LIMIT 5"
+        )
+    ).fetchall()
+    if duplicates:
+        raise RuntimeError(
+            "inventory_levels has duplicate (warehouse_id, sku_id) rows; merge them before upgrading: "
+            + ", ".join(f"({row[0]}, {row[1]})" for row in duplicates)
+        )
+
+    with op.batch_alter_table("inventory_levels", schema=None) as batch_op:
+        batch_op.create_index("uq_inventory_levels_warehouse_sku", ["warehouse_id", "sku_id"], unique=True)
+        batch_op.create_index("ix_inventory_levels_sku_id", ["sku_id"], unique=False)
+        batch_op.create_index(batch_op.f("ix_inventory_levels_days_of_cover"), ["days_of_cover"], unique=False)
+
+    with op.batch_alter_table("sales_history", schema=None) as batch_op:
+        batch_op.create_index("ix_sales_history_sku_region_date", ["sku_id", "region_id", "date"], unique=False)
+        batch_op.create_index(batch_op.f("ix_sales_history_date"), ["date"], unique=False)
+
+    with op.batch_alter_table("dealer_orders", schema=None) as batch_op:
+        batch_op.create_index("ix_dealer_orders_dealer_status_date", ["dealer_id", "status", "order_date"], unique=False)
+        batch_op.create_index("ix_dealer_orders_dealer_date", ["dealer_id", "order_date"], unique=False)
+
+    with op.batch_alter_table("customer_orders", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_customer_orders_dealer_status_created", ["dealer_id", "status", "created_at"], unique=False
+        )
+        batch_op.create_index("ix_customer_orders_user_created", ["user_id", "created_at"], unique=False)
+
+    with op.batch_alter_table("customer_order_items", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_customer_order_items_order_id"), ["order_id"], unique=False)
+
+    with op.batch_alter_table("customer_order_requests", schema=None) as batch_op:
+        batch_op.create_index("ix_customer_order_requests_dealer_created", ["dealer_id", "created_at"], unique=False)
+
+    with op.batch_alter_table("skus", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_skus_shade_id"), ["shade_id"], unique=False)
+
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_users_dealer_id"), ["dealer_id"], unique=False)
+
+    with op.batch_alter_table("cart", schema=None) as batch_op:
+        batch_op.create_index("ix_cart_user_sku", ["user_id", "sku_id"], unique=False)
+
+    with op.batch_alter_table("wishlist", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_wishlist_user_id"), ["user_id"], unique=False)
+
+    # The composite index serves every user_id lookup, so the single-column one is redundant.
+    with op.batch_alter_table("notifications", schema=None) as batch_op:
+        batch_op.create_index("ix_notifications_user_read_created", ["user_id", "is_read", "created_at"], unique=False)
+        batch_op.drop_index(batch_op.f("ix_notifications_user_id"))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("notifications", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_notifications_user_id"), ["user_id"], unique=False)
+        batch_op.drop_index("ix_notifications_user_read_created")
+
+    with op.batch_alter_table("wishlist", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_wishlist_user_id"))
+
+    with op.batch_alter_table("cart", schema=None) as batch_op:
+        batch_op.drop_index("ix_cart_user_sku")
+
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_users_dealer_id"))
+
+    with op.batch_alter_table("skus", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_skus_shade_id"))
+
+    with op.batch_alter_table("customer_order_requests", schema=None) as batch_op:
+        batch_op.drop_index("ix_customer_order_requests_dealer_created")
+
+    with op.batch_alter_table("customer_order_items", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_customer_order_items_order_id"))
+
+    with op.batch_alter_table("customer_orders", schema=None) as batch_op:
+        batch_op.drop_index("ix_customer_orders_user_created")
+        batch_op.drop_index("ix_customer_orders_dealer_status_created")
+
+    with op.batch_alter_table("dealer_orders", schema=None) as batch_op:
+        batch_op.drop_index("ix_dealer_orders_dealer_date")
+        batch_op.drop_index("ix_dealer_orders_dealer_status_date")
+
+    with op.batch_alter_table("sales_history", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_sales_history_date"))
+        batch_op.drop_index("ix_sales_history_sku_region_date")
+
+    with op.batch_alter_table("inventory_levels", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_inventory_levels_days_of_cover"))
+        batch_op.drop_index("ix_inventory_levels_sku_id")
+        batch_op.drop_index("uq_inventory_levels_warehouse_sku")
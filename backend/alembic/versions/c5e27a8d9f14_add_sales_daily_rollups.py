@@ -0,0 +1,79 @@
+"""add_sales_daily_rollups
+
+Revision ID: c5e27a8d9f14
+Revises: b3d91f6a2c58
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c5e27a8d9f14"
+down_revision: Union[str, None] = "b3d91f6a2c58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sales_daily_region",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("region_id", sa.Integer(), nullable=False),
+        sa.Column("quantity_sold", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["region_id"], ["regions.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("date", "region_id", name="uq_sales_daily_region_date_region"),
+    )
+    op.create_table(
+        "sales_daily_category",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.Column("quantity_sold", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("date", "category", name="uq_sales_daily_category_date_category"),
+    )
+    op.create_table(
+        "sales_daily_sku",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("sku_id", sa.Integer(), nullable=False),
+        sa.Column("quantity_sold", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["sku_id"], ["skus.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("date", "sku_id", name="uq_sales_daily_sku_date_sku"),
+    )
+
+    # Backfill from the existing raw rows; from here on writers maintain the rollups incrementally.
+    op.execute(
+        "INSERT INTO sales_daily_region (date, region_id, quantity_sold, revenue)"
+        " SELECT date, region_id, SUM(quantity_sold), SUM(revenue) FROM sales_history"
+        " GROUP BY date, region_id"
+    )
+    op.execute(
+        "INSERT INTO sales_daily_category (date, category, quantity_sold, revenue)"
+        " SELECT sh.date, p.category, SUM(sh.quantity_sold), SUM(sh.revenue) FROM sales_history sh"
+        " JOIN skus s ON s.id = sh.sku_id"
+        " JOIN shades sd ON sd.id = s.shade_id"
+        " JOIN products p ON p.id = sd.product_id"
+        " GROUP BY sh.date, p.category"
+    )
+    op.execute(
+        "INSERT INTO sales_daily_sku (date, sku_id, quantity_sold, revenue)"
+        " SELECT date, sku_id, SUM(quantity_sold), SUM(revenue) FROM sales_history"
+        " GROUP BY date, sku_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("sales_daily_sku")
+    op.drop_table("sales_daily_category")
+    op.drop_table("sales_daily_region")
@@ -0,0 +1,52 @@
+"""add_dealer_health_scores
+
+Revision ID: d8f4a2c61e37
+Revises: c5e27a8d9f14
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d8f4a2c61e37"
+down_revision: Union[str, None] = "c5e27a8d9f14"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows are backfilled by the application on first start (dealer_health_service.ensure_dealer_health).
+    op.create_table(
+        "dealer_health_scores",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("dealer_id", sa.Integer(), nullable=False),
+        sa.Column("period", sa.String(), nullable=False),
+        sa.Column("health_score", sa.Float(), nullable=False),
+        sa.Column("total_orders", sa.Integer(), nullable=False),
+        sa.Column("delivered_orders", sa.Integer(), nullable=False),
+        sa.Column("unique_skus", sa.Integer(), nullable=False),
+        sa.Column("delivered_revenue", sa.Float(), nullable=False),
+        sa.Column("inventory_levels", sa.Integer(), nullable=False),
+        sa.Column("avg_days_of_cover", sa.Float(), nullable=True),
+        sa.Column("stockout_count", sa.Integer(), nullable=False),
+        sa.Column("low_cover_count", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["dealer_id"], ["dealers.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("dealer_id", "period", name="uq_dealer_health_scores_dealer_period"),
+    )
+    op.create_index(op.f("ix_dealer_health_scores_id"), "dealer_health_scores", ["id"], unique=False)
+    op.create_index(
+        "ix_dealer_health_scores_period_score", "dealer_health_scores", ["period", "health_score"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_dealer_health_scores_period_score", table_name="dealer_health_scores")
+    op.drop_index(op.f("ix_dealer_health_scores_id"), table_name="dealer_health_scores")
+    op.drop_table("dealer_health_scores")
@@ -0,0 +1,63 @@
+"""add_smart_order_recommendations
+
+Revision ID: e91b7c4d2a05
+Revises: d8f4a2c61e37
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e91b7c4d2a05"
+down_revision: Union[str, None] = "d8f4a2c61e37"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled by the application on first start (smart_order_service.ensure_smart_orders).
+    op.create_table(
+        "smart_order_recommendations",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("dealer_id", sa.Integer(), nullable=False),
+        sa.Column("sku_id", sa.Integer(), nullable=False),
+        sa.Column("rank", sa.Integer(), nullable=False),
+        sa.Column("sku_code", sa.String(), nullable=False),
+        sa.Column("shade_name", sa.String(), nullable=False),
+        sa.Column("shade_hex", sa.String(), nullable=False),
+        sa.Column("shade_family", sa.String(), nullable=False),
+        sa.Column("size", sa.String(), nullable=False),
+        sa.Column("current_stock", sa.Integer(), nullable=False),
+        sa.Column("days_of_cover", sa.Float(), nullable=False),
+        sa.Column("predicted_demand", sa.Float(), nullable=False),
+        sa.Column("recommended_qty", sa.Integer(), nullable=False),
+        sa.Column("urgency", sa.String(), nullable=False),
+        sa.Column("reason", sa.String(), nullable=False),
+        sa.Column("predicted_stockout_date", sa.Date(), nullable=False),
+        sa.Column("savings_amount", sa.Float(), nullable=False),
+        sa.Column("mrp_per_unit", sa.Float(), nullable=False),
+        sa.Column("total_cost", sa.Float(), nullable=False),
+        sa.Column("generated_for", sa.Date(), nullable=False),
+        sa.Column("generated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["dealer_id"], ["dealers.id"]),
+        sa.ForeignKeyConstraint(["sku_id"], ["skus.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("dealer_id", "sku_id", name="uq_smart_order_recommendations_dealer_sku"),
+    )
+    op.create_index(op.f("ix_smart_order_recommendations_id"), "smart_order_recommendations", ["id"], unique=False)
+    op.create_index(
+        "ix_smart_order_recommendations_dealer_rank",
+        "smart_order_recommendations",
+        ["dealer_id", "rank"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_smart_order_recommendations_dealer_rank", table_name="smart_order_recommendations")
+    op.drop_index(op.f("ix_smart_order_recommendations_id"), table_name="smart_order_recommendations")
+    op.drop_table("smart_order_recommendations")
@@ -0,0 +1,45 @@
+"""unique_cart_user_sku
+
+Revision ID: f3a6c0d82b19
+Revises: e91b7c4d2a05
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a6c0d82b19"
+down_revision: Union[str, None] = "e91b7c4d2a05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Cart writes upsert on (user_id, sku_id). Rows left behind by concurrent adds are merged
+    # into the oldest row for the pair, keeping the total quantity.
+    bind = op.get_bind()
+    bind.execute(
+        sa.text(
+            "UPDATE cart SET quantity = ("
+            " SELECT SUM(other.quantity) FROM cart AS other"
+            " WHERE other.user_id = cart.user_id AND other.sku_id = cart.sku_id"
+            ") WHERE id IN (SELECT MIN(id) FROM cart GROUP BY user_id, sku_id HAVING COUNT(*) > 1)"
+        )
+    )
+    bind.execute(
+        sa.text("DELETE FROM cart WHERE id NOT IN (SELECT MIN(id) FROM cart GROUP BY user_id, sku_id)")
+    )
+
+    with op.batch_alter_table("cart", schema=None) as batch_op:
+        batch_op.drop_index("ix_cart_user_sku")
+        batch_op.create_index("ix_cart_user_sku", ["user_id", "sku_id"], unique=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("cart", schema=None) as batch_op:
+        batch_op.drop_index("ix_cart_user_sku")
+        batch_op.create_index("ix_cart_user_sku", ["user_id", "sku_id"], unique=False)
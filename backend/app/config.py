@@ -9,6 +9,12 @@ def _as_bool(value: str | None, default: bool) -> bool:
     return value.strip().lower() in {"1", "true", "yes", "on"}
 
 
+def _as_optional_int(value: str | None) -> int | None:
+    if value is None or not value.strip():
+        return None
+    return int(value)
+
+
 def _as_csv(value: str | None) -> list[str]:
     if not value:
         return []
@@ -29,7 +35,99 @@ INGEST_ERROR_DIR = Path(os.getenv("INGEST_ERROR_DIR", str(BASE_DIR / "app" / "in
 INGEST_ENABLED = _as_bool(os.getenv("INGEST_ENABLED"), True)
 INGEST_POLL_SECONDS = int(os.getenv("INGEST_POLL_SECONDS", "3600"))
 
+# Retention: roll old audit/ingestion log rows into gzip NDJSON day partitions.
+RETENTION_ENABLED = _as_bool(os.getenv("RETENTION_ENABLED"), True)
+RETENTION_POLL_SECONDS = int(os.getenv("RETENTION_POLL_SECONDS", "86400"))
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "1000"))
+RETENTION_ARCHIVE_DIR = Path(os.getenv("RETENTION_ARCHIVE_DIR", str(BASE_DIR / "app" / "retention" / "archive")))
+AUDIT_LOG_RETENTION_DAYS = int(os.getenv("AUDIT_LOG_RETENTION_DAYS", "90"))
+INGESTION_RUN_RETENTION_DAYS = int(os.getenv("INGESTION_RUN_RETENTION_DAYS", "180"))
+
+# Smart-order batch: recommendations for every dealer are rebuilt nightly at this UTC hour.
+SMART_ORDER_REFRESH_ENABLED = _as_bool(os.getenv("SMART_ORDER_REFRESH_ENABLED"), True)
+SMART_ORDER_REFRESH_HOUR_UTC = int(os.getenv("SMART_ORDER_REFRESH_HOUR_UTC", "2"))
+
+# Stock reservations: checkout holds dealer-warehouse stock for RESERVATION_TTL_HOURS; the sweeper
+# releases expired holds every RESERVATION_SWEEP_SECONDS.
+RESERVATION_TTL_HOURS = int(os.getenv("RESERVATION_TTL_HOURS", "72"))
+RESERVATION_SWEEP_ENABLED = _as_bool(os.getenv("RESERVATION_SWEEP_ENABLED"), True)
+RESERVATION_SWEEP_SECONDS = int(os.getenv("RESERVATION_SWEEP_SECONDS", "300"))
+
+# Columnar mirror of sales_history (month-partitioned NumPy files, memory-mapped) used for
+# cross-dimension revenue queries the daily rollups cannot answer. A background task
+# re-exports changed months every ANALYTICS_COLUMNAR_CHECK_SECONDS.
+ANALYTICS_COLUMNAR_ENABLED = _as_bool(os.getenv("ANALYTICS_COLUMNAR_ENABLED"), True)
+ANALYTICS_COLUMNAR_DIR = Path(os.getenv("ANALYTICS_COLUMNAR_DIR", str(BASE_DIR / "app" / "analytics_store")))
+ANALYTICS_COLUMNAR_CHECK_SECONDS = float(os.getenv("ANALYTICS_COLUMNAR_CHECK_SECONDS", "60"))
+
+# Response cache for admin dashboard/analytics reads. Entries are fresh for their endpoint
+# TTL, then served stale (while one background refresh runs) for RESPONSE_CACHE_STALE_SECONDS.
+# Commits that write a table an entry depends on invalidate it immediately. An empty
+# RESPONSE_CACHE_URL keeps the cache in-process; redis://... shares it across workers.
+RESPONSE_CACHE_ENABLED = _as_bool(os.getenv("RESPONSE_CACHE_ENABLED"), True)
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "").strip()
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+RESPONSE_CACHE_STALE_SECONDS = float(os.getenv("RESPONSE_CACHE_STALE_SECONDS", "120"))
+DASHBOARD_CACHE_TTL_SECONDS = float(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", "30"))
+ANALYTICS_CACHE_TTL_SECONDS = float(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "300"))
+# ETags (conditional GETs) come from the same per-table write counters, so they are only sent
+# when every worker shares them (RESPONSE_CACHE_URL=redis://... or WEB_CONCURRENCY=1). An ETag
+# also rolls over every ETAG_MAX_AGE_SECONDS, bounding staleness from writes the counters miss.
+ETAG_MAX_AGE_SECONDS = max(1.0, float(os.getenv("ETAG_MAX_AGE_SECONDS", "300")))
+
+# When set, each worker process mirrors its metrics into a memory-mapped segment in this
+# directory and /api/metrics merges every segment, so `uvicorn --workers N` reports totals.
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "").strip()
+
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{DB_PATH}")
+# Connection pool sizing. Each worker process owns its own pool, so the deployment-wide
+# DB_MAX_CONNECTIONS budget is split across WEB_CONCURRENCY workers, and a worker never
+# holds more connections than it has threadpool threads to use them.
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+APP_THREADPOOL_SIZE = max(1, int(os.getenv("APP_THREADPOOL_SIZE", "40")))
+DB_MAX_CONNECTIONS = max(2, int(os.getenv("DB_MAX_CONNECTIONS", "80")))
+DB_POOL_SIZE = _as_optional_int(os.getenv("DB_POOL_SIZE"))
+DB_MAX_OVERFLOW = _as_optional_int(os.getenv("DB_MAX_OVERFLOW"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+DB_POOL_PRE_PING = _as_bool(os.getenv("DB_POOL_PRE_PING"), True)
+# Async engine used by the I/O-bound endpoints. Derived from DATABASE_URL (sqlite -> aiosqlite,
+# postgresql -> psycopg async) unless overridden. Its pool is separate from the sync pool above,
+# so keep DB_MAX_CONNECTIONS below the server limit minus WEB_CONCURRENCY * async pool capacity.
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "").strip()
+DB_ASYNC_POOL_SIZE = max(1, int(os.getenv("DB_ASYNC_POOL_SIZE", "5")))
+DB_ASYNC_MAX_OVERFLOW = max(0, int(os.getenv("DB_ASYNC_MAX_OVERFLOW", "5")))
+# Server-side statement timeout (Postgres only); 0 disables it.
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+
+# SQLite tuning for single-node deployments (ignored for other databases).
+SQLITE_WAL = _as_bool(os.getenv("SQLITE_WAL"), True)
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE_BYTES = int(os.getenv("SQLITE_MMAP_SIZE_BYTES", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_SERIALIZE_WRITES = _as_bool(os.getenv("SQLITE_SERIALIZE_WRITES"), True)
+
+# Optional read replicas for analytics/dashboard reads. Replicas lagging more than
+# DB_REPLICA_MAX_LAG_SECONDS (or failing health checks) are skipped in favour of the primary.
+DATABASE_REPLICA_URLS = _as_csv(os.getenv("DATABASE_REPLICA_URLS"))
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+DB_REPLICA_CHECK_SECONDS = float(os.getenv("DB_REPLICA_CHECK_SECONDS", "10"))
+# Health checks run in a background task (never on a request); a replica that does not accept
+# a connection or answer the lag query within this many seconds is marked unhealthy.
+DB_REPLICA_CONNECT_TIMEOUT_SECONDS = max(1, int(os.getenv("DB_REPLICA_CONNECT_TIMEOUT_SECONDS", "2")))
+# Per-worker pool for each replica (sync and async engines each own one), sized apart from the
+# primary so replicas can be budgeted against their own max_connections.
+DB_REPLICA_POOL_SIZE = max(1, int(os.getenv("DB_REPLICA_POOL_SIZE", "5")))
+DB_REPLICA_MAX_OVERFLOW = max(0, int(os.getenv("DB_REPLICA_MAX_OVERFLOW", "5")))
+
+# Responses at least COMPRESSION_MIN_SIZE bytes are compressed (Brotli if the optional
+# `brotli` package is installed and the client accepts it, else gzip).
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+# Statements slower than this are logged (with parameter shapes, never values) by app.database.
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
 AUTO_CREATE_TABLES = _as_bool(os.getenv("AUTO_CREATE_TABLES"), not IS_PRODUCTION)
 
 _cors_env = _as_csv(os.getenv("CORS_ALLOWED_ORIGINS"))
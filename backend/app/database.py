@@ -1,17 +1,268 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
-from app.config import DATABASE_URL
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
 
-
-engine = create_engine(
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.config import (
+    APP_THREADPOOL_SIZE,
+    ASYNC_DATABASE_URL,
+    DATABASE_REPLICA_URLS,
     DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
-    echo=False,
+    DB_ASYNC_MAX_OVERFLOW,
+    DB_ASYNC_POOL_SIZE,
+    DB_MAX_CONNECTIONS,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE_SECONDS,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT_SECONDS,
+    DB_REPLICA_CHECK_SECONDS,
+    DB_REPLICA_CONNECT_TIMEOUT_SECONDS,
+    DB_REPLICA_MAX_LAG_SECONDS,
+    DB_REPLICA_MAX_OVERFLOW,
+    DB_REPLICA_POOL_SIZE,
+    DB_SLOW_QUERY_MS,
+    DB_STATEMENT_TIMEOUT_MS,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_MMAP_SIZE_BYTES,
+    SQLITE_SERIALIZE_WRITES,
+    SQLITE_WAL,
+    WEB_CONCURRENCY,
 )
 
+
+logger = logging.getLogger("paintflow.db")
+
+# Pool metric sinks. The services layer registers them (observability_service does on import)
+# so this module never imports upward.
+_pool_checkout_listeners: list = []
+_pool_usage_listeners: list = []
+
+
+def add_pool_listeners(on_checkout, on_usage) -> None:
+    """Register on_checkout(wait_ms, timed_out=...) and on_usage(checked_out, capacity, pool_name=...)."""
+    if on_checkout not in _pool_checkout_listeners:
+        _pool_checkout_listeners.append(on_checkout)
+    if on_usage not in _pool_usage_listeners:
+        _pool_usage_listeners.append(on_usage)
+
+
+class _PoolInstrumentation:
+    """Reports checkout wait, timeouts and how many connections are in use, keyed by the pool's logging name."""
+
+    def _report_checkout(self, started: float, timed_out: bool = False) -> None:
+        wait_ms = (time.perf_counter() - started) * 1000
+        for listener in _pool_checkout_listeners:
+            listener(wait_ms, timed_out=timed_out)
+
+    def _report_usage(self) -> None:
+        for listener in _pool_usage_listeners:
+            listener(
+                self.checkedout(),
+                self.size() + max(0, self._max_overflow),
+                pool_name=self._orig_logging_name or "primary",
+            )
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except exc.TimeoutError:
+            self._report_checkout(started, timed_out=True)
+            raise
+        self._report_checkout(started)
+        self._report_usage()
+        return entry
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._report_usage()
+
+
+class InstrumentedQueuePool(_PoolInstrumentation, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_PoolInstrumentation, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_settings(asynchronous: bool = False, replica: bool = False) -> dict:
+    """Derive per-worker pool sizing from the deployment-wide connection budget."""
+    if replica:
+        # Replicas have their own connection limit; the primary's budget says nothing about it.
+        return {
+            "pool_size": DB_REPLICA_POOL_SIZE,
+            "max_overflow": DB_REPLICA_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT_SECONDS,
+            "pool_recycle": DB_POOL_RECYCLE_SECONDS,
+        }
+    if asynchronous:
+        # Async sessions are not tied to threadpool threads, so the async pool is sized explicitly.
+        return {
+            "pool_size": DB_ASYNC_POOL_SIZE,
+            "max_overflow": DB_ASYNC_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT_SECONDS,
+            "pool_recycle": DB_POOL_RECYCLE_SECONDS,
+        }
+    per_worker_budget = max(2, DB_MAX_CONNECTIONS // WEB_CONCURRENCY)
+    ceiling = min(per_worker_budget, APP_THREADPOOL_SIZE)
+    pool_size = DB_POOL_SIZE if DB_POOL_SIZE is not None else min(ceiling, max(5, APP_THREADPOOL_SIZE // 4))
+    max_overflow = DB_MAX_OVERFLOW if DB_MAX_OVERFLOW is not None else max(0, ceiling - pool_size)
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": DB_POOL_RECYCLE_SECONDS,
+    }
+
+
+def build_engine_options(
+    database_url: str, pool_name: str = "primary", asynchronous: bool = False, replica: bool = False
+) -> dict:
+    url = make_url(database_url)
+    poolclass = InstrumentedAsyncQueuePool if asynchronous else InstrumentedQueuePool
+    if url.get_backend_name() == "sqlite":
+        options = {"connect_args": {"check_same_thread": False}, "echo": False}
+        if url.database and url.database != ":memory:":
+            options.update(poolclass=poolclass, pool_logging_name=pool_name, **pool_settings(asynchronous, replica))
+        return options
+
+    connect_args = {"application_name": "paintflow-api"}
+    if url.get_backend_name() == "postgresql":
+        if DB_STATEMENT_TIMEOUT_MS > 0:
+            connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+        if replica:
+            connect_args["connect_timeout"] = DB_REPLICA_CONNECT_TIMEOUT_SECONDS
+    return {
+        "connect_args": connect_args,
+        "echo": False,
+        "poolclass": poolclass,
+        "pool_logging_name": pool_name,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        **pool_settings(asynchronous, replica),
+    }
+
+
+def async_database_url(database_url: str) -> str:
+    """Swap the sync driver for its asyncio counterpart (aiosqlite / psycopg async)."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    elif backend == "postgresql":
+        url = url.set(drivername="postgresql+psycopg")
+    return url.render_as_string(hide_password=False)
+
+
+def _is_sqlite_file(target: Engine) -> bool:
+    return target.dialect.name == "sqlite" and target.url.database not in (None, "", ":memory:")
+
+
+engine = create_engine(DATABASE_URL, **build_engine_options(DATABASE_URL))
+IS_SQLITE = engine.dialect.name == "sqlite"
+IS_SQLITE_FILE = _is_sqlite_file(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+# ─── SQLite: WAL pragmas and a single writer queue ───
+
+def apply_sqlite_pragmas(dbapi_connection) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        if SQLITE_WAL:
+            # WAL lets readers proceed while one writer appends; NORMAL sync is durable across app crashes.
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA mmap_size={int(SQLITE_MMAP_SIZE_BYTES)}")
+        cursor.execute(f"PRAGMA cache_size={-int(SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+def _on_sqlite_connect(dbapi_connection, connection_record):
+    apply_sqlite_pragmas(dbapi_connection)
+
+
+if IS_SQLITE_FILE:
+    event.listen(engine, "connect", _on_sqlite_connect)
+
+
+class WriterQueue:
+    """FIFO ticket lock: writers take turns in arrival order instead of racing for SQLite's write lock.
+
+    A waiter that gives up after the timeout abandons its ticket and falls back to SQLite's own
+    busy handling, so two sessions writing from the same thread can never deadlock here.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._next_ticket = 0
+        self._serving = 0
+        self._abandoned: set[int] = set()
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            if self._cond.wait_for(lambda: self._serving == ticket, timeout):
+                return True
+            self._abandoned.add(ticket)
+            return False
+
+    def release(self) -> None:
+        with self._cond:
+            self._serving += 1
+            while self._serving in self._abandoned:
+                self._abandoned.discard(self._serving)
+                self._serving += 1
+            self._cond.notify_all()
+
+    def pending(self) -> int:
+        with self._cond:
+            return self._next_ticket - self._serving - len(self._abandoned)
+
+
+sqlite_writer_queue = WriterQueue()
+_WRITER_TURN_KEY = "sqlite_writer_turn"
+
+
+def _take_writer_turn(session) -> None:
+    if session.info.get(_WRITER_TURN_KEY):
+        return
+    if sqlite_writer_queue.acquire(timeout=SQLITE_BUSY_TIMEOUT_MS / 1000):
+        session.info[_WRITER_TURN_KEY] = True
+    else:
+        logger.warning("SQLite writer queue wait exceeded %sms; relying on busy_timeout", SQLITE_BUSY_TIMEOUT_MS)
+
+
+if IS_SQLITE_FILE and SQLITE_SERIALIZE_WRITES:
+    @event.listens_for(SessionLocal, "before_flush")
+    def _queue_flush_writer(session, flush_context, instances):
+        _take_writer_turn(session)
+
+    @event.listens_for(SessionLocal, "do_orm_execute")
+    def _queue_dml_writer(orm_execute_state):
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            _take_writer_turn(orm_execute_state.session)
+
+    @event.listens_for(SessionLocal, "after_transaction_end")
+    def _release_writer_turn(session, transaction):
+        if transaction.parent is None and session.info.pop(_WRITER_TURN_KEY, False):
+            sqlite_writer_queue.release()
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -22,3 +273,288 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def dialect_insert(db: Session):
+    """The dialect's INSERT construct (Postgres or SQLite), which supports ON CONFLICT upserts."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+# ─── Async engine for I/O-bound endpoints ───
+# Handlers declared `async def` must never touch SessionLocal: a blocking query there stalls the
+# event loop for every in-flight request. They use these sessions instead, either with native
+# `await db.execute(select(...))` or `await db.run_sync(sync_service_fn, ...)` to reuse services.
+# Async writers are not routed through the SQLite writer queue (waiting on it would block the
+# loop); they rely on busy_timeout, which the connect pragmas set on this engine as well.
+
+_async_url = ASYNC_DATABASE_URL or async_database_url(DATABASE_URL)
+async_engine = create_async_engine(_async_url, **build_engine_options(_async_url, pool_name="async", asynchronous=True))
+if _is_sqlite_file(async_engine.sync_engine):
+    event.listen(async_engine.sync_engine, "connect", _on_sqlite_connect)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# ─── Read replica routing ───
+
+_PG_REPLICA_LAG_SQL = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+
+class Replica:
+    def __init__(self, url: str, engine, async_engine=None):
+        self.url = url
+        self.engine = engine
+        self.async_engine = async_engine
+        self.healthy = False
+        self.lag_seconds: float | None = None
+        self.error: str | None = None
+        self.checked_at = 0.0
+
+
+class ReplicaRouter:
+    """Round-robin over replicas whose health check passed and whose lag is within tolerance.
+
+    Choosing never does I/O: refresh() probes the replicas, off the request path, from
+    replica_health_loop. Until a replica's first check passes, reads go to the primary.
+    """
+
+    def __init__(self, replicas: list[Replica], max_lag_seconds: float, check_seconds: float):
+        self.replicas = replicas
+        self.max_lag_seconds = max_lag_seconds
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._cursor = 0
+
+    def _probe(self, replica: Replica) -> tuple[bool, float | None, str | None]:
+        """Connect and measure lag. Runs without the lock held, so a hung replica stalls only the checker."""
+        try:
+            with replica.engine.connect() as conn:
+                if replica.engine.dialect.name == "postgresql":
+                    with conn.begin():
+                        conn.execute(text(f"SET LOCAL statement_timeout = {DB_REPLICA_CONNECT_TIMEOUT_SECONDS * 1000}"))
+                        lag = float(conn.execute(_PG_REPLICA_LAG_SQL).scalar() or 0)
+                else:
+                    conn.execute(text("SELECT 1"))
+                    lag = 0.0
+        except Exception as exc_info:
+            return False, None, str(exc_info)
+        if lag > self.max_lag_seconds:
+            return False, lag, f"lag {lag:.1f}s exceeds {self.max_lag_seconds}s"
+        return True, lag, None
+
+    def refresh(self, force: bool = False) -> None:
+        """Re-check every replica whose last check is older than check_seconds."""
+        now = time.monotonic()
+        with self._lock:
+            stale = [r for r in self.replicas if force or now - r.checked_at >= self.check_seconds]
+        for replica in stale:
+            healthy, lag, error = self._probe(replica)
+            with self._lock:
+                replica.healthy, replica.lag_seconds, replica.error = healthy, lag, error
+                replica.checked_at = time.monotonic()
+
+    def choose_replica(self) -> Replica | None:
+        """Return a healthy replica, or None to fall back to the primary."""
+        if not self.replicas:
+            return None
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                replica = self.replicas[self._cursor % len(self.replicas)]
+                self._cursor += 1
+                if replica.healthy:
+                    return replica
+        return None
+
+    def choose(self):
+        """Return a replica engine, or None to fall back to the primary."""
+        replica = self.choose_replica()
+        return replica.engine if replica else None
+
+    def mark_failed(self, bind, error: Exception) -> None:
+        with self._lock:
+            for replica in self.replicas:
+                if bind is replica.engine or (replica.async_engine is not None and bind is replica.async_engine):
+                    replica.healthy = False
+                    replica.error = str(error)
+                    replica.checked_at = time.monotonic()
+
+    def status(self) -> list[dict]:
+        with self._lock:
+            return [
+                {
+                    "url": replica.engine.url.render_as_string(hide_password=True),
+                    "healthy": replica.healthy,
+                    "lag_seconds": replica.lag_seconds,
+                    "error": replica.error,
+                    "checked": replica.checked_at > 0,
+                }
+                for replica in self.replicas
+            ]
+
+
+def _create_replica_engine(url: str, pool_name: str) -> Engine:
+    replica_engine = create_engine(url, **build_engine_options(url, pool_name=pool_name, replica=True))
+    if _is_sqlite_file(replica_engine):
+        event.listen(replica_engine, "connect", _on_sqlite_connect)
+    return replica_engine
+
+
+def _create_async_replica_engine(url: str, pool_name: str):
+    replica_engine = create_async_engine(
+        async_database_url(url),
+        **build_engine_options(url, pool_name=pool_name, asynchronous=True, replica=True),
+    )
+    if _is_sqlite_file(replica_engine.sync_engine):
+        event.listen(replica_engine.sync_engine, "connect", _on_sqlite_connect)
+    return replica_engine
+
+
+replica_router = ReplicaRouter(
+    [
+        Replica(
+            url,
+            _create_replica_engine(url, f"replica{idx}"),
+            _create_async_replica_engine(url, f"replica{idx}-async"),
+        )
+        for idx, url in enumerate(DATABASE_REPLICA_URLS)
+    ],
+    max_lag_seconds=DB_REPLICA_MAX_LAG_SECONDS,
+    check_seconds=DB_REPLICA_CHECK_SECONDS,
+)
+
+
+class ReadOnlySession(Session):
+    pass
+
+
+@event.listens_for(ReadOnlySession, "before_flush")
+def _reject_read_session_writes(session, flush_context, instances):
+    raise RuntimeError("Read-only session cannot write; use get_db for mutating endpoints.")
+
+
+ReadSessionLocal = sessionmaker(class_=ReadOnlySession, autocommit=False, autoflush=False)
+AsyncReadSessionLocal = async_sessionmaker(sync_session_class=ReadOnlySession, autoflush=False, expire_on_commit=False)
+
+
+@contextmanager
+def read_session():
+    """Read-only session on a healthy replica when configured, else the primary."""
+    bind = replica_router.choose() or engine
+    db = ReadSessionLocal(bind=bind)
+    try:
+        yield db
+    except exc.OperationalError as error:
+        if bind is not engine:
+            replica_router.mark_failed(bind, error)
+        raise
+    finally:
+        db.close()
+
+
+def get_read_db():
+    """Session for read-only endpoints: a healthy replica when configured, else the primary."""
+    with read_session() as db:
+        yield db
+
+
+async def get_async_read_db():
+    """Async counterpart of get_read_db."""
+    replica = replica_router.choose_replica()
+    bind = replica.async_engine if replica else async_engine
+    async with AsyncReadSessionLocal(bind=bind) as db:
+        try:
+            yield db
+        except exc.OperationalError as error:
+            if replica is not None:
+                replica_router.mark_failed(replica.engine, error)
+            raise
+
+
+# ─── Per-request query instrumentation ───
+
+class QueryStats:
+    __slots__ = ("request_id", "count", "total_ms")
+
+    def __init__(self, request_id: str | None = None):
+        self.request_id = request_id
+        self.count = 0
+        self.total_ms = 0.0
+
+
+# Set by request_observability_middleware; the mutable stats object is shared with the
+# threadpool workers that run sync handlers because they inherit a copy of the context.
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def start_query_tracking(request_id: str | None = None) -> Token:
+    return _query_stats.set(QueryStats(request_id))
+
+
+def stop_query_tracking(token: Token) -> QueryStats:
+    stats = _query_stats.get() or QueryStats()
+    _query_stats.reset(token)
+    return stats
+
+
+def current_query_stats() -> QueryStats | None:
+    return _query_stats.get()
+
+
+def _parameter_shape(parameters, executemany: bool):
+    """Describe bound parameters by type only so slow-query logs never carry user data."""
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameters[0] if parameters else None
+        return {"rows": len(parameters), "row": _parameter_shape(first, False)}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__ if parameters is not None else None
+
+
+# Registered on the Engine class so primary, replica and async (via their sync_engine) engines are all instrumented.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started_at")
+    if not started:
+        return
+    elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.total_ms += elapsed_ms
+
+    if elapsed_ms >= DB_SLOW_QUERY_MS:
+        logger.warning(
+            json.dumps(
+                {
+                    "event": "slow_query",
+                    "request_id": stats.request_id if stats else None,
+                    "duration_ms": round(elapsed_ms, 2),
+                    "statement": " ".join(statement.split()),
+                    "parameters": _parameter_shape(parameters, executemany),
+                },
+                ensure_ascii=True,
+            )
+        )
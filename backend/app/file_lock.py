@@ -0,0 +1,16 @@
+"""Cross-process file locks for work every uvicorn worker schedules but only one should run at a time."""
+
+import fcntl
+from contextlib import contextmanager
+from pathlib import Path
+
+
+@contextmanager
+def exclusive_lock(path: Path):
+    """Hold an exclusive flock on path (created if missing) for the duration of the block."""
+    with open(path, "a+b") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -1,21 +1,28 @@
 import asyncio
 import logging
 from contextlib import asynccontextmanager
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.database import engine, Base, SessionLocal
 from app.config import (
     APP_ENV,
+    APP_THREADPOOL_SIZE,
     AUTO_CREATE_TABLES,
     BOOTSTRAP_ADMIN_EMAIL,
     BOOTSTRAP_ADMIN_NAME,
     BOOTSTRAP_ADMIN_PASSWORD,
+    BROTLI_QUALITY,
+    COMPRESSION_MIN_SIZE,
     CORS_ALLOWED_ORIGINS,
+    GZIP_LEVEL,
     get_simulation_date_str,
 )
+from app.middleware.compression import CompressionMiddleware
 from app.middleware.error_handler import register_error_handlers
 from app.middleware.audit import audit_middleware
 from app.middleware.request_observability import request_observability_middleware
+from app.responses import FastJSONResponse
 
 logger = logging.getLogger("paintflow.api")
 
@@ -35,9 +42,23 @@ async def lifespan(app: FastAPI):
     from app.services.forecast_service import preload_models
     from app.simulations.scenarios import preload_scenarios
     from app.services.ingestion_scheduler import ingestion_loop
+    from app.services.retention_scheduler import retention_loop
     from app.services.auth_service import ensure_bootstrap_admin
+    from app.services.dealer_health_service import ensure_dealer_health
+    from app.services.smart_order_scheduler import smart_order_loop
+    from app.services.reservation_scheduler import reservation_sweep_loop
+    from app.services.replica_health_scheduler import replica_health_loop
+    from app.services.columnar_scheduler import columnar_sync_loop
+    from app.services.smart_order_service import ensure_smart_orders
     stop_event = asyncio.Event()
+    # Sync handlers run in this threadpool; the DB pool is sized against the same number.
+    to_thread.current_default_thread_limiter().total_tokens = APP_THREADPOOL_SIZE
     ingestion_task = None
+    retention_task = None
+    smart_order_task = None
+    reservation_task = None
+    replica_health_task = None
+    columnar_task = None
     if AUTO_CREATE_TABLES:
         try:
             Base.metadata.create_all(bind=engine)
@@ -68,16 +89,64 @@ async def lifespan(app: FastAPI):
             logger.warning("Could not bootstrap admin user: %s", e)
         finally:
             db.close()
+    db = SessionLocal()
+    try:
+        backfilled = ensure_dealer_health(db)
+        if backfilled:
+            logger.info("Backfilled %s dealer health score rows", backfilled)
+    except Exception as e:
+        logger.warning("Could not backfill dealer health scores: %s", e)
+    finally:
+        db.close()
+    db = SessionLocal()
+    try:
+        rebuilt = ensure_smart_orders(db)
+        if rebuilt:
+            logger.info("Rebuilt %s smart-order recommendations", rebuilt)
+    except Exception as e:
+        logger.warning("Could not rebuild smart-order recommendations: %s", e)
+    finally:
+        db.close()
     try:
         ingestion_task = asyncio.create_task(ingestion_loop(stop_event))
     except Exception as e:
         logger.warning("Could not start ingestion scheduler: %s", e)
+    try:
+        retention_task = asyncio.create_task(retention_loop(stop_event))
+    except Exception as e:
+        logger.warning("Could not start retention scheduler: %s", e)
+    try:
+        smart_order_task = asyncio.create_task(smart_order_loop(stop_event))
+    except Exception as e:
+        logger.warning("Could not start smart-order scheduler: %s", e)
+    try:
+        reservation_task = asyncio.create_task(reservation_sweep_loop(stop_event))
+    except Exception as e:
+        logger.warning("Could not start reservation sweeper: %s", e)
+    try:
+        replica_health_task = asyncio.create_task(replica_health_loop(stop_event))
+    except Exception as e:
+        logger.warning("Could not start replica health checker: %s", e)
+    try:
+        columnar_task = asyncio.create_task(columnar_sync_loop(stop_event))
+    except Exception as e:
+        logger.warning("Could not start columnar analytics sync: %s", e)
     yield
     # Shutdown
     try:
         stop_event.set()
         if ingestion_task:
             await asyncio.wait_for(ingestion_task, timeout=5)
+        if retention_task:
+            await asyncio.wait_for(retention_task, timeout=5)
+        if smart_order_task:
+            await asyncio.wait_for(smart_order_task, timeout=5)
+        if reservation_task:
+            await asyncio.wait_for(reservation_task, timeout=5)
+        if replica_health_task:
+            await asyncio.wait_for(replica_health_task, timeout=5)
+        if columnar_task:
+            await asyncio.wait_for(columnar_task, timeout=5)
     except Exception:
         pass
 
@@ -87,6 +156,7 @@ app = FastAPI(
     description="AI-Powered Supply Chain Intelligence for Paint Manufacturing",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 configure_logging()
@@ -101,6 +171,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=COMPRESSION_MIN_SIZE,
+    gzip_level=GZIP_LEVEL,
+    brotli_quality=BROTLI_QUALITY,
+)
 
 # Import and include routers
 from app.routers import admin, dealer, customer, forecast, copilot, simulate, auth, notifications, ingestion, ops
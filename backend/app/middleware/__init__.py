@@ -1,4 +1,12 @@
-from app.middleware.auth import get_current_user, require_admin, require_customer, require_dealer
+from app.middleware.auth import (
+    get_current_user,
+    get_current_user_async,
+    require_admin,
+    require_customer,
+    require_dealer,
+    require_dealer_async,
+)
+from app.middleware.conditional import etag_for
 from app.middleware.error_handler import register_error_handlers
 from app.middleware.audit import audit_middleware
 from app.middleware.rate_limit import rate_limit_auth
@@ -6,9 +14,12 @@ from app.middleware.request_observability import request_observability_middlewar
 
 __all__ = [
     "get_current_user",
+    "get_current_user_async",
     "require_admin",
     "require_customer",
     "require_dealer",
+    "require_dealer_async",
+    "etag_for",
     "register_error_handlers",
     "request_observability_middleware",
     "audit_middleware",
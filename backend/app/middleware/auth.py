@@ -1,18 +1,16 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app.models.user import User
 from app.services.auth_service import decode_token
 
 security = HTTPBearer(auto_error=False)
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
-    """Decode JWT and return the current user."""
+def _user_id_from_credentials(credentials: HTTPAuthorizationCredentials | None) -> int:
     if not credentials:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -20,14 +18,15 @@ async def get_current_user(
         )
     try:
         payload = decode_token(credentials.credentials)
-        user_id = int(payload["sub"])
+        return int(payload["sub"])
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
         )
 
-    user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+
+def _require_active(user: User | None) -> User:
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -36,7 +35,29 @@ async def get_current_user(
     return user
 
 
-async def get_optional_user(
+# Plain `def` on purpose: FastAPI runs sync dependencies in the threadpool, so the blocking
+# user lookup never runs on the event loop. Async handlers use get_current_user_async instead.
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+) -> User:
+    """Decode JWT and return the current user."""
+    user_id = _user_id_from_credentials(credentials)
+    user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+    return _require_active(user)
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """Same as get_current_user, loaded through the async session."""
+    user_id = _user_id_from_credentials(credentials)
+    user = await db.scalar(select(User).where(User.id == user_id, User.is_active == True))
+    return _require_active(user)
+
+
+def get_optional_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db),
 ) -> User | None:
@@ -51,9 +72,9 @@ async def get_optional_user(
         return None
 
 
-def require_role(required_role: str):
+def require_role(required_role: str, user_dependency=get_current_user):
     """Dependency factory that checks user role."""
-    async def role_checker(user: User = Depends(get_current_user)):
+    async def role_checker(user: User = Depends(user_dependency)):
         if user.role != required_role:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -67,3 +88,4 @@ def require_role(required_role: str):
 require_admin = require_role("admin")
 require_dealer = require_role("dealer")
 require_customer = require_role("customer")
+require_dealer_async = require_role("dealer", get_current_user_async)
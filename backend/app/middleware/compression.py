@@ -0,0 +1,137 @@
+"""
+Response compression: Brotli when the client accepts it and the optional `brotli` package is
+installed, otherwise gzip. Bodies below the minimum size, responses that already carry a
+Content-Encoding, and event streams are passed through untouched.
+"""
+
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        # wbits=31 selects the gzip container.
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    accepted = set()
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+_STREAM_AFTER = 1024 * 1024
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _encoder_for(self, scope: Scope):
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            return "br", lambda: _BrotliEncoder(self.brotli_quality)
+        if "gzip" in accepted:
+            return "gzip", lambda: _GzipEncoder(self.gzip_level)
+        return None, None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding, make_encoder = self._encoder_for(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message = {}
+        pending: list[bytes] = []
+        pending_size = 0
+        encoder = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, pending_size, encoder, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                headers = Headers(raw=message["headers"])
+                passthrough = (
+                    "content-encoding" in headers
+                    or headers.get("content-type", "").startswith("text/event-stream")
+                )
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if passthrough:
+                if start_message:
+                    await send(start_message)
+                    start_message = {}
+                await send(message)
+                return
+            if encoder is not None:
+                message["body"] = encoder.chunk(body) if more_body else encoder.finish(body)
+                await send(message)
+                return
+
+            # Middleware further in (BaseHTTPMiddleware) re-streams every body as chunks, so
+            # buffer up to _STREAM_AFTER bytes: typical JSON then goes out in one compressed
+            # message with a Content-Length, and only genuinely large bodies are streamed.
+            pending.append(body)
+            pending_size += len(body)
+            if more_body and pending_size < _STREAM_AFTER:
+                return
+            if pending_size < self.minimum_size:
+                await send(start_message)
+                await send({"type": "http.response.body", "body": b"".join(pending)})
+                return
+
+            encoder = make_encoder()
+            buffered = b"".join(pending)
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["Content-Encoding"] = encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+                message["body"] = encoder.chunk(buffered)
+            else:
+                message["body"] = encoder.finish(buffered)
+                headers["Content-Length"] = str(len(message["body"]))
+            await send(start_message)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
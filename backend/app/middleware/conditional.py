@@ -0,0 +1,63 @@
+"""
+Conditional GET support driven by per-table write counters.
+
+`etag_for(*tables)` builds a dependency that derives a weak ETag from the request URL, the
+current versions of the tables the endpoint reads (see response_cache.table_versions), the
+simulation date and an ETAG_MAX_AGE_SECONDS time bucket. A matching If-None-Match
+short-circuits with 304 before the endpoint body, and so before any service query, runs.
+
+The versions only move for commits made through a Session in a process that shares them, so
+ETags are sent only when every worker does: with the Redis cache backend or a single worker.
+Otherwise another worker could keep answering 304 after a write it never saw. The time bucket
+bounds how long a write the counters miss (a script, raw SQL) can go unnoticed.
+"""
+
+import hashlib
+import json
+import time
+
+from fastapi import Request, Response
+
+from app.config import ETAG_MAX_AGE_SECONDS, WEB_CONCURRENCY, get_simulation_date_str
+from app.services.response_cache import response_cache
+
+CACHE_CONTROL = "no-cache"
+
+
+class NotModified(Exception):
+    def __init__(self, etag: str, cache_control: str):
+        self.etag = etag
+        self.cache_control = cache_control
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates or etag.removeprefix("W/") in candidates
+
+
+def etags_enabled() -> bool:
+    """True when every worker sees the same write counters."""
+    return response_cache.backend.shared or WEB_CONCURRENCY == 1
+
+
+def etag_for(*tables: str, private: bool = False):
+    cache_control = f"{'private' if private else 'public'}, {CACHE_CONTROL}"
+
+    def conditional_get(request: Request, response: Response) -> str | None:
+        response.headers["Cache-Control"] = cache_control
+        if not etags_enabled():
+            return None
+        epoch, versions = response_cache.table_versions(tables)
+        bucket = int(time.time() // ETAG_MAX_AGE_SECONDS)
+        # Date-relative windows roll over at midnight without any write, so the day is part of the tag.
+        fingerprint = json.dumps(
+            [epoch, bucket, get_simulation_date_str(), request.url.path, str(request.url.query), versions]
+        )
+        etag = f'W/"{hashlib.blake2b(fingerprint.encode(), digest_size=12).hexdigest()}"'
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, etag):
+            raise NotModified(etag, cache_control)
+        response.headers["ETag"] = etag
+        return etag
+
+    return conditional_get
@@ -3,9 +3,11 @@ import uuid
 
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
+from app.middleware.conditional import NotModified
+
 logger = logging.getLogger("paintflow.errors")
 
 
@@ -30,6 +32,10 @@ def register_error_handlers(app: FastAPI):
             headers={"x-request-id": request_id},
         )
 
+    @app.exception_handler(NotModified)
+    async def not_modified_handler(request: Request, exc: NotModified):
+        return Response(status_code=304, headers={"ETag": exc.etag, "Cache-Control": exc.cache_control})
+
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(request: Request, exc: RequestValidationError):
         request_id = _request_id_from_request(request)
@@ -5,12 +5,19 @@ import uuid
 
 from fastapi import Request
 
+from app.database import start_query_tracking, stop_query_tracking
 from app.services.observability_service import record_request_end, record_request_start
 
 
 logger = logging.getLogger("paintflow.request")
 
 
+def _route_template(request: Request) -> str | None:
+    # The router stores the matched route on the shared ASGI scope.
+    route = request.scope.get("route")
+    return getattr(route, "path", None)
+
+
 async def request_observability_middleware(request: Request, call_next):
     request_id = (
         getattr(request.state, "request_id", None)
@@ -19,6 +26,7 @@ async def request_observability_middleware(request: Request, call_next):
     )
     request.state.request_id = request_id
     record_request_start()
+    query_tracking = start_query_tracking(request_id)
 
     start = time.perf_counter()
     response = None
@@ -29,10 +37,22 @@ async def request_observability_middleware(request: Request, call_next):
         return response
     finally:
         duration_ms = round((time.perf_counter() - start) * 1000, 2)
-        record_request_end(request.url.path, status_code, duration_ms)
+        query_stats = stop_query_tracking(query_tracking)
+        db_time_ms = round(query_stats.total_ms, 2)
+        route = _route_template(request)
+        record_request_end(
+            status_code,
+            duration_ms,
+            method=request.method,
+            route=route,
+            db_queries=query_stats.count,
+            db_time_ms=db_time_ms,
+        )
         if response is not None:
             response.headers["x-request-id"] = request_id
             response.headers["x-response-time-ms"] = f"{duration_ms:.2f}"
+            response.headers["x-db-queries"] = str(query_stats.count)
+            response.headers["x-db-time-ms"] = f"{db_time_ms:.2f}"
 
         logger.info(
             json.dumps(
@@ -41,8 +61,11 @@ async def request_observability_middleware(request: Request, call_next):
                     "request_id": request_id,
                     "method": request.method,
                     "path": request.url.path,
+                    "route": route,
                     "status_code": status_code,
                     "duration_ms": duration_ms,
+                    "db_queries": query_stats.count,
+                    "db_time_ms": db_time_ms,
                     "client_ip": request.client.host if request.client else None,
                 },
                 ensure_ascii=True,
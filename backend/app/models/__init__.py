@@ -1,19 +1,23 @@
 from app.models.product import Product, Shade, SKU
-from app.models.inventory import Region, Warehouse, InventoryLevel, InventoryTransfer
-from app.models.dealer import Dealer, DealerOrder
-from app.models.sales import SalesHistory
+from app.models.inventory import Region, Warehouse, InventoryLevel, InventoryTransfer, StockReservation
+from app.models.dealer import Dealer, DealerOrder, DealerHealthScore, SmartOrderRecommendation
+from app.models.sales import SalesHistory, SalesDailyRegion, SalesDailyCategory, SalesDailySku
 from app.models.customer import CustomerOrderRequest, Cart, Wishlist, CustomerOrder, CustomerOrderItem
 from app.models.user import User
 from app.models.refresh_token import RefreshToken
 from app.models.notification import Notification
 from app.models.ingestion import IngestionRun
 from app.models.audit import AuditLog
+from app.models.retention import LogArchivePartition
 
 __all__ = [
     "Product", "Shade", "SKU",
-    "Region", "Warehouse", "InventoryLevel", "InventoryTransfer",
-    "Dealer", "DealerOrder",
+    "Region", "Warehouse", "InventoryLevel", "InventoryTransfer", "StockReservation",
+    "Dealer", "DealerOrder", "DealerHealthScore", "SmartOrderRecommendation",
     "SalesHistory",
+    "SalesDailyRegion",
+    "SalesDailyCategory",
+    "SalesDailySku",
     "CustomerOrderRequest",
     "Cart",
     "Wishlist",
@@ -24,4 +28,5 @@ __all__ = [
     "Notification",
     "IngestionRun",
     "AuditLog",
+    "LogArchivePartition",
 ]
@@ -1,10 +1,11 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Index
 from app.database import Base
 from datetime import datetime
 
 
 class CustomerOrderRequest(Base):
     __tablename__ = "customer_order_requests"
+    __table_args__ = (Index("ix_customer_order_requests_dealer_created", "dealer_id", "created_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     customer_name = Column(String, nullable=False)
@@ -18,6 +19,7 @@ class CustomerOrderRequest(Base):
 
 class Cart(Base):
     __tablename__ = "cart"
+    __table_args__ = (Index("ix_cart_user_sku", "user_id", "sku_id", unique=True),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -30,13 +32,17 @@ class Wishlist(Base):
     __tablename__ = "wishlist"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     shade_id = Column(Integer, ForeignKey("shades.id"), nullable=False)
     added_at = Column(DateTime, default=datetime.utcnow)
 
 
 class CustomerOrder(Base):
     __tablename__ = "customer_orders"
+    __table_args__ = (
+        Index("ix_customer_orders_dealer_status_created", "dealer_id", "status", "created_at"),
+        Index("ix_customer_orders_user_created", "user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -50,7 +56,7 @@ class CustomerOrderItem(Base):
     __tablename__ = "customer_order_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("customer_orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("customer_orders.id"), nullable=False, index=True)
     sku_id = Column(Integer, ForeignKey("skus.id"), nullable=False)
     quantity = Column(Integer, nullable=False)
     unit_price = Column(Float, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Date, DateTime, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import datetime
@@ -27,6 +27,10 @@ class Dealer(Base):
 
 class DealerOrder(Base):
     __tablename__ = "dealer_orders"
+    __table_args__ = (
+        Index("ix_dealer_orders_dealer_status_date", "dealer_id", "status", "order_date"),
+        Index("ix_dealer_orders_dealer_date", "dealer_id", "order_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     dealer_id = Column(Integer, ForeignKey("dealers.id"), nullable=False)
@@ -39,3 +43,58 @@ class DealerOrder(Base):
     savings_amount = Column(Float, default=0.0)
 
     dealer = relationship("Dealer", back_populates="orders")
+
+
+class DealerHealthScore(Base):
+    """Maintained health score per dealer: period "all" for the dashboard score, "YYYY-MM" for monthly history."""
+    __tablename__ = "dealer_health_scores"
+    __table_args__ = (
+        UniqueConstraint("dealer_id", "period", name="uq_dealer_health_scores_dealer_period"),
+        Index("ix_dealer_health_scores_period_score", "period", "health_score"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    dealer_id = Column(Integer, ForeignKey("dealers.id"), nullable=False)
+    period = Column(String, nullable=False)
+    health_score = Column(Float, nullable=False)
+    total_orders = Column(Integer, nullable=False, default=0)
+    delivered_orders = Column(Integer, nullable=False, default=0)
+    unique_skus = Column(Integer, nullable=False, default=0)
+    delivered_revenue = Column(Float, nullable=False, default=0.0)
+    inventory_levels = Column(Integer, nullable=False, default=0)
+    avg_days_of_cover = Column(Float, nullable=True)
+    stockout_count = Column(Integer, nullable=False, default=0)
+    low_cover_count = Column(Integer, nullable=False, default=0)
+    version = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class SmartOrderRecommendation(Base):
+    """Precomputed restock recommendation; rebuilt in batch for every dealer by smart_order_service."""
+    __tablename__ = "smart_order_recommendations"
+    __table_args__ = (
+        UniqueConstraint("dealer_id", "sku_id", name="uq_smart_order_recommendations_dealer_sku"),
+        Index("ix_smart_order_recommendations_dealer_rank", "dealer_id", "rank"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    dealer_id = Column(Integer, ForeignKey("dealers.id"), nullable=False)
+    sku_id = Column(Integer, ForeignKey("skus.id"), nullable=False)
+    rank = Column(Integer, nullable=False)
+    sku_code = Column(String, nullable=False)
+    shade_name = Column(String, nullable=False)
+    shade_hex = Column(String, nullable=False)
+    shade_family = Column(String, nullable=False)
+    size = Column(String, nullable=False)
+    current_stock = Column(Integer, nullable=False)
+    days_of_cover = Column(Float, nullable=False)
+    predicted_demand = Column(Float, nullable=False)
+    recommended_qty = Column(Integer, nullable=False)
+    urgency = Column(String, nullable=False)  # CRITICAL, RECOMMENDED, OPTIONAL
+    reason = Column(String, nullable=False)
+    predicted_stockout_date = Column(Date, nullable=False)
+    savings_amount = Column(Float, nullable=False)
+    mrp_per_unit = Column(Float, nullable=False)
+    total_cost = Column(Float, nullable=False)
+    generated_for = Column(Date, nullable=False)  # simulation date the batch was computed against
+    generated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -21,5 +21,5 @@ class IngestionRun(Base):
     error_count = Column(Integer, nullable=False, default=0)
     errors_json = Column(Text, nullable=True)
     triggered_by_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
-    started_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
     completed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import datetime
@@ -34,15 +34,21 @@ class Warehouse(Base):
 
 class InventoryLevel(Base):
     __tablename__ = "inventory_levels"
+    __table_args__ = (
+        Index("uq_inventory_levels_warehouse_sku", "warehouse_id", "sku_id", unique=True),
+        Index("ix_inventory_levels_sku_id", "sku_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     warehouse_id = Column(Integer, ForeignKey("warehouses.id"), nullable=False)
     sku_id = Column(Integer, ForeignKey("skus.id"), nullable=False)
     current_stock = Column(Integer, nullable=False, default=0)
+    # Units held by open customer reservations; available to promise = current_stock - reserved_stock.
+    reserved_stock = Column(Integer, nullable=False, default=0, server_default="0")
     reorder_point = Column(Integer, nullable=False, default=50)
     max_capacity = Column(Integer, nullable=False, default=5000)
     last_updated = Column(DateTime, default=datetime.utcnow)
-    days_of_cover = Column(Float, nullable=False, default=0.0)
+    days_of_cover = Column(Float, nullable=False, default=0.0, index=True)
 
     warehouse = relationship("Warehouse", back_populates="inventory_levels")
 
@@ -61,3 +67,21 @@ class InventoryTransfer(Base):
 
     from_warehouse = relationship("Warehouse", foreign_keys=[from_warehouse_id])
     to_warehouse = relationship("Warehouse", foreign_keys=[to_warehouse_id])
+
+
+class StockReservation(Base):
+    """Stock held at a warehouse for one line of a customer order until it is fulfilled, cancelled or expires."""
+    __tablename__ = "stock_reservations"
+    __table_args__ = (
+        Index("ix_stock_reservations_status_expires", "status", "expires_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    order_id = Column(Integer, ForeignKey("customer_orders.id"), nullable=False, index=True)
+    warehouse_id = Column(Integer, ForeignKey("warehouses.id"), nullable=False)
+    sku_id = Column(Integer, ForeignKey("skus.id"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    status = Column(String, nullable=False, default="held")  # held, consumed, released, expired
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+    closed_at = Column(DateTime, nullable=True)
@@ -40,7 +40,7 @@ class SKU(Base):
     __tablename__ = "skus"
 
     id = Column(Integer, primary_key=True, index=True)
-    shade_id = Column(Integer, ForeignKey("shades.id"), nullable=False)
+    shade_id = Column(Integer, ForeignKey("shades.id"), nullable=False, index=True)
     size = Column(String, nullable=False)  # 1L, 4L, 10L, 20L
     sku_code = Column(String, unique=True, nullable=False)
     unit_cost = Column(Float, nullable=False)
@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Date, DateTime, Integer, String, UniqueConstraint
+
+from app.database import Base
+
+
+class LogArchivePartition(Base):
+    __tablename__ = "log_archive_partitions"
+    __table_args__ = (UniqueConstraint("entity", "partition_date", name="uq_log_archive_partitions_entity_date"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity = Column(String, nullable=False, index=True)  # audit_logs, ingestion_runs
+    partition_date = Column(Date, nullable=False, index=True)
+    file_path = Column(String, nullable=False)
+    row_count = Column(Integer, nullable=False, default=0)
+    min_row_id = Column(Integer, nullable=True)
+    max_row_id = Column(Integer, nullable=True)
+    size_bytes = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -1,14 +1,50 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Date, Index, UniqueConstraint
 from app.database import Base
 
 
 class SalesHistory(Base):
     __tablename__ = "sales_history"
+    __table_args__ = (Index("ix_sales_history_sku_region_date", "sku_id", "region_id", "date"),)
 
     id = Column(Integer, primary_key=True, index=True)
     sku_id = Column(Integer, ForeignKey("skus.id"), nullable=False)
     region_id = Column(Integer, ForeignKey("regions.id"), nullable=False)
-    date = Column(Date, nullable=False)
+    date = Column(Date, nullable=False, index=True)
     quantity_sold = Column(Integer, nullable=False, default=0)
     revenue = Column(Float, nullable=False, default=0.0)
     channel = Column(String, default="dealer")  # dealer, online, institutional
+
+
+# ─── Daily rollups of SalesHistory (maintained by app.services.sales_rollup_service) ───
+
+class SalesDailyRegion(Base):
+    __tablename__ = "sales_daily_region"
+    __table_args__ = (UniqueConstraint("date", "region_id", name="uq_sales_daily_region_date_region"),)
+
+    id = Column(Integer, primary_key=True)
+    date = Column(Date, nullable=False)
+    region_id = Column(Integer, ForeignKey("regions.id"), nullable=False)
+    quantity_sold = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+
+class SalesDailyCategory(Base):
+    __tablename__ = "sales_daily_category"
+    __table_args__ = (UniqueConstraint("date", "category", name="uq_sales_daily_category_date_category"),)
+
+    id = Column(Integer, primary_key=True)
+    date = Column(Date, nullable=False)
+    category = Column(String, nullable=False)  # Product.category
+    quantity_sold = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+
+class SalesDailySku(Base):
+    __tablename__ = "sales_daily_sku"
+    __table_args__ = (UniqueConstraint("date", "sku_id", name="uq_sales_daily_sku_date_sku"),)
+
+    id = Column(Integer, primary_key=True)
+    date = Column(Date, nullable=False)
+    sku_id = Column(Integer, ForeignKey("skus.id"), nullable=False)
+    quantity_sold = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
@@ -13,7 +13,7 @@ class User(Base):
     full_name = Column(String, nullable=False)
     phone = Column(String, nullable=True)
     role = Column(String, nullable=False, default="customer")  # admin, dealer, customer
-    dealer_id = Column(Integer, ForeignKey("dealers.id"), nullable=True)
+    dealer_id = Column(Integer, ForeignKey("dealers.id"), nullable=True, index=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     last_login = Column(DateTime, nullable=True)
@@ -0,0 +1,38 @@
+"""
+Opaque keyset cursors.
+
+A cursor encodes the sort key of the last row on a page; the next page is the rows that sort
+strictly after it. Values are JSON encoded (datetimes as ISO strings) and base64url wrapped,
+so clients treat them as opaque tokens.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(*values) -> str:
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> tuple:
+    """Decode a cursor into values of the given types; 400 if it is malformed."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor arity")
+        return tuple(
+            datetime.fromisoformat(value) if kind is datetime else kind(value)
+            for kind, value in zip(types, values)
+        )
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def before_keyset(created_at_col, id_col, created_at: datetime, row_id: int):
+    """Rows after (created_at, id) in (created_at DESC, id DESC) order."""
+    return or_(created_at_col < created_at, and_(created_at_col == created_at, id_col < row_id))
@@ -0,0 +1,78 @@
+"""
+JSON responses serialized with orjson.
+
+`FastJSONResponse` is the app-wide default response class. `FastJSONRoute` additionally
+skips FastAPI's `jsonable_encoder` pass for endpoints without a response model: their
+return value (plain dicts/lists of dates, datetimes, UUIDs, numpy scalars, ...) goes straight
+to orjson, and only values orjson cannot encode natively fall back to jsonable_encoder.
+"""
+
+import functools
+import inspect
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return jsonable_encoder(value)
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class FastJSONRoute(APIRoute):
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, endpoint, **kwargs)
+        if self.response_field is None and not getattr(endpoint, "_fast_json", False):
+            # Rebuild with a wrapped endpoint that returns the serialized response itself.
+            super().__init__(path, self._wrap(endpoint, kwargs.get("status_code")), **kwargs)
+
+    @staticmethod
+    def _wrap(endpoint, status_code: int | None):
+        signature = inspect.signature(endpoint)
+        parameters = [*signature.parameters.values()]
+        parameters.append(inspect.Parameter("_sub_response", inspect.Parameter.KEYWORD_ONLY, annotation=Response))
+
+        def respond(content: Any, sub_response: Response) -> Response:
+            if isinstance(content, Response):
+                return content
+            # Carry over headers and status set by dependencies (e.g. ETag), as FastAPI would.
+            response = FastJSONResponse(content, status_code=sub_response.status_code or status_code or 200)
+            response.headers.update(sub_response.headers)
+            return response
+
+        if inspect.iscoroutinefunction(endpoint):
+            @functools.wraps(endpoint)
+            async def wrapper(*args, _sub_response: Response, **kwargs):
+                return respond(await endpoint(*args, **kwargs), _sub_response)
+        else:
+            @functools.wraps(endpoint)
+            def wrapper(*args, _sub_response: Response, **kwargs):
+                return respond(endpoint(*args, **kwargs), _sub_response)
+
+        wrapper.__signature__ = signature.replace(parameters=parameters)
+        # include_router re-instantiates routes with the already-wrapped endpoint.
+        wrapper._fast_json = True
+        return wrapper
@@ -1,14 +1,21 @@
-from datetime import datetime
+from datetime import date, datetime
+from pathlib import Path
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
+from app.config import ANALYTICS_CACHE_TTL_SECONDS, DASHBOARD_CACHE_TTL_SECONDS, RETENTION_ARCHIVE_DIR
 from app.database import get_db
 from app.middleware.auth import require_admin
+from app.middleware.conditional import etag_for
 from app.services.analytics_service import (
+    cube_dimensions,
     get_dashboard_summary,
     get_dealer_performance,
+    get_dealer_health_leaderboard,
     get_top_skus,
     get_revenue_breakdown,
+    get_revenue_cube,
+    get_revenue_year_over_year,
     get_stockout_details,
     get_dealer_distribution,
     get_warehouse_utilization,
@@ -27,26 +34,41 @@ from app.services.admin_crud_service import (
     create_transfer, complete_transfer, reject_transfer,
 )
 from app.services.audit_service import list_audit_logs
+from app.services.response_cache import cached_read
+from app.services.retention_service import apply_retention, list_archive_partitions, read_archive_partition
 from app.schemas.admin import (
     ProductCreate, ProductUpdate, ShadeCreate, ShadeUpdate, SKUCreate,
     WarehouseCreate, DealerUpdate, InventoryAdjustment, TransferCreate,
 )
+from app.responses import FastJSONRoute
 
-router = APIRouter(dependencies=[Depends(require_admin)])
+router = APIRouter(route_class=FastJSONRoute, dependencies=[Depends(require_admin)])
+
+# Tables each cached read depends on; a commit touching any of them invalidates the entry.
+_CATALOG_TABLES = ("products", "shades", "skus")
+_INVENTORY_TABLES = ("inventory_levels", "inventory_transfers", "warehouses", *_CATALOG_TABLES)
+_SALES_TABLES = ("sales_history", "sales_daily_region", "sales_daily_category", "sales_daily_sku", "regions", *_CATALOG_TABLES)
+_DEALER_TABLES = ("dealers", "dealer_orders", "dealer_health_scores", "regions")
+_DASHBOARD_TABLES = (*_INVENTORY_TABLES, *_SALES_TABLES, "dealers")
 
 
 # ─── Dashboard ───
 
-@router.get("/dashboard/summary")
-def dashboard_summary(db: Session = Depends(get_db)):
-    return get_dashboard_summary(db)
+@router.get("/dashboard/summary", dependencies=[Depends(etag_for(*_DASHBOARD_TABLES, private=True))])
+def dashboard_summary():
+    return cached_read(
+        "admin:dashboard:summary", get_dashboard_summary,
+        ttl=DASHBOARD_CACHE_TTL_SECONDS, tags=_DASHBOARD_TABLES,
+    )
 
 
 # ─── Inventory Map ───
 
-@router.get("/inventory/map")
-def inventory_map(db: Session = Depends(get_db)):
-    return get_warehouse_map_data(db)
+@router.get("/inventory/map", dependencies=[Depends(etag_for(*_INVENTORY_TABLES, private=True))])
+def inventory_map():
+    return cached_read(
+        "admin:inventory:map", get_warehouse_map_data, ttl=DASHBOARD_CACHE_TTL_SECONDS, tags=_INVENTORY_TABLES
+    )
 
 
 @router.get("/inventory/warehouse/{warehouse_id}")
@@ -56,9 +78,9 @@ def warehouse_inventory(warehouse_id: int, db: Session = Depends(get_db)):
 
 # ─── Dead Stock ───
 
-@router.get("/dead-stock")
-def dead_stock(db: Session = Depends(get_db)):
-    return get_dead_stock(db)
+@router.get("/dead-stock", dependencies=[Depends(etag_for(*_INVENTORY_TABLES, private=True))])
+def dead_stock():
+    return cached_read("admin:dead-stock", get_dead_stock, ttl=DASHBOARD_CACHE_TTL_SECONDS, tags=_INVENTORY_TABLES)
 
 
 # ─── Transfers ───
@@ -100,9 +122,21 @@ def reject_transfer_endpoint(transfer_id: int, db: Session = Depends(get_db)):
 
 # ─── Dealers ───
 
-@router.get("/dealers/performance")
-def dealer_performance(region_id: int = None, db: Session = Depends(get_db)):
-    return get_dealer_performance(db, region_id)
+@router.get("/dealers/performance", dependencies=[Depends(etag_for(*_DEALER_TABLES, private=True))])
+def dealer_performance(region_id: int = None):
+    return cached_read(
+        f"admin:dealers:performance:{region_id}", lambda db: get_dealer_performance(db, region_id),
+        ttl=DASHBOARD_CACHE_TTL_SECONDS, tags=_DEALER_TABLES,
+    )
+
+
+@router.get("/dealers/health", dependencies=[Depends(etag_for(*_DEALER_TABLES, private=True))])
+def dealer_health_leaderboard(region_id: int = None, limit: int = Query(20, ge=1, le=200)):
+    return cached_read(
+        f"admin:dealers:health:{region_id}:{limit}",
+        lambda db: get_dealer_health_leaderboard(db, region_id=region_id, limit=limit),
+        ttl=DASHBOARD_CACHE_TTL_SECONDS, tags=_DEALER_TABLES,
+    )
 
 
 @router.put("/dealers/{dealer_id}")
@@ -112,7 +146,7 @@ def update_dealer_endpoint(dealer_id: int, data: DealerUpdate, db: Session = Dep
 
 # ─── Products CRUD ───
 
-@router.get("/products")
+@router.get("/products", dependencies=[Depends(etag_for(*_CATALOG_TABLES, private=True))])
 def get_products(db: Session = Depends(get_db)):
     return list_products(db)
 
@@ -173,7 +207,7 @@ def create_sku_endpoint(data: SKUCreate, db: Session = Depends(get_db)):
 
 # ─── Warehouses ───
 
-@router.get("/warehouses")
+@router.get("/warehouses", dependencies=[Depends(etag_for("warehouses", "inventory_levels", private=True))])
 def get_warehouses(db: Session = Depends(get_db)):
     return list_warehouses(db)
 
@@ -193,31 +227,74 @@ def adjust_inventory_endpoint(data: InventoryAdjustment, db: Session = Depends(g
 
 # ─── Top SKUs ───
 
-@router.get("/top-skus")
-def top_skus(limit: int = 10, db: Session = Depends(get_db)):
-    return get_top_skus(db, limit)
+@router.get("/top-skus", dependencies=[Depends(etag_for(*_SALES_TABLES, private=True))])
+def top_skus(limit: int = 10):
+    return cached_read(
+        f"admin:top-skus:{limit}", lambda db: get_top_skus(db, limit),
+        ttl=DASHBOARD_CACHE_TTL_SECONDS, tags=_SALES_TABLES,
+    )
 
 
 # ─── Analytics Drill-down ───
 
-@router.get("/analytics/revenue-breakdown")
-def revenue_breakdown(days: int = 30, db: Session = Depends(get_db)):
-    return get_revenue_breakdown(db, days=days)
+@router.get("/analytics/revenue-breakdown", dependencies=[Depends(etag_for(*_SALES_TABLES, private=True))])
+def revenue_breakdown(days: int = 30):
+    return cached_read(
+        f"admin:analytics:revenue-breakdown:{days}", lambda db: get_revenue_breakdown(db, days=days),
+        ttl=ANALYTICS_CACHE_TTL_SECONDS, tags=_SALES_TABLES,
+    )
+
 
+@router.get("/analytics/revenue-yoy", dependencies=[Depends(etag_for(*_SALES_TABLES, private=True))])
+def revenue_year_over_year(
+    years: int = Query(2, ge=2, le=5),
+    group_by: str = Query("region", pattern="^(region|category|sku)$"),
+):
+    return cached_read(
+        f"admin:analytics:revenue-yoy:{years}:{group_by}",
+        lambda db: get_revenue_year_over_year(db, years=years, group_by=group_by),
+        ttl=ANALYTICS_CACHE_TTL_SECONDS, tags=_SALES_TABLES,
+    )
+
+
+@router.get("/analytics/revenue-cube", dependencies=[Depends(etag_for(*_SALES_TABLES, private=True))])
+def revenue_cube(
+    days: int = Query(365, ge=1, le=3650),
+    group_by: str = Query("region,category", description="Comma-separated: region, category, sku, month, year"),
+):
+    try:
+        dimensions = cube_dimensions(group_by)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return cached_read(
+        f"admin:analytics:revenue-cube:{days}:{','.join(dimensions)}",
+        lambda db: get_revenue_cube(db, days=days, group_by=dimensions),
+        ttl=ANALYTICS_CACHE_TTL_SECONDS, tags=_SALES_TABLES,
+    )
 
-@router.get("/analytics/stockout-details")
-def stockout_details(db: Session = Depends(get_db)):
-    return get_stockout_details(db)
 
+@router.get("/analytics/stockout-details", dependencies=[Depends(etag_for(*_INVENTORY_TABLES, private=True))])
+def stockout_details():
+    return cached_read(
+        "admin:analytics:stockout-details", get_stockout_details,
+        ttl=ANALYTICS_CACHE_TTL_SECONDS, tags=_INVENTORY_TABLES,
+    )
 
-@router.get("/analytics/dealer-distribution")
-def dealer_distribution(db: Session = Depends(get_db)):
-    return get_dealer_distribution(db)
 
+@router.get("/analytics/dealer-distribution", dependencies=[Depends(etag_for(*_DEALER_TABLES, private=True))])
+def dealer_distribution():
+    return cached_read(
+        "admin:analytics:dealer-distribution", get_dealer_distribution,
+        ttl=ANALYTICS_CACHE_TTL_SECONDS, tags=_DEALER_TABLES,
+    )
 
-@router.get("/analytics/warehouse-utilization")
-def warehouse_utilization(db: Session = Depends(get_db)):
-    return get_warehouse_utilization(db)
+
+@router.get("/analytics/warehouse-utilization", dependencies=[Depends(etag_for(*_INVENTORY_TABLES, private=True))])
+def warehouse_utilization():
+    return cached_read(
+        "admin:analytics:warehouse-utilization", get_warehouse_utilization,
+        ttl=ANALYTICS_CACHE_TTL_SECONDS, tags=_INVENTORY_TABLES,
+    )
 
 
 @router.get("/audit/logs")
@@ -249,3 +326,42 @@ def audit_logs(
         created_from=created_from,
         created_to=created_to,
     )
+
+
+# ─── Log Retention / Archive ───
+
+@router.get("/audit/archive")
+def audit_archive_partitions(
+    entity: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    limit: int = 100,
+    offset: int = 0,
+    db: Session = Depends(get_db),
+):
+    return list_archive_partitions(
+        db,
+        entity=entity,
+        date_from=date_from,
+        date_to=date_to,
+        limit=limit,
+        offset=offset,
+    )
+
+
+@router.get("/audit/archive/{partition_id}")
+def audit_archive_partition_rows(
+    partition_id: int,
+    limit: int = 100,
+    offset: int = 0,
+    db: Session = Depends(get_db),
+):
+    result = read_archive_partition(db, partition_id, limit=limit, offset=offset)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Archive partition not found")
+    return result
+
+
+@router.post("/audit/retention/run-now")
+def run_retention_now():
+    return apply_retention(Path(RETENTION_ARCHIVE_DIR))
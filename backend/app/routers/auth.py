@@ -18,10 +18,12 @@ from app.services.auth_service import (
     revoke_refresh_session,
 )
 from app.middleware.auth import get_current_user
+from app.middleware.conditional import etag_for
 from app.middleware.rate_limit import rate_limit_auth
 from app.models.user import User
+from app.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.post("/register", response_model=TokenResponse)
@@ -97,7 +99,7 @@ def update_me(data: UserUpdate, user: User = Depends(get_current_user), db: Sess
     return UserResponse.model_validate(user)
 
 
-@router.get("/dealers-list")
+@router.get("/dealers-list", dependencies=[Depends(etag_for("dealers"))])
 def dealers_list(db: Session = Depends(get_db)):
     """Return list of dealers for registration dropdown."""
     from app.models import Dealer
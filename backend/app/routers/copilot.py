@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_read_db
 from app.services.copilot_service import get_chat_response
 from app.services.inventory_service import get_warehouse_map_data
+from app.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 class ChatRequest(BaseModel):
@@ -14,14 +16,15 @@ class ChatRequest(BaseModel):
 
 
 @router.post("/chat")
-async def chat(request: ChatRequest, db: Session = Depends(get_db)):
+async def chat(request: ChatRequest, db: Session = Depends(get_read_db)):
     """AI Copilot chat endpoint with Generative UI support."""
     # Build inventory snapshot for context injection
     context = request.context or {}
 
     # Get current inventory state for the copilot
     try:
-        map_data = get_warehouse_map_data(db)
+        # CPU-heavy aggregation over a sync session: keep it off the event loop.
+        map_data = await run_in_threadpool(get_warehouse_map_data, db)
         critical = [w for w in map_data if w["status"] == "critical"]
         overstocked = [w for w in map_data if w["status"] == "overstocked"]
 
@@ -1,19 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from app.database import get_db
+from app.database import get_async_db, get_db
+from app.geo import haversine_km
 from app.models import Shade, SKU, Product, Dealer, InventoryLevel
 from app.models.user import User
 from app.middleware.auth import require_customer
-from app.schemas.customer import CartItemAdd, CartItemUpdate, CheckoutRequest
+from app.middleware.conditional import etag_for
+from app.schemas.customer import CartItemAdd, CartItemUpdate, CartSet, CheckoutRequest
 from app.services.customer_service import (
-    get_cart, add_to_cart, update_cart_item, remove_from_cart,
+    get_cart, add_to_cart, set_cart, update_cart_item, remove_from_cart,
     get_wishlist, add_to_wishlist, remove_from_wishlist,
     checkout, get_my_orders, get_order_detail,
 )
+from app.services.reservation_service import get_checkout_dealers
+from app.services.shade_catalog import shade_catalog
+from app.responses import FastJSONRoute
 import math
+from typing import Optional
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 class OrderRequestCreate(BaseModel):
@@ -26,45 +34,47 @@ class OrderRequestCreate(BaseModel):
 
 # ─── Public endpoints (no auth required) ──────────────────────────
 
-@router.get("/shades")
-def get_shades(
-    family: str = None, category: str = None, trending: bool = None,
-    db: Session = Depends(get_db),
+@router.get("/shades", dependencies=[Depends(etag_for("shades", "products", "skus"))])
+async def get_shades(
+    family: str = None,
+    category: str = None,
+    trending: bool = None,
+    min_price: Optional[float] = Query(None, ge=0, description="Lowest SKU price at or above"),
+    max_price: Optional[float] = Query(None, ge=0, description="Lowest SKU price at or below"),
+    q: Optional[str] = Query(None, max_length=100, description="Prefix/fuzzy search on shade name or code"),
+    sort: Optional[str] = Query(
+        None, description="relevance (default with q), featured, id (default), name, price_asc, price_desc",
+    ),
+    families: Optional[str] = Query(
+        None, max_length=200, description="Comma-separated shade families the featured sort ranks first",
+    ),
+    limit: int = Query(48, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    query = db.query(Shade)
-    if family:
-        query = query.filter(Shade.shade_family == family)
-    if trending is not None:
-        query = query.filter(Shade.is_trending == trending)
-
-    shades = query.all()
-    result = []
-    for s in shades:
-        product = db.query(Product).filter(Product.id == s.product_id).first()
-        if category and product and product.category != category:
-            continue
-        result.append({
-            "id": s.id,
-            "shade_code": s.shade_code,
-            "shade_name": s.shade_name,
-            "hex_color": s.hex_color,
-            "shade_family": s.shade_family,
-            "is_trending": s.is_trending,
-            "product_name": product.name if product else "",
-            "product_category": product.category if product else "",
-            "finish": product.finish if product else "",
-        })
-    return result
+    index = await shade_catalog.index(db)
+    return index.page(
+        family=family,
+        category=category,
+        trending=trending,
+        min_price=min_price,
+        max_price=max_price,
+        q=q,
+        sort=sort,
+        families=[name.strip() for name in families.split(",") if name.strip()] if families else None,
+        limit=limit,
+        cursor=cursor,
+    )
 
 
-@router.get("/shades/{shade_id}")
-def get_shade_detail(shade_id: int, db: Session = Depends(get_db)):
-    shade = db.query(Shade).filter(Shade.id == shade_id).first()
+@router.get("/shades/{shade_id}", dependencies=[Depends(etag_for("shades", "products", "skus"))])
+async def get_shade_detail(shade_id: int, db: AsyncSession = Depends(get_async_db)):
+    shade = await db.get(Shade, shade_id)
     if not shade:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Shade not found")
 
-    product = db.query(Product).filter(Product.id == shade.product_id).first()
-    skus = db.query(SKU).filter(SKU.shade_id == shade.id).all()
+    product = await db.get(Product, shade.product_id) if shade.product_id is not None else None
+    skus = (await db.scalars(select(SKU).where(SKU.shade_id == shade.id))).all()
 
     return {
         "id": shade.id,
@@ -102,7 +112,7 @@ def shade_availability(shade_id: int, lat: float, lng: float, db: Session = Depe
     results = []
 
     for dealer in dealers:
-        dist = _haversine(lat, lng, dealer.latitude, dealer.longitude)
+        dist = haversine_km(lat, lng, dealer.latitude, dealer.longitude)
         if dist > 50:
             continue
 
@@ -111,7 +121,7 @@ def shade_availability(shade_id: int, lat: float, lng: float, db: Session = Depe
             InventoryLevel.sku_id == sku.id,
         ).first()
 
-        stock = level.current_stock if level else 0
+        stock = max(level.current_stock - level.reserved_stock, 0) if level else 0
         if stock > 50:
             stock_status = "In Stock"
         elif stock > 0:
@@ -138,7 +148,7 @@ def nearby_dealers(lat: float, lng: float, db: Session = Depends(get_db)):
     dealers = db.query(Dealer).all()
     results = []
     for d in dealers:
-        dist = _haversine(lat, lng, d.latitude, d.longitude)
+        dist = haversine_km(lat, lng, d.latitude, d.longitude)
         if dist < 50:
             results.append({
                 "id": d.id,
@@ -164,9 +174,9 @@ def create_order_request(
 
 
 @router.post("/snap-find")
-async def snap_and_find(hex_color: str = "#FFD700", db: Session = Depends(get_db)):
+async def snap_and_find(hex_color: str = "#FFD700", db: AsyncSession = Depends(get_async_db)):
     target_r, target_g, target_b = _hex_to_rgb(hex_color)
-    shades = db.query(Shade).all()
+    shades = (await db.scalars(select(Shade))).all()
     best_match = None
     best_distance = float("inf")
 
@@ -183,7 +193,7 @@ async def snap_and_find(hex_color: str = "#FFD700", db: Session = Depends(get_db
     if not best_match:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No matching shade found")
 
-    product = db.query(Product).filter(Product.id == best_match.product_id).first()
+    product = await db.get(Product, best_match.product_id) if best_match.product_id is not None else None
 
     return {
         "detected_color": {"hex": hex_color, "rgb": {"r": target_r, "g": target_g, "b": target_b}},
@@ -211,6 +221,12 @@ def add_cart_item(data: CartItemAdd, user: User = Depends(require_customer), db:
     return add_to_cart(db, user.id, data.sku_id, data.quantity)
 
 
+@router.put("/me/cart")
+def replace_cart(data: CartSet, user: User = Depends(require_customer), db: Session = Depends(get_db)):
+    """Replace the whole cart in one call (frontend CartContext sync)."""
+    return set_cart(db, user.id, [(line.sku_id, line.quantity) for line in data.items])
+
+
 @router.put("/me/cart/{cart_id}")
 def update_cart(cart_id: int, data: CartItemUpdate, user: User = Depends(require_customer), db: Session = Depends(get_db)):
     return update_cart_item(db, user.id, cart_id, data.quantity)
@@ -236,14 +252,25 @@ def delete_wishlist_item(wishlist_id: int, user: User = Depends(require_customer
     return remove_from_wishlist(db, user.id, wishlist_id)
 
 
+@router.get("/me/checkout/dealers")
+def checkout_dealers(lat: float, lng: float, user: User = Depends(require_customer), db: Session = Depends(get_db)):
+    """Nearby dealers for the cart, and the nearest dealer whose warehouse can fill all of it."""
+    return get_checkout_dealers(db, user.id, lat, lng)
+
+
 @router.post("/me/checkout")
 def checkout_cart(data: CheckoutRequest, user: User = Depends(require_customer), db: Session = Depends(get_db)):
     return checkout(db, user.id, data.dealer_id)
 
 
 @router.get("/me/orders")
-def list_my_orders(user: User = Depends(require_customer), db: Session = Depends(get_db)):
-    return get_my_orders(db, user.id)
+def list_my_orders(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    user: User = Depends(require_customer),
+    db: Session = Depends(get_db),
+):
+    return get_my_orders(db, user.id, limit=limit, cursor=cursor)
 
 
 @router.get("/me/orders/{order_id}")
@@ -253,14 +280,6 @@ def my_order_detail(order_id: int, user: User = Depends(require_customer), db: S
 
 # ─── Helpers ──────────────────────────────────────────────────────
 
-def _haversine(lat1, lon1, lat2, lon2):
-    R = 6371
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
-    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-
-
 def _hex_to_rgb(hex_color: str):
     h = hex_color.lstrip("#")
     return int(h[0:2], 16), int(h[2:4], 16), int(h[4:6], 16)
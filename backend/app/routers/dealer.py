@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, Query, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_async_read_db, get_db, get_read_db
 from app.services.dealer_service import (
     get_dealer_dashboard,
-    get_smart_orders,
     get_dealer_alerts,
     get_dealer_dashboard_activity,
     get_dealer_order_pipeline,
@@ -15,19 +15,21 @@ from app.services.analytics_service import (
     get_dealer_top_skus_analytics,
     get_dealer_order_pipeline_analytics,
 )
-from app.services.order_service import update_order_status, get_order_detail, search_orders
+from app.services.smart_order_service import get_smart_orders
+from app.services.order_service import place_dealer_orders, update_order_status, get_order_detail, search_orders
 from app.services.customer_service import (
     get_dealer_customer_requests,
     update_dealer_customer_request_status,
 )
-from app.schemas.dealer import ManualOrderCreate, OrderStatusUpdate, CustomerRequestStatusUpdate
+from app.schemas.dealer import BulkOrderCreate, ManualOrderCreate, OrderStatusUpdate, CustomerRequestStatusUpdate
 from app.models import Dealer, DealerOrder, SKU
 from app.models.user import User
-from app.middleware.auth import require_dealer
+from app.middleware.auth import require_dealer, require_dealer_async
+from app.responses import FastJSONRoute
 from datetime import datetime
 from typing import Optional
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 def _get_dealer_id(user: User) -> int:
@@ -60,42 +62,46 @@ def _notify_admins(db: Session, title: str, message: str, category: str = "order
 
 # ─── /me/ endpoints (JWT-based, dealer_id from token) ───
 
+# Dashboard widgets load in parallel on every dealer page view; they run on the event loop
+# over the async read session and reuse the sync service functions via run_sync.
+
 @router.get("/me/dashboard")
-def dealer_dashboard(user: User = Depends(require_dealer), db: Session = Depends(get_db)):
-    return get_dealer_dashboard(db, _get_dealer_id(user))
+async def dealer_dashboard(user: User = Depends(require_dealer_async), db: AsyncSession = Depends(get_async_read_db)):
+    return await db.run_sync(get_dealer_dashboard, _get_dealer_id(user))
 
 
 @router.get("/me/dashboard/activity")
-def dealer_dashboard_activity(
+async def dealer_dashboard_activity(
     limit: int = Query(20, ge=1, le=100),
-    user: User = Depends(require_dealer),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    user: User = Depends(require_dealer_async),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    return get_dealer_dashboard_activity(db, _get_dealer_id(user), limit=limit)
+    return await db.run_sync(get_dealer_dashboard_activity, _get_dealer_id(user), limit=limit, cursor=cursor)
 
 
 @router.get("/me/dashboard/pipeline")
-def dealer_dashboard_pipeline(
-    user: User = Depends(require_dealer),
-    db: Session = Depends(get_db),
+async def dealer_dashboard_pipeline(
+    user: User = Depends(require_dealer_async),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    return get_dealer_order_pipeline(db, _get_dealer_id(user))
+    return await db.run_sync(get_dealer_order_pipeline, _get_dealer_id(user))
 
 
 @router.get("/me/dashboard/trends")
-def dealer_dashboard_trends(
+async def dealer_dashboard_trends(
     months: int = Query(6, ge=3, le=12),
-    user: User = Depends(require_dealer),
-    db: Session = Depends(get_db),
+    user: User = Depends(require_dealer_async),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    return get_dealer_trends(db, _get_dealer_id(user), months=months)
+    return await db.run_sync(get_dealer_trends, _get_dealer_id(user), months=months)
 
 
 @router.get("/me/inventory/top-skus")
 def dealer_top_skus(
     limit: int = Query(10, ge=1, le=30),
     user: User = Depends(require_dealer),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     return get_dealer_top_skus(db, _get_dealer_id(user), limit=limit)
 
@@ -104,7 +110,7 @@ def dealer_top_skus(
 def dealer_analytics_revenue_trend(
     months: int = Query(6, ge=3, le=12),
     user: User = Depends(require_dealer),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     return get_dealer_revenue_trend(db, _get_dealer_id(user), months=months)
 
@@ -113,7 +119,7 @@ def dealer_analytics_revenue_trend(
 def dealer_analytics_top_skus(
     limit: int = Query(10, ge=1, le=30),
     user: User = Depends(require_dealer),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     return get_dealer_top_skus_analytics(db, _get_dealer_id(user), limit=limit)
 
@@ -121,11 +127,12 @@ def dealer_analytics_top_skus(
 @router.get("/me/analytics/order-pipeline")
 def dealer_analytics_order_pipeline(
     user: User = Depends(require_dealer),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     return get_dealer_order_pipeline_analytics(db, _get_dealer_id(user))
 
 
+# Read from the primary like /me/orders/bundle, so the batch shown is the batch accepted.
 @router.get("/me/smart-orders")
 def smart_orders(user: User = Depends(require_dealer), db: Session = Depends(get_db)):
     return get_smart_orders(db, _get_dealer_id(user))
@@ -167,48 +174,41 @@ def place_order(order: ManualOrderCreate, user: User = Depends(require_dealer),
     return {"success": True, "order_id": new_order.id, "status": "placed"}
 
 
+@router.post("/me/orders/bulk")
+def place_bulk_order(order: BulkOrderCreate, user: User = Depends(require_dealer), db: Session = Depends(get_db)):
+    """Place a whole cart of SKU/quantity lines in one transaction."""
+    return place_dealer_orders(
+        db,
+        _get_dealer_id(user),
+        [line.model_dump() for line in order.lines],
+    )
+
+
 @router.post("/me/orders/bundle")
 def accept_bundle(user: User = Depends(require_dealer), db: Session = Depends(get_db)):
-    """Accept all AI-recommended orders at once."""
+    """Accept all AI-recommended orders at once (the same stored batch /me/smart-orders shows)."""
     dealer_id = _get_dealer_id(user)
-    recs = get_smart_orders(db, dealer_id)
-    total_savings = 0
-    orders_placed = 0
-
-    try:
-        for rec in recs:
-            if rec["urgency"] in ("CRITICAL", "RECOMMENDED"):
-                order = DealerOrder(
-                    dealer_id=dealer_id,
-                    sku_id=rec["sku_id"],
-                    quantity=rec["recommended_qty"],
-                    order_date=datetime.utcnow(),
-                    status="placed",
-                    is_ai_suggested=True,
-                    order_source="ai_recommendation",
-                    savings_amount=rec["savings_amount"],
-                )
-                db.add(order)
-                total_savings += rec["savings_amount"]
-                orders_placed += 1
-
-        db.commit()
-    except Exception as exc:
-        db.rollback()
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to accept smart-order bundle") from exc
-
-    if orders_placed > 0:
-        _notify_admins(
-            db,
-            title="Dealer Accepted AI Bundle",
-            message=f"Dealer #{dealer_id} accepted {orders_placed} AI recommendations.",
-            category="order",
-            link="/admin",
-        )
+    lines = [
+        {"sku_id": rec["sku_id"], "quantity": rec["recommended_qty"], "savings_amount": rec["savings_amount"]}
+        for rec in get_smart_orders(db, dealer_id)
+        if rec["urgency"] in ("CRITICAL", "RECOMMENDED")
+    ]
+    result = place_dealer_orders(
+        db,
+        dealer_id,
+        lines,
+        order_source="ai_recommendation",
+        is_ai_suggested=True,
+        notification=(
+            "Dealer Accepted AI Bundle",
+            f"Dealer #{dealer_id} accepted {len(lines)} AI recommendations.",
+        ),
+    )
+    orders_placed, total_savings = result["orders_placed"], result["total_savings"]
     return {
         "success": True,
         "orders_placed": orders_placed,
-        "total_savings": round(total_savings, 0),
+        "total_savings": total_savings,
         "message": f"Bundle accepted! {orders_placed} orders placed. You saved \u20b9{total_savings:,.0f}!",
     }
 
@@ -264,6 +264,7 @@ def dealer_customer_requests(
     status_filter: Optional[str] = Query(None, alias="status"),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; overrides page"),
     user: User = Depends(require_dealer),
     db: Session = Depends(get_db),
 ):
@@ -273,6 +274,7 @@ def dealer_customer_requests(
         status=status_filter,
         page=page,
         per_page=per_page,
+        cursor=cursor,
     )
 
 
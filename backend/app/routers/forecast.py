@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.services.forecast_service import get_forecast
-from app.models import SKU, Shade, SalesHistory, Region
+from app.models import SKU, Shade, SalesHistory, SalesDailyRegion, Region
 from sqlalchemy import func
 from app.config import get_simulation_date
+from app.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.get("/{sku_id}")
@@ -51,20 +52,20 @@ def get_sku_forecast(
 
 
 @router.get("/regional/summary")
-def regional_forecast_summary(db: Session = Depends(get_db)):
+def regional_forecast_summary(db: Session = Depends(get_read_db)):
     """Aggregated forecast summary by region."""
-    regions = db.query(Region).all()
-    result = []
-
-    for region in regions:
-        total_sales = db.query(func.sum(SalesHistory.revenue)).filter(
-            SalesHistory.region_id == region.id,
-        ).scalar() or 0
-
-        result.append({
-            "region_id": region.id,
-            "region_name": region.name,
-            "total_revenue": round(total_sales, 0),
-        })
-
-    return result
+    rows = (
+        db.query(Region.id, Region.name, func.sum(SalesDailyRegion.revenue))
+        .outerjoin(SalesDailyRegion, SalesDailyRegion.region_id == Region.id)
+        .group_by(Region.id, Region.name)
+        .order_by(Region.id)
+        .all()
+    )
+    return [
+        {
+            "region_id": region_id,
+            "region_name": region_name,
+            "total_revenue": round(total_sales or 0, 0),
+        }
+        for region_id, region_name, total_sales in rows
+    ]
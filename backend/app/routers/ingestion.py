@@ -24,8 +24,9 @@ from app.services.ingestion_service import (
     process_ingestion_inbox_once,
     validate_rows,
 )
+from app.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 def _parse_upload_csv(file: UploadFile) -> list[dict]:
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.middleware.auth import get_current_user
+from app.database import get_async_db
+from app.middleware.auth import get_current_user_async
 from app.models.user import User
 from app.services.notification_service import (
     get_notifications,
@@ -11,50 +11,54 @@ from app.services.notification_service import (
     mark_all_read,
     delete_notification,
 )
+from app.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
+# Notification calls are short DB round-trips polled by every client, so they run on the
+# event loop with the async session instead of occupying threadpool workers.
+
 @router.get("")
-def list_notifications(
+async def list_notifications(
     unread_only: bool = Query(False),
     limit: int = Query(20, ge=1, le=200),
     offset: int = Query(0, ge=0),
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return get_notifications(db, user.id, unread_only=unread_only, limit=limit, offset=offset)
+    return await db.run_sync(get_notifications, user.id, unread_only=unread_only, limit=limit, offset=offset)
 
 
 @router.get("/unread-count")
-def unread_count(
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+async def unread_count(
+    user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return {"count": get_unread_count(db, user.id)}
+    return {"count": await db.run_sync(get_unread_count, user.id)}
 
 
 @router.put("/read-all")
-def read_all(
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+async def read_all(
+    user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return mark_all_read(db, user.id)
+    return await db.run_sync(mark_all_read, user.id)
 
 
 @router.put("/{notification_id}/read")
-def read_notification(
+async def read_notification(
     notification_id: int,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return mark_as_read(db, user.id, notification_id)
+    return await db.run_sync(mark_as_read, user.id, notification_id)
 
 
 @router.delete("/{notification_id}")
-def remove_notification(
+async def remove_notification(
     notification_id: int,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return delete_notification(db, user.id, notification_id)
+    return await db.run_sync(delete_notification, user.id, notification_id)
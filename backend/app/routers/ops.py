@@ -1,15 +1,27 @@
+import asyncio
 from datetime import UTC, datetime
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.responses import JSONResponse, PlainTextResponse
 from sqlalchemy import text
 
 from app.config import APP_ENV
-from app.database import SessionLocal
+from app.database import SessionLocal, replica_router
+from app.middleware.auth import require_admin
 from app.services.observability_service import get_metrics_snapshot, render_prometheus_metrics
+from app.services.profiling_service import (
+    MAX_PROFILE_SECONDS,
+    MIN_INTERVAL_MS,
+    ProfilerBusyError,
+    SamplingProfiler,
+    acquire_profiler_slot,
+    endpoint_code_map,
+    release_profiler_slot,
+)
+from app.responses import FastJSONRoute
 
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.get("/health/live")
@@ -37,6 +49,11 @@ def health_ready():
     finally:
         db.close()
 
+    if replica_router.replicas:
+        # Replicas are optional: reads fall back to the primary, so they never fail readiness.
+        # Their health comes from the background checker; readiness never probes them itself.
+        checks["replicas"] = replica_router.status()
+
     status_code = 200 if ready else 503
     payload = {
         "status": "ready" if ready else "degraded",
@@ -50,10 +67,43 @@ def health_ready():
 
 @router.get("/metrics")
 def metrics(format: str = "json"):
-    snapshot = get_metrics_snapshot()
     if format.lower() == "prometheus":
+        snapshot = get_metrics_snapshot(include_buckets=True)
         return PlainTextResponse(
             render_prometheus_metrics(snapshot),
             media_type="text/plain; version=0.0.4; charset=utf-8",
         )
-    return snapshot
+    return get_metrics_snapshot()
+
+
+@router.get("/profile", dependencies=[Depends(require_admin)])
+async def profile(
+    request: Request,
+    seconds: float = Query(5.0, gt=0, le=MAX_PROFILE_SECONDS),
+    interval_ms: float = Query(10.0, ge=MIN_INTERVAL_MS, le=1000),
+    format: str = Query("speedscope", pattern="^(speedscope|collapsed|summary)$"),
+    include_idle: bool = False,
+):
+    """Sample live stacks of this worker for a bounded window, attributed to route templates."""
+    try:
+        acquire_profiler_slot()
+    except ProfilerBusyError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+
+    try:
+        endpoints = endpoint_code_map(request.app.routes)
+        endpoints.pop(profile.__code__, None)
+        profiler = SamplingProfiler(endpoints, interval_ms=interval_ms, include_idle=include_idle)
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.stop()
+    finally:
+        release_profiler_slot()
+
+    if format == "collapsed":
+        return PlainTextResponse(profiler.collapsed())
+    if format == "summary":
+        return profiler.summary()
+    return profiler.speedscope()
@@ -1,15 +1,17 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
+from app.middleware.conditional import etag_for
 from app.simulations.scenarios import get_scenario_list, get_scenario_data
+from app.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
-@router.get("/scenarios")
+@router.get("/scenarios", dependencies=[Depends(etag_for())])
 def list_scenarios():
     return get_scenario_list()
 
 
-@router.get("/scenario/{scenario_id}/data")
+@router.get("/scenario/{scenario_id}/data", dependencies=[Depends(etag_for())])
 def scenario_data(scenario_id: str):
     data = get_scenario_data(scenario_id.upper())
     if not data:
@@ -10,6 +10,15 @@ class CartItemUpdate(BaseModel):
     quantity: int = Field(gt=0, le=100000)
 
 
+class CartLine(BaseModel):
+    sku_id: int
+    quantity: int = Field(gt=0, le=100000)
+
+
+class CartSet(BaseModel):
+    items: list[CartLine] = Field(default_factory=list, max_length=200)
+
+
 class WishlistAdd(BaseModel):
     shade_id: int
 
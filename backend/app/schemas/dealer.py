@@ -8,6 +8,15 @@ class ManualOrderCreate(BaseModel):
     notes: Optional[str] = Field(default=None, max_length=500)
 
 
+class BulkOrderLine(BaseModel):
+    sku_id: int
+    quantity: int = Field(gt=0, le=100000)
+
+
+class BulkOrderCreate(BaseModel):
+    lines: list[BulkOrderLine] = Field(min_length=1, max_length=500)
+
+
 class OrderStatusUpdate(BaseModel):
     status: Literal["confirmed", "shipped", "delivered", "cancelled"]
 
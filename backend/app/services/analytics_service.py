@@ -1,15 +1,18 @@
 """
-Dashboard analytics aggregations with lru_cache for sub-50ms responses.
+Dashboard analytics aggregations. The admin router serves these through app.services.response_cache.
 """
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import extract, func
 from app.models import (
-    InventoryLevel, InventoryTransfer, Warehouse, SKU, Shade,
-    Dealer, DealerOrder, SalesHistory, Product, Region,
+    InventoryLevel, InventoryTransfer, Warehouse, SKU, Shade, Product,
+    Dealer, DealerHealthScore, DealerOrder, Region,
+    SalesDailyCategory, SalesDailyRegion, SalesDailySku, SalesHistory,
 )
 from datetime import date, timedelta
-from app.config import get_simulation_date
+from app.config import ANALYTICS_COLUMNAR_ENABLED, get_simulation_date
+from app.services.columnar_store import sales_column_store
+from app.services.dealer_health_service import LIFETIME
 
 
 def get_dashboard_summary(db: Session) -> dict:
@@ -29,9 +32,9 @@ def get_dashboard_summary(db: Session) -> dict:
         InventoryTransfer.status == "PENDING"
     ).scalar()
 
-    # Revenue this month (from dealer orders)
-    total_revenue = db.query(func.sum(SalesHistory.revenue)).filter(
-        SalesHistory.date >= month_start
+    # Revenue this month (from the daily sales rollup)
+    total_revenue = db.query(func.sum(SalesDailyRegion.revenue)).filter(
+        SalesDailyRegion.date >= month_start
     ).scalar() or 0
 
     # Revenue at risk (from critical stockouts)
@@ -70,6 +73,11 @@ def get_dealer_performance(db: Session, region_id: int | None = None) -> list[di
         query = query.filter(Dealer.region_id == region_id)
 
     dealers = query.order_by(Dealer.performance_score.desc()).all()
+    health_scores = dict(
+        db.query(DealerHealthScore.dealer_id, DealerHealthScore.health_score)
+        .filter(DealerHealthScore.period == LIFETIME)
+        .all()
+    )
 
     result = []
     for d in dealers:
@@ -95,6 +103,7 @@ def get_dealer_performance(db: Session, region_id: int | None = None) -> list[di
             "state": d.state,
             "tier": d.tier,
             "performance_score": d.performance_score,
+            "health_score": health_scores.get(d.id),
             "total_orders": order_count,
             "total_revenue": round(total_revenue, 0),
             "ai_adoption_rate": round(ai_orders / max(order_count, 1) * 100, 1),
@@ -104,21 +113,52 @@ def get_dealer_performance(db: Session, region_id: int | None = None) -> list[di
     return result
 
 
+def get_dealer_health_leaderboard(db: Session, region_id: int | None = None, limit: int = 20) -> list[dict]:
+    """Dealers ranked by their maintained health score (see dealer_health_service)."""
+    query = (
+        db.query(Dealer, DealerHealthScore)
+        .join(DealerHealthScore, DealerHealthScore.dealer_id == Dealer.id)
+        .filter(DealerHealthScore.period == LIFETIME)
+    )
+    if region_id:
+        query = query.filter(Dealer.region_id == region_id)
+
+    return [
+        {
+            "rank": rank,
+            "id": dealer.id,
+            "name": dealer.name,
+            "code": dealer.code,
+            "city": dealer.city,
+            "tier": dealer.tier,
+            "health_score": score.health_score,
+            "fulfillment_rate": round(score.delivered_orders / max(score.total_orders, 1) * 100, 1),
+            "unique_skus": score.unique_skus,
+            "stockout_count": score.stockout_count,
+            "score_version": score.version,
+            "updated_at": score.updated_at,
+        }
+        for rank, (dealer, score) in enumerate(
+            query.order_by(DealerHealthScore.health_score.desc(), Dealer.id).limit(limit).all(), start=1
+        )
+    ]
+
+
 def get_top_skus(db: Session, limit: int = 10) -> list[dict]:
     """Top selling SKUs by revenue."""
     sim_date = get_simulation_date()
     lookback_start = sim_date - timedelta(days=45)
 
     results = db.query(
-        SalesHistory.sku_id,
-        func.sum(SalesHistory.revenue).label("total_revenue"),
-        func.sum(SalesHistory.quantity_sold).label("total_qty"),
+        SalesDailySku.sku_id,
+        func.sum(SalesDailySku.revenue).label("total_revenue"),
+        func.sum(SalesDailySku.quantity_sold).label("total_qty"),
     ).filter(
-        SalesHistory.date >= lookback_start
+        SalesDailySku.date >= lookback_start
     ).group_by(
-        SalesHistory.sku_id
+        SalesDailySku.sku_id
     ).order_by(
-        func.sum(SalesHistory.revenue).desc()
+        func.sum(SalesDailySku.revenue).desc()
     ).limit(limit).all()
 
     top_skus = []
@@ -147,37 +187,34 @@ def get_revenue_breakdown(db: Session, days: int = 30) -> dict:
     by_region_rows = (
         db.query(
             Region.name.label("region_name"),
-            func.sum(SalesHistory.revenue).label("revenue"),
+            func.sum(SalesDailyRegion.revenue).label("revenue"),
         )
-        .join(SalesHistory, SalesHistory.region_id == Region.id)
-        .filter(SalesHistory.date >= start_date, SalesHistory.date <= sim_date)
+        .join(SalesDailyRegion, SalesDailyRegion.region_id == Region.id)
+        .filter(SalesDailyRegion.date >= start_date, SalesDailyRegion.date <= sim_date)
         .group_by(Region.id, Region.name)
-        .order_by(func.sum(SalesHistory.revenue).desc())
+        .order_by(func.sum(SalesDailyRegion.revenue).desc())
         .all()
     )
 
     by_category_rows = (
         db.query(
-            Product.category.label("category"),
-            func.sum(SalesHistory.revenue).label("revenue"),
+            SalesDailyCategory.category.label("category"),
+            func.sum(SalesDailyCategory.revenue).label("revenue"),
         )
-        .join(Shade, Shade.product_id == Product.id)
-        .join(SKU, SKU.shade_id == Shade.id)
-        .join(SalesHistory, SalesHistory.sku_id == SKU.id)
-        .filter(SalesHistory.date >= start_date, SalesHistory.date <= sim_date)
-        .group_by(Product.category)
-        .order_by(func.sum(SalesHistory.revenue).desc())
+        .filter(SalesDailyCategory.date >= start_date, SalesDailyCategory.date <= sim_date)
+        .group_by(SalesDailyCategory.category)
+        .order_by(func.sum(SalesDailyCategory.revenue).desc())
         .all()
     )
 
     by_day_rows = (
         db.query(
-            SalesHistory.date.label("date"),
-            func.sum(SalesHistory.revenue).label("revenue"),
+            SalesDailyRegion.date.label("date"),
+            func.sum(SalesDailyRegion.revenue).label("revenue"),
         )
-        .filter(SalesHistory.date >= start_date, SalesHistory.date <= sim_date)
-        .group_by(SalesHistory.date)
-        .order_by(SalesHistory.date.asc())
+        .filter(SalesDailyRegion.date >= start_date, SalesDailyRegion.date <= sim_date)
+        .group_by(SalesDailyRegion.date)
+        .order_by(SalesDailyRegion.date.asc())
         .all()
     )
 
@@ -200,6 +237,146 @@ def get_revenue_breakdown(db: Session, days: int = 30) -> dict:
     }
 
 
+_YOY_ROLLUPS = {
+    "region": (SalesDailyRegion, SalesDailyRegion.region_id),
+    "category": (SalesDailyCategory, SalesDailyCategory.category),
+    "sku": (SalesDailySku, SalesDailySku.sku_id),
+}
+
+
+def get_revenue_year_over_year(db: Session, years: int = 2, group_by: str = "region") -> dict:
+    """Trailing-12-month revenue per region/category/SKU for each of the last `years` years."""
+    if group_by not in _YOY_ROLLUPS:
+        raise ValueError(f"Unsupported group_by: {group_by}")
+    sim_date = get_simulation_date()
+    periods = []
+    for offset in range(years):
+        end = sim_date - timedelta(days=365 * offset)
+        periods.append((end - timedelta(days=364), end))
+
+    totals: dict = {}
+    model, key_column = _YOY_ROLLUPS[group_by]
+    for idx, (start, end) in enumerate(periods):
+        rows = (
+            db.query(key_column, func.sum(model.revenue))
+            .filter(model.date >= start, model.date <= end)
+            .group_by(key_column)
+            .all()
+        )
+        for key, revenue in rows:
+            totals.setdefault(key, [0.0] * years)[idx] = revenue or 0.0
+
+    if group_by == "region":
+        labels = dict(db.query(Region.id, Region.name).all())
+    elif group_by == "sku":
+        labels = dict(db.query(SKU.id, SKU.sku_code).filter(SKU.id.in_(list(totals))).all())
+    else:
+        labels = {key: key for key in totals}
+
+    result_rows = []
+    for key, revenues in totals.items():
+        current, previous = revenues[0], revenues[1] if years > 1 else 0.0
+        result_rows.append({
+            "key": key,
+            "label": labels.get(key, str(key)),
+            "revenue": [round(value, 0) for value in revenues],
+            "growth_pct": round((current - previous) / previous * 100, 1) if previous else None,
+        })
+    result_rows.sort(key=lambda row: -row["revenue"][0])
+
+    return {
+        "group_by": group_by,
+        "periods": [{"start": start.isoformat(), "end": end.isoformat()} for start, end in periods],
+        "rows": result_rows,
+    }
+
+
+CUBE_DIMENSIONS = ("region", "category", "sku", "month", "year")
+
+
+def cube_dimensions(group_by) -> tuple[str, ...]:
+    """Validate a group_by tuple or comma-separated string of CUBE_DIMENSIONS."""
+    if isinstance(group_by, str):
+        group_by = [part.strip() for part in group_by.split(",") if part.strip()]
+    group_by = tuple(group_by)
+    if not group_by or len(set(group_by)) != len(group_by) or any(dim not in CUBE_DIMENSIONS for dim in group_by):
+        raise ValueError(f"group_by must be distinct values from {list(CUBE_DIMENSIONS)}")
+    return group_by
+
+
+def _cube_from_sql(db: Session, start: date, end: date, group_by: tuple[str, ...]) -> list[dict]:
+    year = extract("year", SalesHistory.date)
+    month = extract("month", SalesHistory.date)
+    expressions = {
+        "region": (SalesHistory.region_id,),
+        "category": (Product.category,),
+        "sku": (SalesHistory.sku_id,),
+        "month": (year, month),
+        "year": (year,),
+    }
+    keys = [expr for dim in group_by for expr in expressions[dim]]
+    query = db.query(*keys, func.sum(SalesHistory.quantity_sold), func.sum(SalesHistory.revenue))
+    if "category" in group_by:
+        query = (
+            query.join(SKU, SKU.id == SalesHistory.sku_id)
+            .join(Shade, Shade.id == SKU.shade_id)
+            .join(Product, Product.id == Shade.product_id)
+        )
+    rows = []
+    for row in query.filter(SalesHistory.date >= start, SalesHistory.date <= end).group_by(*keys):
+        values = iter(row[:len(keys)])
+        item = {}
+        for dim in group_by:
+            if dim == "month":
+                item[dim] = f"{int(next(values)):04d}-{int(next(values)):02d}"
+            elif dim == "year":
+                item[dim] = int(next(values))
+            else:
+                item[dim] = next(values)
+        item["quantity_sold"] = int(row[-2] or 0)
+        item["revenue"] = float(row[-1] or 0.0)
+        rows.append(item)
+    return rows
+
+
+def get_revenue_cube(db: Session, days: int = 365, group_by: tuple[str, ...] = ("region", "category")) -> dict:
+    """
+    Revenue grouped by several dimensions at once (e.g. region x category, SKU x month), which
+    no single daily rollup holds. Served from the columnar mirror once the background sync has
+    exported it, so it may trail the latest writes by up to ANALYTICS_COLUMNAR_CHECK_SECONDS;
+    falls back to grouping sales_history in SQL.
+    """
+    group_by = cube_dimensions(group_by)
+    sim_date = get_simulation_date()
+    start_date = sim_date - timedelta(days=max(days, 1) - 1)
+
+    if ANALYTICS_COLUMNAR_ENABLED and sales_column_store.is_ready():
+        rows = sales_column_store.aggregate(start_date, sim_date, group_by)
+    else:
+        rows = _cube_from_sql(db, start_date, sim_date, group_by)
+
+    region_names = dict(db.query(Region.id, Region.name).all()) if "region" in group_by else {}
+    sku_codes = (
+        dict(db.query(SKU.id, SKU.sku_code).filter(SKU.id.in_({row["sku"] for row in rows})).all())
+        if "sku" in group_by else {}
+    )
+    for row in rows:
+        if "region" in row:
+            row["region_name"] = region_names.get(row["region"], "")
+        if "sku" in row:
+            row["sku_code"] = sku_codes.get(row["sku"], "")
+        row["revenue"] = round(row["revenue"], 0)
+    rows.sort(key=lambda row: (-row["revenue"], *(str(row[dim]) for dim in group_by)))
+
+    return {
+        "window_days": days,
+        "start_date": start_date.isoformat(),
+        "end_date": sim_date.isoformat(),
+        "group_by": list(group_by),
+        "rows": rows,
+    }
+
+
 def get_stockout_details(db: Session) -> list[dict]:
     """Detailed critical/low stockout rows for drill-down tables."""
     levels = (
@@ -287,39 +464,41 @@ def get_warehouse_utilization(db: Session) -> list[dict]:
 
 
 def get_dealer_revenue_trend(db: Session, dealer_id: int, months: int = 6) -> dict:
-    """Monthly delivered revenue trend for dealer analytics."""
+    """Monthly delivered revenue trend for dealer analytics, in one grouped query."""
     sim_date = get_simulation_date()
-    points: list[dict] = []
-    current_year = sim_date.year
-    current_month = sim_date.month
-
+    buckets: list[tuple[int, int]] = []
     for offset in range(months - 1, -1, -1):
-        month = current_month - offset
-        year = current_year
+        month = sim_date.month - offset
+        year = sim_date.year
         while month <= 0:
             month += 12
             year -= 1
-        month_start = date(year, month, 1)
-        if month == 12:
-            month_end = date(year + 1, 1, 1)
-        else:
-            month_end = date(year, month + 1, 1)
-        revenue = (
-            db.query(func.sum(DealerOrder.quantity * SKU.mrp))
-            .join(SKU, SKU.id == DealerOrder.sku_id)
-            .filter(
-                DealerOrder.dealer_id == dealer_id,
-                DealerOrder.status == "delivered",
-                DealerOrder.order_date >= month_start,
-                DealerOrder.order_date < month_end,
-            )
-            .scalar()
-            or 0
+        buckets.append((year, month))
+    if not buckets:
+        return {"months": months, "points": []}
+
+    first_year, first_month = buckets[0]
+    range_end = date(sim_date.year + (sim_date.month == 12), sim_date.month % 12 + 1, 1)
+    order_year = extract("year", DealerOrder.order_date)
+    order_month = extract("month", DealerOrder.order_date)
+    rows = (
+        db.query(order_year, order_month, func.sum(DealerOrder.quantity * SKU.mrp))
+        .join(SKU, SKU.id == DealerOrder.sku_id)
+        .filter(
+            DealerOrder.dealer_id == dealer_id,
+            DealerOrder.status == "delivered",
+            DealerOrder.order_date >= date(first_year, first_month, 1),
+            DealerOrder.order_date < range_end,
         )
-        points.append({
-            "month": f"{year}-{month:02d}",
-            "revenue": round(revenue, 0),
-        })
+        .group_by(order_year, order_month)
+        .all()
+    )
+    revenue_by_month = {(int(year), int(month)): revenue or 0 for year, month, revenue in rows}
+
+    points = [
+        {"month": f"{year}-{month:02d}", "revenue": round(revenue_by_month.get((year, month), 0), 0)}
+        for year, month in buckets
+    ]
     return {"months": months, "points": points}
 
 
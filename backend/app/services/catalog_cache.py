@@ -0,0 +1,65 @@
+"""
+In-process SKU catalog snapshot.
+
+Cart reads and writes need the name, colour, size and price of a SKU, but never anything that
+changes per request. The snapshot is loaded in one query and reused until a committed write
+touches skus or shades, which bumps their response-cache generations
+(response_cache.table_versions), so price and shade edits are picked up on the next access.
+"""
+
+import threading
+
+from app.database import SessionLocal
+from app.models import SKU, Shade
+from app.services.response_cache import response_cache
+
+
+_TABLES = ("skus", "shades")
+
+
+class CatalogCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._skus: dict[int, dict] = {}
+
+    def _load(self) -> dict[int, dict]:
+        # The primary, not a replica: a lagging replica would pin stale prices to the new version.
+        with SessionLocal() as db:
+            rows = (
+                db.query(SKU.id, SKU.sku_code, SKU.size, SKU.mrp, Shade.id, Shade.shade_name, Shade.hex_color)
+                .join(Shade, Shade.id == SKU.shade_id)
+                .all()
+            )
+        return {
+            sku_id: {
+                "sku_id": sku_id,
+                "sku_code": sku_code,
+                "size": size,
+                "mrp": mrp,
+                "shade_id": shade_id,
+                "shade_name": shade_name,
+                "hex_color": hex_color,
+            }
+            for sku_id, sku_code, size, mrp, shade_id, shade_name, hex_color in rows
+        }
+
+    def skus(self) -> dict[int, dict]:
+        version = response_cache.table_versions(_TABLES)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._skus = self._load()
+                    self._version = version
+        return self._skus
+
+    def get(self, sku_id: int) -> dict | None:
+        return self.skus().get(sku_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version = None
+            self._skus = {}
+
+
+catalog_cache = CatalogCache()
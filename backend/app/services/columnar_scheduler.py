@@ -0,0 +1,25 @@
+import asyncio
+
+from app.config import ANALYTICS_COLUMNAR_CHECK_SECONDS, ANALYTICS_COLUMNAR_ENABLED
+from app.services.columnar_store import sync_sales_column_store
+
+
+async def columnar_sync_loop(stop_event: asyncio.Event):
+    if not ANALYTICS_COLUMNAR_ENABLED:
+        print("Columnar analytics sync disabled (ANALYTICS_COLUMNAR_ENABLED=false).")
+        return
+
+    print(f"Columnar analytics sync active. Mirroring changed sales months every {ANALYTICS_COLUMNAR_CHECK_SECONDS}s")
+
+    while not stop_event.is_set():
+        try:
+            summary = await asyncio.to_thread(sync_sales_column_store)
+            if summary["exported"] or summary["removed"]:
+                print(f"Columnar sync exported {len(summary['exported'])} and removed {len(summary['removed'])} month(s).")
+        except Exception as exc:
+            print(f"Warning: Columnar analytics sync failed: {exc}")
+
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=max(5, ANALYTICS_COLUMNAR_CHECK_SECONDS))
+        except asyncio.TimeoutError:
+            continue
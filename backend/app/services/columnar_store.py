@@ -0,0 +1,317 @@
+"""
+Columnar mirror of sales_history for cross-dimension analytics.
+
+The daily rollups answer one dimension at a time (region, category or SKU per day); this
+mirror answers groupings the rollups cannot, such as region x category or SKU x month.
+Rows are exported per calendar month into one .npy file per column and read back with
+np.load(mmap_mode="r"), so aggregations run as vectorized NumPy operations over the
+page cache instead of materialising ORM rows. A manifest maps each month to its current
+partition directory together with a signature of the month's sales_history rows (row count,
+highest id, and checksums that weight quantity and revenue by SKU, region and day), so any
+row-level edit, including one that only moves sales between SKUs or regions, re-exports the
+month on the next sync. Every month is re-exported when the SKU -> category mapping changes.
+Syncs run in the background (columnar_scheduler), never on a request.
+"""
+
+import hashlib
+import json
+import os
+import secrets
+import shutil
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import BigInteger, cast, func, select
+from sqlalchemy.orm import Session
+
+from app.config import ANALYTICS_COLUMNAR_DIR
+from app.database import SessionLocal
+from app.file_lock import exclusive_lock
+from app.models import Product, SKU, SalesHistory, Shade
+
+
+EPOCH = date(1970, 1, 1)
+COLUMNS = {
+    "day": np.int32,  # days since EPOCH
+    "sku_id": np.int32,
+    "region_id": np.int32,
+    "category": np.int16,  # index into manifest["categories"]
+    "quantity_sold": np.int64,
+    "revenue": np.float64,
+}
+DIMENSIONS = ("region", "category", "sku", "day", "month", "year")
+_DIMENSION_COLUMNS = {"region": "region_id", "category": "category", "sku": "sku_id", "day": "day"}
+_MANIFEST = "manifest.json"
+
+
+def _month_key(day: date) -> str:
+    return f"{day.year:04d}-{day.month:02d}"
+
+
+def _month_bounds(month: str) -> tuple[date, date]:
+    year, month_num = (int(part) for part in month.split("-"))
+    first = date(year, month_num, 1)
+    following = date(year + (month_num == 12), month_num % 12 + 1, 1)
+    return first, following - timedelta(days=1)
+
+
+def _months_between(start: date, end: date) -> list[str]:
+    months = []
+    current = date(start.year, start.month, 1)
+    while current <= end:
+        months.append(_month_key(current))
+        current = date(current.year + (current.month == 12), current.month % 12 + 1, 1)
+    return months
+
+
+class SalesColumnStore:
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._manifest: dict | None = None
+        self._manifest_mtime = 0
+        self._partitions: dict[str, dict[str, np.ndarray]] = {}
+
+    # ─── Manifest ───
+
+    def _manifest_path(self) -> Path:
+        return self.directory / _MANIFEST
+
+    def _read_manifest(self) -> dict:
+        path = self._manifest_path()
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return {"categories": [], "months": {}, "catalog": None}
+        if self._manifest is None or mtime != self._manifest_mtime:
+            self._manifest = json.loads(path.read_text())
+            self._manifest_mtime = mtime
+        return self._manifest
+
+    def _write_manifest(self, manifest: dict) -> None:
+        tmp = self.directory / f".{_MANIFEST}.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps(manifest, sort_keys=True))
+        os.replace(tmp, self._manifest_path())
+        self._manifest = manifest
+        self._manifest_mtime = self._manifest_path().stat().st_mtime_ns
+
+    # ─── Mirroring ───
+
+    def _month_signatures(self, db: Session) -> dict[str, list]:
+        """
+        Per-month [rows, max id, quantity, quantity checksum, revenue checksum] over sales_history.
+
+        The checksums weight each row's quantity and revenue (in hundredths) by its SKU and region,
+        and each day's sums by the day of the month, so moving sales between SKUs, regions or
+        days changes them even when the month's totals do not. All integer, so a signature
+        never drifts with float summation order.
+        """
+        weight = cast(SalesHistory.sku_id, BigInteger) * 31 + SalesHistory.region_id
+        hundredths = cast(func.round(SalesHistory.revenue * 100), BigInteger)
+        quantity = cast(SalesHistory.quantity_sold, BigInteger)
+        rows = db.execute(
+            select(
+                SalesHistory.date,
+                func.count(SalesHistory.id),
+                func.max(SalesHistory.id),
+                func.sum(quantity),
+                func.sum(quantity * weight),
+                func.sum(hundredths * weight),
+            ).group_by(SalesHistory.date)
+        )
+        signatures: dict[str, list] = {}
+        for day, count, max_id, qty, qty_checksum, revenue_checksum in rows:
+            bucket = signatures.setdefault(_month_key(day), [0, 0, 0, 0, 0])
+            bucket[0] += int(count)
+            bucket[1] = max(bucket[1], int(max_id))
+            bucket[2] += int(qty or 0)
+            bucket[3] += int(qty_checksum or 0) * day.day
+            bucket[4] += int(revenue_checksum or 0) * day.day
+        return signatures
+
+    def _catalog_signature(self, db: Session) -> str:
+        """Fingerprint of the SKU -> category mapping baked into every exported partition."""
+        rows = db.execute(
+            select(SKU.id, Product.category)
+            .join(Shade, Shade.id == SKU.shade_id)
+            .join(Product, Product.id == Shade.product_id)
+            .order_by(SKU.id)
+        ).all()
+        return hashlib.sha1(json.dumps([list(row) for row in rows]).encode("utf-8")).hexdigest()
+
+    def _export_month(self, db: Session, month: str, categories: list[str]) -> tuple[str, int]:
+        first, last = _month_bounds(month)
+        rows = db.execute(
+            select(
+                SalesHistory.date,
+                SalesHistory.sku_id,
+                SalesHistory.region_id,
+                Product.category,
+                SalesHistory.quantity_sold,
+                SalesHistory.revenue,
+            )
+            .join(SKU, SKU.id == SalesHistory.sku_id)
+            .join(Shade, Shade.id == SKU.shade_id)
+            .join(Product, Product.id == Shade.product_id)
+            .where(SalesHistory.date >= first, SalesHistory.date <= last)
+        ).all()
+
+        category_codes = {name: idx for idx, name in enumerate(categories)}
+        for row in rows:
+            if row[3] not in category_codes:
+                category_codes[row[3]] = len(categories)
+                categories.append(row[3])
+
+        columns = {
+            "day": [(row[0] - EPOCH).days for row in rows],
+            "sku_id": [row[1] for row in rows],
+            "region_id": [row[2] for row in rows],
+            "category": [category_codes[row[3]] for row in rows],
+            "quantity_sold": [row[4] or 0 for row in rows],
+            "revenue": [row[5] or 0.0 for row in rows],
+        }
+        name = f"{month}.{secrets.token_hex(4)}"
+        staging = self.directory / f".{name}.tmp"
+        staging.mkdir(parents=True)
+        for column, dtype in COLUMNS.items():
+            np.save(staging / f"{column}.npy", np.asarray(columns[column], dtype=dtype))
+        os.replace(staging, self.directory / name)
+        return name, len(rows)
+
+    def sync(self, db: Session) -> dict:
+        """Re-export months whose rows changed since the last export; drop vanished months."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Serialises exporters across worker processes; readers never take this lock.
+        with exclusive_lock(self.directory / ".lock"):
+            manifest = json.loads(json.dumps(self._read_manifest()))
+            signatures = self._month_signatures(db)
+            catalog = self._catalog_signature(db)
+            months = manifest["months"]
+            catalog_changed = manifest.get("catalog") != catalog
+            if catalog_changed:
+                # A category edit moves rows between categories without changing any month's totals.
+                months.clear()
+                manifest["catalog"] = catalog
+            exported = []
+            for month, signature in sorted(signatures.items()):
+                current = months.get(month)
+                if current is None or current["signature"] != signature:
+                    directory, rows = self._export_month(db, month, manifest["categories"])
+                    months[month] = {"dir": directory, "rows": rows, "signature": signature}
+                    exported.append(month)
+            removed = [month for month in months if month not in signatures]
+            for month in removed:
+                del months[month]
+            if exported or removed or catalog_changed:
+                self._write_manifest(manifest)
+                self._remove_unreferenced({entry["dir"] for entry in months.values()})
+        return {"exported": exported, "removed": removed, "months": len(months)}
+
+    def _remove_unreferenced(self, referenced: set[str]) -> None:
+        # Readers that still hold an old partition mmapped keep a valid view after the unlink.
+        for path in self.directory.iterdir():
+            if path.is_dir() and not path.name.startswith(".") and path.name not in referenced:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def is_ready(self) -> bool:
+        """True once a sync has exported at least one month."""
+        with self._lock:
+            return bool(self._read_manifest()["months"])
+
+    # ─── Queries ───
+
+    def _load(self, directory: str) -> dict[str, np.ndarray]:
+        partition = self._partitions.get(directory)
+        if partition is None:
+            partition = {
+                # Plain ndarray views over the mapping: slicing np.memmap objects is much slower.
+                column: np.asarray(np.load(self.directory / directory / f"{column}.npy", mmap_mode="r"))
+                for column in COLUMNS
+            }
+            self._partitions[directory] = partition
+        return partition
+
+    def aggregate(self, start: date, end: date, group_by: tuple[str, ...]) -> list[dict]:
+        """Sum quantity_sold and revenue over [start, end] grouped by the given dimensions."""
+        unknown = [dim for dim in group_by if dim not in DIMENSIONS]
+        if unknown or not group_by:
+            raise ValueError(f"group_by must be drawn from {DIMENSIONS}, got {group_by}")
+
+        with self._lock:
+            manifest = self._read_manifest()
+            live = {entry["dir"] for entry in manifest["months"].values()}
+            for stale in set(self._partitions) - live:
+                del self._partitions[stale]
+            partitions = [
+                (month, self._load(manifest["months"][month]["dir"]))
+                for month in _months_between(start, end)
+                if month in manifest["months"]
+            ]
+        categories = manifest["categories"]
+
+        start_day, end_day = (start - EPOCH).days, (end - EPOCH).days
+        keys: list[np.ndarray] = []
+        quantities: list[np.ndarray] = []
+        revenues: list[np.ndarray] = []
+        for month, columns in partitions:
+            mask = (columns["day"] >= start_day) & (columns["day"] <= end_day)
+            count = int(mask.sum())
+            if not count:
+                continue
+            year, month_num = (int(part) for part in month.split("-"))
+            parts = []
+            for dim in group_by:
+                if dim == "month":
+                    parts.append(np.full(count, year * 12 + month_num - 1, dtype=np.int64))
+                elif dim == "year":
+                    parts.append(np.full(count, year, dtype=np.int64))
+                else:
+                    parts.append(columns[_DIMENSION_COLUMNS[dim]][mask].astype(np.int64))
+            keys.append(np.stack(parts, axis=1))
+            quantities.append(columns["quantity_sold"][mask])
+            revenues.append(columns["revenue"][mask])
+
+        if not keys:
+            return []
+        stacked = np.concatenate(keys)
+        # Factorise each dimension, then fold the codes into one int64 key so grouping is a
+        # single 1-D unique + bincount rather than a row-wise unique over a 2-D array.
+        levels, codes = zip(*(np.unique(stacked[:, idx], return_inverse=True) for idx in range(len(group_by))))
+        combined = np.ravel_multi_index(codes, tuple(len(level) for level in levels))
+        group_ids, inverse = np.unique(combined, return_inverse=True)
+        qty_totals = np.bincount(inverse, weights=np.concatenate(quantities), minlength=len(group_ids))
+        revenue_totals = np.bincount(inverse, weights=np.concatenate(revenues), minlength=len(group_ids))
+        group_codes = np.unravel_index(group_ids, tuple(len(level) for level in levels))
+        unique_keys = zip(*(level[code].tolist() for level, code in zip(levels, group_codes)))
+
+        result = []
+        for key, qty, revenue in zip(unique_keys, qty_totals.tolist(), revenue_totals.tolist()):
+            item = {dim: self._decode(dim, value, categories) for dim, value in zip(group_by, key)}
+            item["quantity_sold"] = int(qty)
+            item["revenue"] = revenue
+            result.append(item)
+        return result
+
+    @staticmethod
+    def _decode(dim: str, value: int, categories: list[str]):
+        if dim == "category":
+            return categories[value]
+        if dim == "day":
+            return EPOCH + timedelta(days=value)
+        if dim == "month":
+            return f"{value // 12:04d}-{value % 12 + 1:02d}"
+        return value
+
+
+sales_column_store = SalesColumnStore(ANALYTICS_COLUMNAR_DIR)
+
+
+def sync_sales_column_store() -> dict:
+    """Sync the shared store in its own session (scheduler entry point)."""
+    db = SessionLocal()
+    try:
+        return sales_column_store.sync(db)
+    finally:
+        db.close()
@@ -1,11 +1,17 @@
+from collections import defaultdict
+from sqlalchemy import delete, update
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from datetime import datetime
 
+from app.database import dialect_insert
 from app.models.customer import Cart, Wishlist, CustomerOrder, CustomerOrderItem
 from app.models.product import SKU, Shade
 from app.models.dealer import Dealer
 from app.models.user import User
+from app.pagination import before_keyset, decode_cursor, encode_cursor
+from app.services.catalog_cache import catalog_cache
+from app.services.reservation_service import consume_order_stock, release_order_stock, reserve_stock
 
 
 DEALER_REQUEST_TRANSITIONS = {
@@ -54,96 +60,116 @@ def _notify_user_ids(
 
 # ─── Cart ────────────────────────────────────────────────────────────────────
 
-def get_cart(db: Session, user_id: int):
-    """Return cart items with full SKU and shade details."""
-    items = (
-        db.query(Cart, SKU, Shade)
-        .join(SKU, Cart.sku_id == SKU.id)
-        .join(Shade, SKU.shade_id == Shade.id)
-        .filter(Cart.user_id == user_id)
-        .all()
-    )
-    result = []
-    for cart_item, sku, shade in items:
-        result.append({
-            "cart_id": cart_item.id,
-            "sku_id": sku.id,
-            "sku_code": sku.sku_code,
-            "shade_name": shade.shade_name,
-            "hex_color": shade.hex_color,
-            "shade_id": shade.id,
-            "size": sku.size,
-            "mrp": sku.mrp,
-            "quantity": cart_item.quantity,
-            "subtotal": round(sku.mrp * cart_item.quantity, 2),
-            "added_at": cart_item.added_at.isoformat() if cart_item.added_at else None,
-        })
+def _cart_item_dict(cart_id: int, sku: dict, quantity: int, added_at: datetime | None) -> dict:
+    return {
+        "cart_id": cart_id,
+        "sku_id": sku["sku_id"],
+        "sku_code": sku["sku_code"],
+        "shade_name": sku["shade_name"],
+        "hex_color": sku["hex_color"],
+        "shade_id": sku["shade_id"],
+        "size": sku["size"],
+        "mrp": sku["mrp"],
+        "quantity": quantity,
+        "subtotal": round(sku["mrp"] * quantity, 2),
+        "added_at": added_at.isoformat() if added_at else None,
+    }
+
+
+def _cart_response(rows) -> dict:
+    """Price (cart_id, sku_id, quantity, added_at) rows from the catalog cache."""
+    skus = catalog_cache.skus()
+    result = [
+        _cart_item_dict(cart_id, skus[sku_id], quantity, added_at)
+        for cart_id, sku_id, quantity, added_at in sorted(rows)
+        if sku_id in skus
+    ]
     total = round(sum(item["subtotal"] for item in result), 2)
     return {"items": result, "total": total, "count": len(result)}
 
 
-def add_to_cart(db: Session, user_id: int, sku_id: int, quantity: int):
-    """Add item to cart, or increment quantity if already present."""
-    # Validate SKU exists
-    sku = db.query(SKU).filter(SKU.id == sku_id).first()
-    if not sku:
+def _require_catalog_skus(sku_ids) -> None:
+    skus = catalog_cache.skus()
+    missing = sorted(sku_id for sku_id in set(sku_ids) if sku_id not in skus)
+    if len(missing) == 1:
         raise HTTPException(status_code=404, detail="SKU not found")
+    if missing:
+        raise HTTPException(status_code=404, detail=f"SKUs not found: {missing}")
 
-    existing = (
-        db.query(Cart)
-        .filter(Cart.user_id == user_id, Cart.sku_id == sku_id)
-        .first()
-    )
-    if existing:
-        existing.quantity += quantity
-        db.commit()
-        db.refresh(existing)
-        return {"message": "Cart updated", "cart_id": existing.id, "quantity": existing.quantity}
 
-    cart_item = Cart(
-        user_id=user_id,
-        sku_id=sku_id,
-        quantity=quantity,
-        added_at=datetime.utcnow(),
-    )
-    db.add(cart_item)
+def get_cart(db: Session, user_id: int):
+    """Return cart items with full SKU and shade details."""
+    rows = db.query(Cart.id, Cart.sku_id, Cart.quantity, Cart.added_at).filter(Cart.user_id == user_id).all()
+    return _cart_response(rows)
+
+
+def add_to_cart(db: Session, user_id: int, sku_id: int, quantity: int):
+    """Add item to cart, or increment quantity if already present (one upsert on (user_id, sku_id))."""
+    _require_catalog_skus([sku_id])
+
+    insert = dialect_insert(db)
+    stmt = insert(Cart).values(user_id=user_id, sku_id=sku_id, quantity=quantity, added_at=datetime.utcnow())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "sku_id"],
+        set_={"quantity": Cart.quantity + stmt.excluded.quantity},
+    ).returning(Cart.id, Cart.quantity)
+    cart_id, new_quantity = db.execute(stmt).one()
+    db.commit()
+    message = "Added to cart" if new_quantity == quantity else "Cart updated"
+    return {"message": message, "cart_id": cart_id, "quantity": new_quantity}
+
+
+def set_cart(db: Session, user_id: int, lines: list[tuple[int, int]]):
+    """Replace the cart with the given (sku_id, quantity) lines; a repeated SKU keeps its last quantity."""
+    quantities = dict(lines)
+    _require_catalog_skus(quantities)
+
+    stale = delete(Cart).where(Cart.user_id == user_id)
+    if quantities:
+        stale = stale.where(Cart.sku_id.not_in(list(quantities)))
+    db.execute(stale)
+
+    rows = []
+    if quantities:
+        insert = dialect_insert(db)
+        now = datetime.utcnow()
+        stmt = insert(Cart).values([
+            {"user_id": user_id, "sku_id": sku_id, "quantity": quantity, "added_at": now}
+            for sku_id, quantity in quantities.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "sku_id"],
+            set_={"quantity": stmt.excluded.quantity},
+        ).returning(Cart.id, Cart.sku_id, Cart.quantity, Cart.added_at)
+        rows = db.execute(stmt).all()
     db.commit()
-    db.refresh(cart_item)
-    return {"message": "Added to cart", "cart_id": cart_item.id, "quantity": cart_item.quantity}
+    return _cart_response(rows)
 
 
 def update_cart_item(db: Session, user_id: int, cart_id: int, quantity: int):
     """Update cart item quantity. Remove if quantity is 0."""
-    item = (
-        db.query(Cart)
-        .filter(Cart.id == cart_id, Cart.user_id == user_id)
-        .first()
-    )
-    if not item:
-        raise HTTPException(status_code=404, detail="Cart item not found")
-
     if quantity <= 0:
-        db.delete(item)
-        db.commit()
-        return {"message": "Item removed from cart"}
-
-    item.quantity = quantity
+        return remove_from_cart(db, user_id, cart_id)
+
+    row = db.execute(
+        update(Cart)
+        .where(Cart.id == cart_id, Cart.user_id == user_id)
+        .values(quantity=quantity)
+        .returning(Cart.id, Cart.quantity)
+    ).one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Cart item not found")
     db.commit()
-    db.refresh(item)
-    return {"message": "Cart updated", "cart_id": item.id, "quantity": item.quantity}
+    return {"message": "Cart updated", "cart_id": row.id, "quantity": row.quantity}
 
 
 def remove_from_cart(db: Session, user_id: int, cart_id: int):
     """Delete a cart item."""
-    item = (
-        db.query(Cart)
-        .filter(Cart.id == cart_id, Cart.user_id == user_id)
-        .first()
-    )
-    if not item:
+    deleted = db.execute(
+        delete(Cart).where(Cart.id == cart_id, Cart.user_id == user_id).returning(Cart.id)
+    ).scalar_one_or_none()
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Cart item not found")
-
-    db.delete(item)
     db.commit()
     return {"message": "Item removed from cart"}
 
@@ -222,7 +248,7 @@ def remove_from_wishlist(db: Session, user_id: int, wishlist_id: int):
 # ─── Checkout & Orders ──────────────────────────────────────────────────────
 
 def checkout(db: Session, user_id: int, dealer_id: int):
-    """Create a CustomerOrder from the user's cart items."""
+    """Create a CustomerOrder from the user's cart items, reserving the stock at the dealer's warehouse."""
     # Validate dealer
     dealer = db.query(Dealer).filter(Dealer.id == dealer_id).first()
     if not dealer:
@@ -276,7 +302,16 @@ def checkout(db: Session, user_id: int, dealer_id: int):
 
         # Clear cart
         db.query(Cart).filter(Cart.user_id == user_id).delete()
+        db.flush()
 
+        # Last call before commit; its conditional UPDATE is its final statement, so inventory
+        # row locks are held as briefly as possible.
+        reserve_stock(
+            db,
+            order.id,
+            dealer.warehouse_id,
+            {item["sku_id"]: item["quantity"] for item in order_items_data},
+        )
         db.commit()
         db.refresh(order)
     except HTTPException:
@@ -323,45 +358,75 @@ def checkout(db: Session, user_id: int, dealer_id: int):
     }
 
 
-def get_my_orders(db: Session, user_id: int):
-    """Return all orders for a user with item details."""
+def _order_item_dict(item: CustomerOrderItem, sku: SKU, shade: Shade) -> dict:
+    return {
+        "item_id": item.id,
+        "sku_id": sku.id,
+        "sku_code": sku.sku_code,
+        "shade_name": shade.shade_name,
+        "hex_color": shade.hex_color,
+        "size": sku.size,
+        "quantity": item.quantity,
+        "unit_price": item.unit_price,
+        "subtotal": round(item.unit_price * item.quantity, 2),
+    }
+
+
+def _items_by_order(db: Session, order_ids: list[int]) -> dict[int, list[dict]]:
+    """Items (with SKU/shade details) for many orders in one IN query."""
+    items: dict[int, list[dict]] = defaultdict(list)
+    if not order_ids:
+        return items
+    rows = (
+        db.query(CustomerOrderItem, SKU, Shade)
+        .join(SKU, CustomerOrderItem.sku_id == SKU.id)
+        .join(Shade, SKU.shade_id == Shade.id)
+        .filter(CustomerOrderItem.order_id.in_(order_ids))
+        .order_by(CustomerOrderItem.id)
+        .all()
+    )
+    for item, sku, shade in rows:
+        items[item.order_id].append(_order_item_dict(item, sku, shade))
+    return items
+
+
+def _keyset_page(query, limit: int, cursor: str | None, offset: int = 0) -> tuple[list[CustomerOrder], str | None]:
+    """One page of orders newest first, plus the cursor for the next page (None on the last)."""
+    if cursor:
+        created_at, order_id = decode_cursor(cursor, datetime, int)
+        query = query.filter(before_keyset(CustomerOrder.created_at, CustomerOrder.id, created_at, order_id))
     orders = (
-        db.query(CustomerOrder)
-        .filter(CustomerOrder.user_id == user_id)
-        .order_by(CustomerOrder.created_at.desc())
+        query.order_by(CustomerOrder.created_at.desc(), CustomerOrder.id.desc())
+        .offset(offset)
+        .limit(limit + 1)
         .all()
     )
-    result = []
-    for order in orders:
-        items = (
-            db.query(CustomerOrderItem, SKU, Shade)
-            .join(SKU, CustomerOrderItem.sku_id == SKU.id)
-            .join(Shade, SKU.shade_id == Shade.id)
-            .filter(CustomerOrderItem.order_id == order.id)
-            .all()
-        )
-        order_items = []
-        for oi, sku, shade in items:
-            order_items.append({
-                "item_id": oi.id,
-                "sku_id": sku.id,
-                "sku_code": sku.sku_code,
-                "shade_name": shade.shade_name,
-                "hex_color": shade.hex_color,
-                "size": sku.size,
-                "quantity": oi.quantity,
-                "unit_price": oi.unit_price,
-                "subtotal": round(oi.unit_price * oi.quantity, 2),
-            })
-        result.append({
-            "order_id": order.id,
-            "status": _normalize_request_status(order.status),
-            "total_amount": order.total_amount,
-            "dealer_id": order.dealer_id,
-            "created_at": order.created_at.isoformat() if order.created_at else None,
-            "items": order_items,
-        })
-    return result
+    if len(orders) <= limit:
+        return orders, None
+    last = orders[limit - 1]
+    return orders[:limit], encode_cursor(last.created_at, last.id)
+
+
+def get_my_orders(db: Session, user_id: int, limit: int = 20, cursor: str | None = None):
+    """One page of a user's orders with item details: two queries whatever the history size."""
+    orders, next_cursor = _keyset_page(
+        db.query(CustomerOrder).filter(CustomerOrder.user_id == user_id), limit, cursor
+    )
+    items = _items_by_order(db, [order.id for order in orders])
+    return {
+        "orders": [
+            {
+                "order_id": order.id,
+                "status": _normalize_request_status(order.status),
+                "total_amount": order.total_amount,
+                "dealer_id": order.dealer_id,
+                "created_at": order.created_at.isoformat() if order.created_at else None,
+                "items": items[order.id],
+            }
+            for order in orders
+        ],
+        "next_cursor": next_cursor,
+    }
 
 
 def get_order_detail(db: Session, user_id: int, order_id: int):
@@ -374,33 +439,13 @@ def get_order_detail(db: Session, user_id: int, order_id: int):
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
-    items = (
-        db.query(CustomerOrderItem, SKU, Shade)
-        .join(SKU, CustomerOrderItem.sku_id == SKU.id)
-        .join(Shade, SKU.shade_id == Shade.id)
-        .filter(CustomerOrderItem.order_id == order.id)
-        .all()
-    )
-    order_items = []
-    for oi, sku, shade in items:
-        order_items.append({
-            "item_id": oi.id,
-            "sku_id": sku.id,
-            "sku_code": sku.sku_code,
-            "shade_name": shade.shade_name,
-            "hex_color": shade.hex_color,
-            "size": sku.size,
-            "quantity": oi.quantity,
-            "unit_price": oi.unit_price,
-            "subtotal": round(oi.unit_price * oi.quantity, 2),
-        })
     return {
         "order_id": order.id,
         "status": _normalize_request_status(order.status),
         "total_amount": order.total_amount,
         "dealer_id": order.dealer_id,
         "created_at": order.created_at.isoformat() if order.created_at else None,
-        "items": order_items,
+        "items": _items_by_order(db, [order.id])[order.id],
     }
 
 
@@ -410,8 +455,14 @@ def get_dealer_customer_requests(
     status: str | None = None,
     page: int = 1,
     per_page: int = 20,
+    cursor: str | None = None,
 ):
-    """List customer order requests assigned to a dealer."""
+    """
+    List customer order requests assigned to a dealer.
+
+    Pages are keyset slices when a cursor is given (page is then ignored) and offset pages
+    otherwise; either way a page costs four queries: count, orders, items and customers.
+    """
     query = db.query(CustomerOrder).filter(CustomerOrder.dealer_id == dealer_id)
     if status:
         requested_status = status.lower()
@@ -423,38 +474,16 @@ def get_dealer_customer_requests(
             query = query.filter(CustomerOrder.status == requested_status)
 
     total = query.count()
-    orders = (
-        query.order_by(CustomerOrder.created_at.desc())
-        .offset((page - 1) * per_page)
-        .limit(per_page)
-        .all()
-    )
+    offset = 0 if cursor else (page - 1) * per_page
+    orders, next_cursor = _keyset_page(query, per_page, cursor, offset)
+
+    items = _items_by_order(db, [order.id for order in orders])
+    user_ids = {order.user_id for order in orders}
+    customers = {user.id: user for user in db.query(User).filter(User.id.in_(user_ids))} if user_ids else {}
 
     requests = []
     for order in orders:
-        customer = db.query(User).filter(User.id == order.user_id).first()
-        items = (
-            db.query(CustomerOrderItem, SKU, Shade)
-            .join(SKU, CustomerOrderItem.sku_id == SKU.id)
-            .join(Shade, SKU.shade_id == Shade.id)
-            .filter(CustomerOrderItem.order_id == order.id)
-            .all()
-        )
-
-        request_items = []
-        for item, sku, shade in items:
-            request_items.append({
-                "item_id": item.id,
-                "sku_id": sku.id,
-                "sku_code": sku.sku_code,
-                "shade_name": shade.shade_name,
-                "hex_color": shade.hex_color,
-                "size": sku.size,
-                "quantity": item.quantity,
-                "unit_price": item.unit_price,
-                "subtotal": round(item.unit_price * item.quantity, 2),
-            })
-
+        customer = customers.get(order.user_id)
         normalized_status = _normalize_request_status(order.status)
         allowed_transitions = sorted(list(DEALER_REQUEST_TRANSITIONS.get(normalized_status, set())))
 
@@ -470,7 +499,7 @@ def get_dealer_customer_requests(
                 "phone": customer.phone if customer else None,
                 "email": customer.email if customer else None,
             },
-            "items": request_items,
+            "items": items[order.id],
         })
 
     return {
@@ -478,6 +507,7 @@ def get_dealer_customer_requests(
         "total": total,
         "page": page,
         "per_page": per_page,
+        "next_cursor": next_cursor,
     }
 
 
@@ -508,6 +538,10 @@ def update_dealer_customer_request_status(
 
     try:
         order.status = target
+        if target == "fulfilled":
+            consume_order_stock(db, order.id)
+        elif target == "cancelled":
+            release_order_stock(db, order.id)
         db.commit()
     except Exception as exc:
         db.rollback()
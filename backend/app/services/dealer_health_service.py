@@ -0,0 +1,383 @@
+"""
+Maintained dealer health scores.
+
+dealer_health_scores holds one row per dealer for period "all" (the dashboard score) and one
+per month with orders ("YYYY-MM", the trend history), together with the aggregates each score
+is built from. Rows are refreshed incrementally instead of being recomputed on every read: a
+Session hook records the dealers (and order months) whose orders changed and the dealers or
+warehouses whose stock changed, and right before that session commits refreshes only the
+affected rows, in the same transaction. A refresh is a fixed number of grouped queries
+however many dealers it covers, and locks the dealers' rows first so concurrent refreshes of
+one dealer run one after another instead of overwriting each other.
+
+Monthly rows hold only that month's order aggregates, counted over the whole month; their
+stored health_score is the order part of the trend score. Reads add the dealer's current stock
+signal, and compute the current and later months live so they stay cut at the simulation date
+as it advances.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event, extract, func, inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+from app.config import get_simulation_date
+from app.models import Dealer, DealerHealthScore, DealerOrder, InventoryLevel, SKU
+
+
+logger = logging.getLogger("paintflow.dealer_health")
+
+LIFETIME = "all"
+_PENDING_KEY = "dealer_health_pending"
+_SCORE_FIELDS = (
+    "health_score", "total_orders", "delivered_orders", "unique_skus", "delivered_revenue",
+    "inventory_levels", "avg_days_of_cover", "stockout_count", "low_cover_count",
+)
+
+
+def month_period(value: date) -> str:
+    return f"{value.year:04d}-{value.month:02d}"
+
+
+def _period_start(period: str) -> datetime:
+    year, month = (int(part) for part in period.split("-"))
+    return datetime(year, month, 1)
+
+
+# ─── Scoring ───
+
+def stock_signal(avg_days_of_cover: float | None) -> float:
+    if avg_days_of_cover is None:
+        return 50.0
+    return min(100.0, max(0.0, float(avg_days_of_cover) / 30 * 100))
+
+
+def lifetime_health_score(
+    inventory_levels: int,
+    avg_cover: float | None,
+    stockout_count: int,
+    total_orders: int,
+    delivered_orders: int,
+    unique_skus: int,
+) -> float:
+    """
+    Health score 0-100:
+    40% stock coverage, 25% stockout frequency,
+    20% order fulfillment, 15% product breadth
+    """
+    if not inventory_levels:
+        return 50.0
+
+    coverage_score = min(100, avg_cover / 30 * 100)
+    stockout_score = max(0, 100 - stockout_count * 15)
+    fulfillment_score = (delivered_orders / max(total_orders, 1)) * 100
+    breadth_score = min(100, unique_skus / 20 * 100)
+
+    return round(
+        0.4 * coverage_score + 0.25 * stockout_score +
+        0.2 * fulfillment_score + 0.15 * breadth_score, 1
+    )
+
+
+def _monthly_order_score(total_orders: int, delivered_orders: int, unique_skus: int) -> float:
+    fulfillment = (delivered_orders / max(total_orders, 1)) * 100
+    breadth = min(100.0, (unique_skus / 12) * 100)
+    return (0.5 * fulfillment) + (0.3 * breadth)
+
+
+def monthly_health_score(total_orders: int, delivered_orders: int, unique_skus: int, signal: float) -> float:
+    """Trend score: 50% fulfillment, 30% breadth (12 SKUs = full), 20% current stock signal."""
+    return round(_monthly_order_score(total_orders, delivered_orders, unique_skus) + (0.2 * signal), 1)
+
+
+# ─── Computation ───
+
+def _order_aggregates(*group_by):
+    delivered = DealerOrder.status == "delivered"
+    return (
+        *group_by,
+        func.count(DealerOrder.id).label("total_orders"),
+        func.count(DealerOrder.id).filter(delivered).label("delivered_orders"),
+        func.count(func.distinct(DealerOrder.sku_id)).label("unique_skus"),
+        func.sum(DealerOrder.quantity * SKU.mrp).filter(delivered).label("delivered_revenue"),
+    )
+
+
+def compute_dealer_health(
+    db: Session,
+    targets: dict[int, set[str]],
+    as_of: date | None = None,
+) -> dict[tuple[int, str], dict]:
+    """
+    Stored-form values for each (dealer_id, period) in targets, without reading or writing rows.
+
+    Monthly values carry order aggregates only; as_of cuts them at that day instead of
+    counting the whole month.
+    """
+    warehouses = dict(db.query(Dealer.id, Dealer.warehouse_id).filter(Dealer.id.in_(list(targets))).all())
+    if not warehouses:
+        return {}
+
+    lifetime_ids = [dealer_id for dealer_id, periods in targets.items() if LIFETIME in periods and dealer_id in warehouses]
+    # Only lifetime scores include stock; monthly ones add it at read time.
+    stock = {}
+    if lifetime_ids:
+        stock = {
+            row.warehouse_id: row
+            for row in db.query(
+                InventoryLevel.warehouse_id,
+                func.count(InventoryLevel.id).label("levels"),
+                func.avg(InventoryLevel.days_of_cover).label("avg_cover"),
+                func.count(InventoryLevel.id).filter(InventoryLevel.days_of_cover < 3).label("stockouts"),
+                func.count(InventoryLevel.id).filter(InventoryLevel.days_of_cover < 14).label("low_cover"),
+            )
+            .filter(InventoryLevel.warehouse_id.in_({warehouses[dealer_id] for dealer_id in lifetime_ids}))
+            .group_by(InventoryLevel.warehouse_id)
+        }
+
+    orders: dict[tuple[int, str], object] = {}
+    if lifetime_ids:
+        for row in (
+            db.query(*_order_aggregates(DealerOrder.dealer_id))
+            .outerjoin(SKU, SKU.id == DealerOrder.sku_id)
+            .filter(DealerOrder.dealer_id.in_(lifetime_ids))
+            .group_by(DealerOrder.dealer_id)
+        ):
+            orders[(row.dealer_id, LIFETIME)] = row
+
+    monthly = {
+        (dealer_id, period)
+        for dealer_id, periods in targets.items()
+        for period in periods
+        if period != LIFETIME and dealer_id in warehouses
+    }
+    if monthly:
+        year = extract("year", DealerOrder.order_date).label("year")
+        month = extract("month", DealerOrder.order_date).label("month")
+        query = (
+            db.query(*_order_aggregates(DealerOrder.dealer_id, year, month))
+            .outerjoin(SKU, SKU.id == DealerOrder.sku_id)
+            .filter(
+                DealerOrder.dealer_id.in_({dealer_id for dealer_id, _ in monthly}),
+                DealerOrder.order_date >= min(_period_start(period) for _, period in monthly),
+            )
+        )
+        if as_of is not None:
+            query = query.filter(DealerOrder.order_date < datetime(as_of.year, as_of.month, as_of.day) + timedelta(days=1))
+        for row in query.group_by(DealerOrder.dealer_id, year, month):
+            key = (row.dealer_id, f"{int(row.year):04d}-{int(row.month):02d}")
+            if key in monthly:
+                orders[key] = row
+
+    values = {}
+    for dealer_id, periods in targets.items():
+        if dealer_id not in warehouses:
+            continue
+        warehouse_stock = stock.get(warehouses[dealer_id])
+        levels = warehouse_stock.levels if warehouse_stock else 0
+        avg_cover = float(warehouse_stock.avg_cover) if warehouse_stock and warehouse_stock.avg_cover is not None else None
+        stockouts = warehouse_stock.stockouts if warehouse_stock else 0
+        for period in periods:
+            order_row = orders.get((dealer_id, period))
+            total = order_row.total_orders if order_row else 0
+            delivered = order_row.delivered_orders if order_row else 0
+            unique_skus = order_row.unique_skus if order_row else 0
+            data = {
+                "total_orders": total,
+                "delivered_orders": delivered,
+                "unique_skus": unique_skus,
+                "delivered_revenue": float((order_row.delivered_revenue if order_row else None) or 0.0),
+            }
+            if period == LIFETIME:
+                data.update(
+                    health_score=lifetime_health_score(levels, avg_cover, stockouts, total, delivered, unique_skus),
+                    inventory_levels=levels,
+                    avg_days_of_cover=avg_cover,
+                    stockout_count=stockouts,
+                    low_cover_count=warehouse_stock.low_cover if warehouse_stock else 0,
+                )
+            else:
+                data.update(
+                    health_score=round(_monthly_order_score(total, delivered, unique_skus), 1),
+                    inventory_levels=0,
+                    avg_days_of_cover=None,
+                    stockout_count=0,
+                    low_cover_count=0,
+                )
+            values[(dealer_id, period)] = data
+    return values
+
+
+def refresh_dealer_health(db: Session, targets: dict[int, set[str]]) -> int:
+    """Recompute and upsert the targeted rows (does not commit). Returns the number of rows written."""
+    targets = {dealer_id: set(periods) for dealer_id, periods in targets.items() if periods}
+    if not targets:
+        return 0
+    # Without this, two transactions that each wrote an order for a dealer would each count
+    # only their own, and the later commit would overwrite the other's score. The dealer row
+    # always exists (a new month's score row may not); under READ COMMITTED the aggregates
+    # below are read after the lock is granted, so they include the previous holder's orders.
+    db.query(Dealer.id).filter(Dealer.id.in_(list(targets))).order_by(Dealer.id).with_for_update().all()
+    values = compute_dealer_health(db, targets)
+    existing = {
+        (row.dealer_id, row.period): row
+        for row in db.query(DealerHealthScore).filter(
+            DealerHealthScore.dealer_id.in_(list(targets)),
+            DealerHealthScore.period.in_({period for periods in targets.values() for period in periods}),
+        )
+    }
+
+    written = 0
+    now = datetime.utcnow()
+    for (dealer_id, period), data in values.items():
+        row = existing.get((dealer_id, period))
+        if row is None:
+            db.add(DealerHealthScore(dealer_id=dealer_id, period=period, version=1, updated_at=now, **data))
+        elif any(getattr(row, field) != data[field] for field in _SCORE_FIELDS):
+            for field, value in data.items():
+                setattr(row, field, value)
+            row.version += 1
+            row.updated_at = now
+        else:
+            continue
+        written += 1
+    return written
+
+
+def rebuild_dealer_health(db: Session) -> int:
+    """Refresh every dealer's lifetime row and every month that has orders (does not commit)."""
+    targets: dict[int, set[str]] = {dealer_id: {LIFETIME} for (dealer_id,) in db.query(Dealer.id)}
+    year = extract("year", DealerOrder.order_date)
+    month = extract("month", DealerOrder.order_date)
+    for dealer_id, order_year, order_month in (
+        db.query(DealerOrder.dealer_id, year, month)
+        .filter(DealerOrder.order_date.isnot(None))
+        .group_by(DealerOrder.dealer_id, year, month)
+    ):
+        targets.setdefault(dealer_id, {LIFETIME}).add(f"{int(order_year):04d}-{int(order_month):02d}")
+    db.info.pop(_PENDING_KEY, None)
+    return refresh_dealer_health(db, targets)
+
+
+def ensure_dealer_health(db: Session) -> int:
+    """Backfill scores on first start after the table is created; no-op once rows exist."""
+    if db.query(DealerHealthScore.id).first() is not None:
+        return 0
+    written = rebuild_dealer_health(db)
+    db.commit()
+    return written
+
+
+# ─── Reads ───
+
+def get_dealer_health(db: Session, dealer_id: int, periods: set[str]) -> dict[str, dict]:
+    """
+    Score values per period. Monthly scores use the dealer's current stock signal; the current
+    and later months are computed up to the simulation date rather than read from stored rows,
+    as is a missing lifetime row. Months with no orders before then are left out.
+    """
+    sim_date = get_simulation_date()
+    current = month_period(sim_date)
+    monthly = periods - {LIFETIME}
+    stored_periods = {LIFETIME} | {period for period in monthly if period < current}
+    rows = db.query(DealerHealthScore).filter(
+        DealerHealthScore.dealer_id == dealer_id,
+        DealerHealthScore.period.in_(stored_periods),
+    ).all()
+    result = {row.period: {field: getattr(row, field) for field in _SCORE_FIELDS} for row in rows}
+
+    live = {period for period in monthly if period >= current}
+    if LIFETIME not in result and (LIFETIME in periods or monthly):
+        live.add(LIFETIME)
+    if live:
+        computed = compute_dealer_health(db, {dealer_id: live}, as_of=sim_date)
+        for period in live:
+            data = computed.get((dealer_id, period))
+            if data is not None and (period == LIFETIME or data["total_orders"]):
+                result[period] = data
+
+    signal = stock_signal(result[LIFETIME]["avg_days_of_cover"]) if LIFETIME in result else stock_signal(None)
+    for period in monthly & result.keys():
+        data = result[period]
+        data["health_score"] = monthly_health_score(
+            data["total_orders"], data["delivered_orders"], data["unique_skus"], signal,
+        )
+    if LIFETIME not in periods:
+        result.pop(LIFETIME, None)
+    return result
+
+
+# ─── Change tracking ───
+
+def _history_values(state, attribute: str) -> list:
+    history = state.attrs[attribute].history
+    values = [*history.added, *history.unchanged, *history.deleted]
+    return [value for value in values if value is not None] or [getattr(state.object, attribute, None)]
+
+
+def _pending(session) -> dict:
+    return session.info.setdefault(_PENDING_KEY, {"dealers": defaultdict(set), "warehouses": set()})
+
+
+def mark_dealer_orders_changed(session, dealer_id: int, order_dates) -> None:
+    """Record orders written with bulk statements, which bypass the flush hook below."""
+    periods = _pending(session)["dealers"][dealer_id]
+    periods.add(LIFETIME)
+    periods.update(month_period(order_date) for order_date in order_dates if order_date is not None)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_health_inputs(session, flush_context):
+    # after_flush still exposes pre-flush new/dirty/deleted and attribute history, and
+    # Python-side defaults (e.g. DealerOrder.order_date) are populated by now.
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, DealerOrder):
+            if obj in session.dirty and not session.is_modified(obj):
+                continue
+            state = sa_inspect(obj)
+            dealers = _pending(session)["dealers"]
+            for dealer_id in _history_values(state, "dealer_id"):
+                dealers[dealer_id].add(LIFETIME)
+                for order_date in _history_values(state, "order_date"):
+                    if order_date is not None:
+                        dealers[dealer_id].add(month_period(order_date))
+        elif isinstance(obj, Dealer):
+            if obj in session.dirty and sa_inspect(obj).attrs.warehouse_id.history.has_changes():
+                _pending(session)["dealers"][obj.id].add(LIFETIME)
+        elif isinstance(obj, InventoryLevel):
+            state = sa_inspect(obj)
+            if obj in session.dirty and not (
+                state.attrs.days_of_cover.history.has_changes() or state.attrs.warehouse_id.history.has_changes()
+            ):
+                continue
+            _pending(session)["warehouses"].update(_history_values(state, "warehouse_id"))
+
+
+@event.listens_for(Session, "before_commit")
+def _refresh_before_commit(session):
+    if _PENDING_KEY not in session.info and not (session.new or session.dirty or session.deleted):
+        return
+    session.flush()
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    targets = {dealer_id: set(periods) for dealer_id, periods in pending["dealers"].items() if dealer_id is not None}
+    try:
+        # A savepoint keeps a failed refresh from aborting the caller's transaction (Postgres
+        # refuses every statement after an error until the transaction rolls back).
+        with session.begin_nested():
+            if pending["warehouses"]:
+                # Only lifetime rows hold stock; monthly rows pick it up at read time.
+                for (dealer_id,) in session.query(Dealer.id).filter(Dealer.warehouse_id.in_(pending["warehouses"])):
+                    targets.setdefault(dealer_id, set()).add(LIFETIME)
+            refresh_dealer_health(session, targets)
+    except Exception:
+        # Scores are derived data and can be rebuilt; commit the caller's write without them.
+        logger.exception("Dealer health refresh failed for dealers %s", sorted(targets))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_health(session):
+    session.info.pop(_PENDING_KEY, None)
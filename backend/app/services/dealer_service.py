@@ -1,10 +1,11 @@
 """
 Dealer intelligence service.
-Smart order recommendations with cost savings calculation.
+Dashboard, alerts, activity and analytics for the dealer portal. Smart order
+recommendations are precomputed by smart_order_service.
 """
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import and_, case, extract, func
 from app.models import (
     Dealer,
     DealerOrder,
@@ -16,85 +17,63 @@ from app.models import (
     User,
     Notification,
 )
-from app.services.forecast_service import get_forecast
+from app.services.dealer_health_service import (
+    LIFETIME,
+    get_dealer_health,
+    month_period,
+    monthly_health_score,
+    stock_signal,
+)
 from app.config import get_simulation_date
-from datetime import date, timedelta, datetime
+from app.pagination import before_keyset, decode_cursor, encode_cursor
+from datetime import date, datetime, time
+from itertools import islice
+import heapq
 import numpy as np
 from fastapi import HTTPException, status
 
 
-def _next_diwali_reference_date(sim_date: date) -> date:
-    this_year = date(sim_date.year, 10, 25)
-    if sim_date <= this_year:
-        return this_year
-    return date(sim_date.year + 1, 10, 25)
-
-
 def get_dealer_dashboard(db: Session, dealer_id: int) -> dict:
-    """Dealer dashboard with health score and key metrics."""
-    dealer = db.query(Dealer).filter(Dealer.id == dealer_id).first()
-    if not dealer:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dealer not found")
+    """Dealer dashboard with health score and key metrics, in two queries."""
     sim_date = get_simulation_date()
     month_start = datetime(sim_date.year, sim_date.month, 1)
+    next_month_start = datetime(sim_date.year + (sim_date.month == 12), sim_date.month % 12 + 1, 1)
+
+    mtd = DealerOrder.order_date >= month_start
+    delivered = DealerOrder.status == "delivered"
+    # Days from order to the simulation date, floored at 1. Orders after the current month
+    # are always in the future, so day-of-month arithmetic is exact within the month.
+    days_since_order = sim_date.day - extract("day", DealerOrder.order_date)
+    delivery_days = case(
+        (and_(DealerOrder.order_date < next_month_start, days_since_order > 1), days_since_order),
+        else_=1,
+    )
 
-    # Get orders
-    total_orders = db.query(func.count(DealerOrder.id)).filter(
-        DealerOrder.dealer_id == dealer_id
-    ).scalar() or 0
-
-    total_orders_mtd = db.query(func.count(DealerOrder.id)).filter(
-        DealerOrder.dealer_id == dealer_id,
-        DealerOrder.order_date >= month_start,
-    ).scalar() or 0
-
-    ai_recs = db.query(func.count(InventoryLevel.id)).filter(
-        InventoryLevel.warehouse_id == dealer.warehouse_id,
-        InventoryLevel.days_of_cover < 14,
-    ).scalar() or 0
-
-    revenue = (
-        db.query(func.sum(DealerOrder.quantity * SKU.mrp))
-        .join(SKU, SKU.id == DealerOrder.sku_id)
-        .filter(
-            DealerOrder.dealer_id == dealer_id,
-            DealerOrder.status == "delivered",
-            DealerOrder.order_date >= month_start,
+    row = (
+        db.query(
+            Dealer,
+            func.count(DealerOrder.id).label("total_orders"),
+            func.count(DealerOrder.id).filter(mtd).label("total_orders_mtd"),
+            func.count(DealerOrder.id).filter(delivered).label("delivered_orders"),
+            func.count(DealerOrder.id).filter(delivered, mtd).label("delivered_mtd"),
+            func.sum(delivery_days).filter(delivered, mtd).label("delivery_days_mtd"),
+            func.sum(DealerOrder.quantity * SKU.mrp).filter(delivered, mtd).label("revenue"),
+            func.sum(DealerOrder.savings_amount).filter(DealerOrder.is_ai_suggested == True).label("savings"),
         )
-        .scalar()
-        or 0
+        .outerjoin(DealerOrder, DealerOrder.dealer_id == Dealer.id)
+        .outerjoin(SKU, SKU.id == DealerOrder.sku_id)
+        .filter(Dealer.id == dealer_id)
+        .group_by(Dealer.id)
+        .first()
     )
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dealer not found")
+    dealer = row.Dealer
 
-    total_savings = db.query(func.sum(DealerOrder.savings_amount)).filter(
-        DealerOrder.dealer_id == dealer_id,
-        DealerOrder.is_ai_suggested == True,
-    ).scalar() or 0
-
-    delivered_orders = db.query(func.count(DealerOrder.id)).filter(
-        DealerOrder.dealer_id == dealer_id,
-        DealerOrder.status == "delivered",
-    ).scalar() or 0
+    health = get_dealer_health(db, dealer_id, {LIFETIME})[LIFETIME]
 
-    fulfillment_rate = round((delivered_orders / max(total_orders, 1)) * 100, 1)
-
-    delivered_mtd = db.query(DealerOrder).filter(
-        DealerOrder.dealer_id == dealer_id,
-        DealerOrder.status == "delivered",
-        DealerOrder.order_date >= month_start,
-    ).all()
-    if delivered_mtd:
-        avg_delivery_days = round(
-            np.mean([
-                max((sim_date - order.order_date.date()).days, 1)
-                for order in delivered_mtd if order.order_date
-            ]),
-            1,
-        )
-    else:
-        avg_delivery_days = 0.0
-
-    # Compute health score
-    health_score = _compute_health_score(db, dealer)
+    fulfillment_rate = round((row.delivered_orders / max(row.total_orders, 1)) * 100, 1)
+    avg_delivery_days = round(row.delivery_days_mtd / row.delivered_mtd, 1) if row.delivered_mtd else 0.0
 
     return {
         "dealer": {
@@ -104,155 +83,18 @@ def get_dealer_dashboard(db: Session, dealer_id: int) -> dict:
             "state": dealer.state,
             "tier": dealer.tier,
         },
-        "health_score": health_score,
-        "total_orders": total_orders,
-        "total_orders_mtd": total_orders_mtd,
-        "ai_recommendations_pending": ai_recs,
-        "revenue_this_month": round(revenue, 0),
-        "total_ai_savings": round(total_savings, 0),
+        "health_score": health["health_score"],
+        "total_orders": row.total_orders,
+        "total_orders_mtd": row.total_orders_mtd,
+        "ai_recommendations_pending": health["low_cover_count"],
+        "revenue_this_month": round(row.revenue or 0, 0),
+        "total_ai_savings": round(row.savings or 0, 0),
         "fulfillment_rate": fulfillment_rate,
         "avg_delivery_time_days": avg_delivery_days,
         "performance_score": dealer.performance_score,
     }
 
 
-def _compute_health_score(db: Session, dealer: Dealer) -> float:
-    """
-    Health score 0-100:
-    40% stock coverage, 25% stockout frequency,
-    20% order fulfillment, 15% product breadth
-    """
-    # Stock coverage (from warehouse inventory)
-    levels = db.query(InventoryLevel).filter(
-        InventoryLevel.warehouse_id == dealer.warehouse_id
-    ).all()
-
-    if not levels:
-        return 50.0
-
-    avg_cover = np.mean([l.days_of_cover for l in levels])
-    coverage_score = min(100, avg_cover / 30 * 100)
-
-    stockout_count = sum(1 for l in levels if l.days_of_cover < 3)
-    stockout_score = max(0, 100 - stockout_count * 15)
-
-    # Order fulfillment
-    total = db.query(func.count(DealerOrder.id)).filter(
-        DealerOrder.dealer_id == dealer.id
-    ).scalar()
-    delivered = db.query(func.count(DealerOrder.id)).filter(
-        DealerOrder.dealer_id == dealer.id,
-        DealerOrder.status == "delivered",
-    ).scalar()
-    fulfillment_score = (delivered / max(total, 1)) * 100
-
-    # Product breadth
-    unique_skus = db.query(func.count(func.distinct(DealerOrder.sku_id))).filter(
-        DealerOrder.dealer_id == dealer.id
-    ).scalar()
-    breadth_score = min(100, unique_skus / 20 * 100)
-
-    return round(
-        0.4 * coverage_score + 0.25 * stockout_score +
-        0.2 * fulfillment_score + 0.15 * breadth_score, 1
-    )
-
-
-def get_smart_orders(db: Session, dealer_id: int) -> list[dict]:
-    """Generate AI-driven order recommendations for a dealer."""
-    dealer = db.query(Dealer).filter(Dealer.id == dealer_id).first()
-    if not dealer:
-        return []
-
-    # Get dealer's warehouse inventory
-    levels = db.query(InventoryLevel).filter(
-        InventoryLevel.warehouse_id == dealer.warehouse_id,
-        InventoryLevel.days_of_cover < 30,
-    ).order_by(InventoryLevel.days_of_cover.asc()).all()
-
-    recommendations = []
-    sim_date = get_simulation_date()
-
-    for level in levels[:15]:  # Top 15 low-stock items
-        sku = db.query(SKU).filter(SKU.id == level.sku_id).first()
-        if not sku:
-            continue
-        shade = db.query(Shade).filter(Shade.id == sku.shade_id).first()
-        if not shade:
-            continue
-
-        # Forecast demand
-        forecast = get_forecast(sku.id, dealer.region_id, horizon=30)
-        predicted_demand = sum(f["predicted"] for f in forecast.get("forecast", []))
-
-        # Calculate recommended quantity
-        recommended_qty = max(10, int(predicted_demand * 1.2 - level.current_stock))
-
-        # Calculate savings
-        manual_cost = recommended_qty * sku.mrp
-        ai_cost = manual_cost * 0.92  # 8% savings through optimized logistics
-        savings = round(manual_cost - ai_cost, 0)
-
-        # Determine urgency
-        if level.days_of_cover < 3:
-            urgency = "CRITICAL"
-        elif level.days_of_cover < 14:
-            urgency = "RECOMMENDED"
-        else:
-            urgency = "OPTIONAL"
-
-        # Generate context-aware reason
-        reason = _generate_reason(shade, level, sim_date)
-
-        # Stockout date
-        daily_demand = level.current_stock / max(level.days_of_cover, 0.1)
-        stockout_date = sim_date + timedelta(days=int(level.days_of_cover))
-
-        recommendations.append({
-            "sku_id": sku.id,
-            "sku_code": sku.sku_code,
-            "shade_name": shade.shade_name,
-            "shade_hex": shade.hex_color,
-            "shade_family": shade.shade_family,
-            "size": sku.size,
-            "current_stock": level.current_stock,
-            "recommended_qty": recommended_qty,
-            "urgency": urgency,
-            "reason": reason,
-            "predicted_stockout_date": stockout_date.isoformat(),
-            "savings_amount": savings,
-            "mrp_per_unit": sku.mrp,
-            "total_cost": round(ai_cost, 0),
-        })
-
-    return sorted(recommendations, key=lambda x: (
-        {"CRITICAL": 0, "RECOMMENDED": 1, "OPTIONAL": 2}[x["urgency"]],
-        x["predicted_stockout_date"],
-    ))
-
-
-def _generate_reason(shade: Shade, level: InventoryLevel, sim_date: date) -> str:
-    """Generate context-aware reason for the recommendation."""
-    # Check upcoming events relative to simulation date
-    days_to_diwali = (_next_diwali_reference_date(sim_date) - sim_date).days
-    if 0 < days_to_diwali <= 21:
-        return f"Diwali in {days_to_diwali} days - demand expected to surge 60%"
-
-    if shade.shade_name == "Bridal Red":
-        return "Wedding season peak - 'Bridal Red' trending +40% in your region"
-
-    if shade.is_trending:
-        return f"'{shade.shade_name}' is trending - 40% increase in customer searches"
-
-    if level.days_of_cover < 3:
-        return f"CRITICAL: Stock will last only {level.days_of_cover:.0f} days at current sell-through"
-
-    if sim_date.month in (6, 7, 8, 9) and shade.product and shade.product.category == "Waterproofing":
-        return "Peak monsoon season - waterproofing demand at annual high"
-
-    return f"Stock will last {level.days_of_cover:.0f} days - restock recommended before depletion"
-
-
 def get_dealer_alerts(db: Session, dealer_id: int) -> dict:
     """Get stockout, transfer, and trending alerts for a dealer."""
     dealer = db.query(Dealer).filter(Dealer.id == dealer_id).first()
@@ -301,87 +143,151 @@ def _month_starts(sim_date: date, months: int) -> list[datetime]:
     return starts
 
 
-def get_dealer_dashboard_activity(db: Session, dealer_id: int, limit: int = 20) -> dict:
-    dealer = db.query(Dealer).filter(Dealer.id == dealer_id).first()
+# ─── Activity feed ───
+
+# Feed order is (timestamp, source rank, row id) descending; the rank breaks ties between
+# sources whose rows share a timestamp (orders first, stock alerts last), so the cursor
+# identifies a single position.
+_ACTIVITY_SOURCES = ("stock_alert", "notification", "customer_request", "order")
+_ACTIVITY_RANK = {source: rank for rank, source in enumerate(_ACTIVITY_SOURCES)}
+
+
+def _before_cursor(created_at_col, id_col, source: str, cursor):
+    """SQL filter for rows of one source that sort strictly after the cursor."""
+    created_at, rank, row_id = cursor
+    own_rank = _ACTIVITY_RANK[source]
+    if own_rank < rank:
+        return created_at_col <= created_at
+    if own_rank > rank:
+        return created_at_col < created_at
+    return before_keyset(created_at_col, id_col, created_at, row_id)
+
+
+def _activity_source(query, created_at_col, id_col, source: str, cursor, limit: int):
+    query = query.filter(created_at_col.isnot(None))
+    if cursor is not None:
+        query = query.filter(_before_cursor(created_at_col, id_col, source, cursor))
+    return query.order_by(created_at_col.desc(), id_col.desc()).limit(limit).all()
+
+
+def get_dealer_dashboard_activity(db: Session, dealer_id: int, limit: int = 20, cursor: str | None = None) -> dict:
+    """
+    One page of the dealer's activity feed, newest first.
+
+    Each source is read with one indexed keyset query (at most limit + 1 rows after the cursor)
+    and the sorted streams are k-way merged, so a page costs the same however deep it is.
+    """
+    dealer = db.query(Dealer.id, Dealer.warehouse_id).filter(Dealer.id == dealer_id).first()
     if not dealer:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dealer not found")
+    after = None
+    if cursor:
+        created_at, source, row_id = decode_cursor(cursor, datetime, str, int)
+        if source not in _ACTIVITY_RANK:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        after = (created_at, _ACTIVITY_RANK[source], row_id)
+    fetch = limit + 1
+
+    orders = _activity_source(
+        db.query(DealerOrder.id, DealerOrder.status, DealerOrder.quantity, DealerOrder.order_date, SKU.sku_code, Shade.shade_name)
+        .outerjoin(SKU, SKU.id == DealerOrder.sku_id)
+        .outerjoin(Shade, Shade.id == SKU.shade_id)
+        .filter(DealerOrder.dealer_id == dealer_id),
+        DealerOrder.order_date, DealerOrder.id, "order", after, fetch,
+    )
+    requests = _activity_source(
+        db.query(CustomerOrderRequest.id, CustomerOrderRequest.status, CustomerOrderRequest.customer_name,
+                 CustomerOrderRequest.created_at, Shade.shade_name)
+        .outerjoin(Shade, Shade.id == CustomerOrderRequest.shade_id)
+        .filter(CustomerOrderRequest.dealer_id == dealer_id),
+        CustomerOrderRequest.created_at, CustomerOrderRequest.id, "customer_request", after, fetch,
+    )
+    notifications = _activity_source(
+        db.query(Notification)
+        .join(User, User.id == Notification.user_id)
+        .filter(User.role == "dealer", User.dealer_id == dealer_id, User.is_active == True),
+        Notification.created_at, Notification.id, "notification", after, fetch,
+    )
 
-    items: list[dict] = []
+    # Critical stock is current state rather than history: the five lowest-cover levels are
+    # placed on the timeline at their last update, or at the start of the simulation day when
+    # a level has never been stamped (a fixed time, so cursors stay valid across requests).
+    undated_at = datetime.combine(get_simulation_date(), time.min)
+    critical_levels = (
+        db.query(
+            InventoryLevel.id,
+            InventoryLevel.days_of_cover,
+            func.coalesce(InventoryLevel.last_updated, undated_at).label("last_updated"),
+            SKU.sku_code,
+            Shade.shade_name,
+        )
+        .outerjoin(SKU, SKU.id == InventoryLevel.sku_id)
+        .outerjoin(Shade, Shade.id == SKU.shade_id)
+        .filter(
+            InventoryLevel.warehouse_id == dealer.warehouse_id,
+            InventoryLevel.days_of_cover < 7,
+        )
+        .order_by(InventoryLevel.days_of_cover.asc())
+        .limit(5)
+        .all()
+    )
 
-    # Recent dealer orders
-    recent_orders = db.query(DealerOrder).filter(
-        DealerOrder.dealer_id == dealer_id
-    ).order_by(DealerOrder.order_date.desc()).limit(limit).all()
-    for order in recent_orders:
-        sku = db.query(SKU).filter(SKU.id == order.sku_id).first()
-        shade = db.query(Shade).filter(Shade.id == sku.shade_id).first() if sku else None
-        items.append({
-            "type": "order",
-            "title": f"Order #{order.id} {order.status}",
-            "message": f"{order.quantity} units of {shade.shade_name if shade else sku.sku_code if sku else 'SKU'}",
-            "created_at": order.order_date.isoformat() if order.order_date else None,
-            "link": f"/dealer/orders/{order.id}",
-        })
+    def stream(rows, source: str, created_at: str, build):
+        rank = _ACTIVITY_RANK[source]
+        return (((getattr(row, created_at), rank, row.id), build, row) for row in rows)
 
-    # Customer request updates
-    recent_requests = db.query(CustomerOrderRequest).filter(
-        CustomerOrderRequest.dealer_id == dealer_id
-    ).order_by(CustomerOrderRequest.created_at.desc()).limit(max(5, limit // 2)).all()
-    for req in recent_requests:
-        shade = db.query(Shade).filter(Shade.id == req.shade_id).first()
-        items.append({
+    def order_item(row):
+        return {
+            "type": "order",
+            "title": f"Order #{row.id} {row.status}",
+            "message": f"{row.quantity} units of {row.shade_name or row.sku_code or 'SKU'}",
+            "created_at": row.order_date.isoformat(),
+            "link": f"/dealer/orders/{row.id}",
+        }
+
+    def request_item(row):
+        return {
             "type": "customer_request",
-            "title": f"Customer request {req.status}",
-            "message": f"{req.customer_name} requested {shade.shade_name if shade else 'a shade'}",
-            "created_at": req.created_at.isoformat() if req.created_at else None,
+            "title": f"Customer request {row.status}",
+            "message": f"{row.customer_name} requested {row.shade_name or 'a shade'}",
+            "created_at": row.created_at.isoformat(),
             "link": "/dealer/customer-requests",
-        })
-
-    # System notifications for dealer users
-    dealer_user_ids = [
-        row[0]
-        for row in db.query(User.id).filter(
-            User.role == "dealer",
-            User.dealer_id == dealer_id,
-            User.is_active == True,
-        ).all()
-    ]
-    if dealer_user_ids:
-        notifications = db.query(Notification).filter(
-            Notification.user_id.in_(dealer_user_ids)
-        ).order_by(Notification.created_at.desc()).limit(limit).all()
-        for notification in notifications:
-            items.append({
-                "type": f"notification:{notification.category}",
-                "title": notification.title,
-                "message": notification.message,
-                "created_at": notification.created_at.isoformat() if notification.created_at else None,
-                "link": notification.link or "/dealer/notifications",
-            })
-
-    # Critical stock alerts
-    critical_levels = db.query(InventoryLevel).filter(
-        InventoryLevel.warehouse_id == dealer.warehouse_id,
-        InventoryLevel.days_of_cover < 7,
-    ).order_by(InventoryLevel.days_of_cover.asc()).limit(5).all()
-    for level in critical_levels:
-        sku = db.query(SKU).filter(SKU.id == level.sku_id).first()
-        shade = db.query(Shade).filter(Shade.id == sku.shade_id).first() if sku else None
-        created_at = level.last_updated or datetime.utcnow()
-        items.append({
+        }
+
+    def notification_item(row):
+        return {
+            "type": f"notification:{row.category}",
+            "title": row.title,
+            "message": row.message,
+            "created_at": row.created_at.isoformat(),
+            "link": row.link or "/dealer/notifications",
+        }
+
+    def stock_item(row):
+        return {
             "type": "stock_alert",
             "title": "Stock running low",
-            "message": f"{shade.shade_name if shade else sku.sku_code if sku else 'SKU'} has {round(level.days_of_cover, 1)} days cover left",
-            "created_at": created_at.isoformat(),
+            "message": f"{row.shade_name or row.sku_code or 'SKU'} has {round(row.days_of_cover, 1)} days cover left",
+            "created_at": row.last_updated.isoformat(),
             "link": "/dealer/smart-orders",
-        })
-
-    sorted_items = sorted(
-        items,
-        key=lambda item: item.get("created_at") or "",
+        }
+
+    stock_stream = sorted(stream(critical_levels, "stock_alert", "last_updated", stock_item), key=lambda entry: entry[0], reverse=True)
+    merged = heapq.merge(
+        stream(orders, "order", "order_date", order_item),
+        stream(requests, "customer_request", "created_at", request_item),
+        stream(notifications, "notification", "created_at", notification_item),
+        (entry for entry in stock_stream if after is None or entry[0] < after),
+        key=lambda entry: entry[0],
         reverse=True,
-    )[:limit]
-    return {"items": sorted_items, "total": len(sorted_items)}
+    )
+    page = list(islice(merged, fetch))
+    next_cursor = None
+    if len(page) > limit:
+        created_at, rank, row_id = page[limit - 1][0]
+        next_cursor = encode_cursor(created_at, _ACTIVITY_SOURCES[rank], row_id)
+    items = [build(row) for _, build, row in page[:limit]]
+    return {"items": items, "total": len(items), "next_cursor": next_cursor}
 
 
 def get_dealer_order_pipeline(db: Session, dealer_id: int) -> dict:
@@ -418,66 +324,25 @@ def get_dealer_order_pipeline(db: Session, dealer_id: int) -> dict:
 
 
 def get_dealer_trends(db: Session, dealer_id: int, months: int = 6) -> dict:
-    dealer = db.query(Dealer).filter(Dealer.id == dealer_id).first()
+    dealer = db.query(Dealer.id).filter(Dealer.id == dealer_id).first()
     if not dealer:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dealer not found")
 
-    sim_date = get_simulation_date()
-    starts = _month_starts(sim_date, months)
-    # Add one extra boundary for month-end slicing.
-    end_boundary = datetime(sim_date.year, sim_date.month, sim_date.day) + timedelta(days=1)
-    month_boundaries = starts + [end_boundary]
-
-    levels = db.query(InventoryLevel).filter(
-        InventoryLevel.warehouse_id == dealer.warehouse_id
-    ).all()
-    if levels:
-        stock_signal = min(100.0, max(0.0, float(np.mean([l.days_of_cover for l in levels])) / 30 * 100))
-    else:
-        stock_signal = 50.0
+    starts = _month_starts(get_simulation_date(), months)
+    periods = {month_period(start) for start in starts}
+    health = get_dealer_health(db, dealer_id, periods | {LIFETIME})
+    # Months without orders have no row: zero activity scored on the same current stock signal.
+    idle_score = monthly_health_score(0, 0, 0, stock_signal(health[LIFETIME]["avg_days_of_cover"]))
 
     points = []
-    for idx, start in enumerate(starts):
-        end = month_boundaries[idx + 1] if idx + 1 < len(month_boundaries) else end_boundary
-        revenue = (
-            db.query(func.sum(DealerOrder.quantity * SKU.mrp))
-            .join(SKU, SKU.id == DealerOrder.sku_id)
-            .filter(
-                DealerOrder.dealer_id == dealer_id,
-                DealerOrder.status == "delivered",
-                DealerOrder.order_date >= start,
-                DealerOrder.order_date < end,
-            )
-            .scalar()
-            or 0
-        )
-        total_orders = db.query(func.count(DealerOrder.id)).filter(
-            DealerOrder.dealer_id == dealer_id,
-            DealerOrder.order_date >= start,
-            DealerOrder.order_date < end,
-        ).scalar() or 0
-        delivered = db.query(func.count(DealerOrder.id)).filter(
-            DealerOrder.dealer_id == dealer_id,
-            DealerOrder.status == "delivered",
-            DealerOrder.order_date >= start,
-            DealerOrder.order_date < end,
-        ).scalar() or 0
-        unique_skus = db.query(func.count(func.distinct(DealerOrder.sku_id))).filter(
-            DealerOrder.dealer_id == dealer_id,
-            DealerOrder.order_date >= start,
-            DealerOrder.order_date < end,
-        ).scalar() or 0
-
-        fulfillment = (delivered / max(total_orders, 1)) * 100
-        breadth = min(100.0, (unique_skus / 12) * 100)
-        health = round((0.5 * fulfillment) + (0.3 * breadth) + (0.2 * stock_signal), 1)
-
+    for start in starts:
+        row = health.get(month_period(start))
         points.append({
             "month": start.strftime("%b %Y"),
             "month_key": start.strftime("%Y-%m"),
-            "revenue": round(float(revenue), 2),
-            "health_score": health,
-            "orders": int(total_orders),
+            "revenue": round(float(row["delivered_revenue"]), 2) if row else 0.0,
+            "health_score": row["health_score"] if row else idle_score,
+            "orders": int(row["total_orders"]) if row else 0,
         })
 
     max_revenue = max([point["revenue"] for point in points], default=0.0)
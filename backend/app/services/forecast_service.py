@@ -73,18 +73,47 @@ def get_forecast(sku_id: int, region_id: int, horizon: int = 30) -> dict:
         return _generate_fallback_forecast(sku_id, region_id, horizon)
 
 
-def _generate_fallback_forecast(sku_id: int, region_id: int, horizon: int) -> dict:
-    """Generate a reasonable-looking fallback forecast without Prophet."""
+_FALLBACK_HISTORY_DAYS = 90
+
+
+def _fallback_curves(pairs: list[tuple[int, int]], horizon: int):
+    """
+    Unrounded fallback demand for many (sku_id, region_id) pairs: (historical, forecast)
+    arrays shaped (pairs x 90) and (pairs x horizon). Each pair draws from its own seeded
+    generator, so a pair's curve is the same whichever batch it is evaluated in.
+    """
     import numpy as np
 
+    bases = np.empty(len(pairs))
+    noise = np.empty((len(pairs), _FALLBACK_HISTORY_DAYS + horizon))
+    for idx, (sku_id, region_id) in enumerate(pairs):
+        rng = np.random.default_rng(sku_id * 100 + region_id)
+        bases[idx] = rng.uniform(20, 60)
+        noise[idx] = rng.standard_normal(_FALLBACK_HISTORY_DAYS + horizon)
+    bases = bases[:, None]
+
+    history_steps = np.arange(_FALLBACK_HISTORY_DAYS)
+    historical = bases * (1 + 0.3 * np.sin(2 * np.pi * history_steps / 30)) \
+        + noise[:, :_FALLBACK_HISTORY_DAYS] * (bases * 0.15)
+
     sim_date = get_simulation_date()
-    rng = np.random.default_rng(sku_id * 100 + region_id)
+    steps = np.arange(horizon)
+    season = 1 + 0.3 * np.sin(2 * np.pi * (_FALLBACK_HISTORY_DAYS + steps) / 30)
+    days = [sim_date + timedelta(days=int(i) + 1) for i in steps]
+    # Diwali surge if approaching
+    surge = np.array([1.6 if d.month == 10 and d.day >= 15 else 1.0 for d in days])
+    forecast = (bases * season * 1.1 + noise[:, _FALLBACK_HISTORY_DAYS:] * (bases * 0.2)) * surge
+    return historical, forecast
+
+
+def _generate_fallback_forecast(sku_id: int, region_id: int, horizon: int) -> dict:
+    """Generate a reasonable-looking fallback forecast without Prophet."""
+    sim_date = get_simulation_date()
+    historical_values, forecast_values = _fallback_curves([(sku_id, region_id)], max(horizon, 0))
 
-    base = rng.uniform(20, 60)
     historical = []
-    for i in range(90):
-        d = sim_date - timedelta(days=90 - i)
-        val = base * (1 + 0.3 * np.sin(2 * np.pi * i / 30)) + rng.normal(0, base * 0.15)
+    for i, val in enumerate(historical_values[0].tolist()):
+        d = sim_date - timedelta(days=_FALLBACK_HISTORY_DAYS - i)
         historical.append({
             "date": d.isoformat(),
             "predicted": max(0, round(val, 1)),
@@ -93,12 +122,8 @@ def _generate_fallback_forecast(sku_id: int, region_id: int, horizon: int) -> di
         })
 
     forecast = []
-    for i in range(horizon):
+    for i, val in enumerate(forecast_values[0].tolist()):
         d = sim_date + timedelta(days=i + 1)
-        val = base * (1 + 0.3 * np.sin(2 * np.pi * (90 + i) / 30)) * 1.1 + rng.normal(0, base * 0.2)
-        # Diwali surge if approaching
-        if d.month == 10 and d.day >= 15:
-            val *= 1.6
         forecast.append({
             "date": d.isoformat(),
             "predicted": max(0, round(val, 1)),
@@ -107,3 +132,30 @@ def _generate_fallback_forecast(sku_id: int, region_id: int, horizon: int) -> di
         })
 
     return {"historical": historical, "forecast": forecast}
+
+
+def get_forecast_demand(pairs, horizon: int = 30) -> dict[tuple[int, int], float]:
+    """
+    Total predicted demand over the horizon for many (sku_id, region_id) pairs at once.
+
+    Pairs with a trained model go through get_forecast; the rest evaluate the shared
+    fallback curves as one (pairs x horizon) array instead of one forecast dict per pair.
+    """
+    pairs = list(dict.fromkeys(pairs))
+    totals = {}
+    fallback = []
+    for sku_id, region_id in pairs:
+        if f"prophet_{sku_id}_{region_id}" in _models:
+            forecast = get_forecast(sku_id, region_id, horizon=horizon)
+            totals[(sku_id, region_id)] = sum(f["predicted"] for f in forecast.get("forecast", []))
+        else:
+            fallback.append((sku_id, region_id))
+    if not fallback or horizon <= 0:
+        totals.update({pair: 0.0 for pair in fallback})
+        return totals
+
+    _, forecast_values = _fallback_curves(fallback, horizon)
+    for pair, row in zip(fallback, forecast_values.tolist()):
+        # Rounded per day exactly as _generate_fallback_forecast does.
+        totals[pair] = sum(max(0, round(val, 1)) for val in row)
+    return totals
@@ -1,7 +1,9 @@
 import csv
 import io
 import json
+import logging
 import shutil
+from collections import defaultdict
 from collections.abc import Sequence
 from datetime import datetime
 from pathlib import Path
@@ -22,6 +24,11 @@ from app.models import (
     Warehouse,
 )
 from app.schemas.ingestion import DealerOrderIn, IngestionError, IngestionResult, InventoryLevelIn, SalesHistoryIn
+from app.services.sales_rollup_service import apply_sales_deltas
+from app.services.smart_order_service import rebuild_smart_orders
+
+
+logger = logging.getLogger("paintflow.ingestion")
 
 
 def parse_csv_content(content: bytes) -> list[dict]:
@@ -43,11 +50,24 @@ def validate_rows(raw_rows: list[dict], model_cls) -> tuple[list, list[Ingestion
     return validated, errors
 
 
-def _finalize_ingestion(db: Session, dry_run: bool):
+def _finalize_ingestion(db: Session, dry_run: bool, warehouse_ids: set[int] = frozenset()):
     if dry_run:
         db.rollback()
-    else:
-        db.commit()
+        return
+    db.commit()
+    if not warehouse_ids:
+        return
+    # Stored smart-order recommendations are derived from warehouse stock: rebuild them for the
+    # dealers at the warehouses this ingestion touched (the nightly batch covers the rest), but
+    # never fail an ingestion that has already been committed because of it.
+    try:
+        dealer_ids = [dealer_id for (dealer_id,) in db.query(Dealer.id).filter(Dealer.warehouse_id.in_(warehouse_ids))]
+        if dealer_ids:
+            rebuild_smart_orders(db, dealer_ids)
+            db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Smart-order rebuild after ingestion failed")
 
 
 def ingest_sales_history(
@@ -60,6 +80,7 @@ def ingest_sales_history(
 
     processed = inserted = updated = skipped = 0
     errors: list[IngestionError] = []
+    rollup_deltas: dict[tuple, list] = defaultdict(lambda: [0, 0.0])
 
     for idx, row in enumerate(rows, start=1):
         sku_id = sku_lookup.get(row.sku_code)
@@ -82,7 +103,10 @@ def ingest_sales_history(
             )
             .first()
         )
+        delta = rollup_deltas[(sku_id, region_id, row.date)]
         if existing:
+            delta[0] += row.quantity_sold - existing.quantity_sold
+            delta[1] += row.revenue - existing.revenue
             existing.quantity_sold = row.quantity_sold
             existing.revenue = row.revenue
             existing.channel = row.channel
@@ -98,9 +122,13 @@ def ingest_sales_history(
                     channel=row.channel,
                 )
             )
+            delta[0] += row.quantity_sold
+            delta[1] += row.revenue
             inserted += 1
         processed += 1
 
+    # Same transaction as the raw rows, so a dry run rolls the rollups back too.
+    apply_sales_deltas(db, {key: tuple(value) for key, value in rollup_deltas.items()})
     _finalize_ingestion(db, dry_run=dry_run)
     return IngestionResult(
         entity="sales_history",
@@ -123,6 +151,7 @@ def ingest_inventory_levels(
 
     processed = inserted = updated = skipped = 0
     errors: list[IngestionError] = []
+    touched_warehouses: set[int] = set()
 
     for idx, row in enumerate(rows, start=1):
         sku_id = sku_lookup.get(row.sku_code)
@@ -172,8 +201,9 @@ def ingest_inventory_levels(
             )
             inserted += 1
         processed += 1
+        touched_warehouses.add(warehouse_id)
 
-    _finalize_ingestion(db, dry_run=dry_run)
+    _finalize_ingestion(db, dry_run=dry_run, warehouse_ids=touched_warehouses)
     return IngestionResult(
         entity="inventory_levels",
         dry_run=dry_run,
@@ -163,10 +163,12 @@ def approve_transfer(db: Session, transfer_id: int) -> dict:
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Source warehouse inventory record not found",
         )
-    if from_level.current_stock < transfer.quantity:
+    # Units held for customer orders cannot be moved.
+    available = from_level.current_stock - from_level.reserved_stock
+    if available < transfer.quantity:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Insufficient stock in source warehouse ({from_level.current_stock} available)",
+            detail=f"Insufficient stock in source warehouse ({max(available, 0)} available)",
         )
 
     to_level = (
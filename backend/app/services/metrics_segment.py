@@ -0,0 +1,133 @@
+import json
+import mmap
+import os
+import struct
+from collections.abc import Iterator
+from pathlib import Path
+
+
+# Segment layout: an 8-byte header holding the number of used bytes, followed by
+# entries of [uint32 key length][utf-8 key padded to 8-byte alignment][float64 value].
+# Entries are only ever appended and updated in place, and the header is bumped after
+# an entry is fully written, so other processes can read a segment without locking.
+_HEADER = struct.Struct("<Q")
+_KEY_LEN = struct.Struct("<I")
+_VALUE = struct.Struct("<d")
+_INITIAL_SIZE = 64 * 1024
+
+
+def _padded_key(key: str) -> bytes:
+    encoded = key.encode("utf-8")
+    padding = (8 - (_KEY_LEN.size + len(encoded)) % 8) % 8
+    return encoded + b" " * padding
+
+
+def encode_key(*parts) -> str:
+    return json.dumps(parts, ensure_ascii=True, separators=(",", ":"))
+
+
+def decode_key(key: str) -> list:
+    return json.loads(key)
+
+
+class MmapMetricsSegment:
+    """Per-process metrics segment backed by a memory-mapped file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a+b")
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.truncate(_INITIAL_SIZE)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._used = _HEADER.unpack_from(self._map, 0)[0] or _HEADER.size
+        if self._used == _HEADER.size:
+            _HEADER.pack_into(self._map, 0, self._used)
+        self._positions: dict[str, int] = {
+            key: offset for key, offset, _ in _iter_entries(self._map, self._used)
+        }
+
+    def _grow(self, needed: int) -> None:
+        size = len(self._map)
+        while size < needed:
+            size *= 2
+        self._map.close()
+        self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def _value_offset(self, key: str) -> int:
+        offset = self._positions.get(key)
+        if offset is not None:
+            return offset
+        padded = _padded_key(key)
+        entry_size = _KEY_LEN.size + len(padded) + _VALUE.size
+        if self._used + entry_size > len(self._map):
+            self._grow(self._used + entry_size)
+        start = self._used
+        _KEY_LEN.pack_into(self._map, start, len(key.encode("utf-8")))
+        self._map[start + _KEY_LEN.size:start + _KEY_LEN.size + len(padded)] = padded
+        offset = start + _KEY_LEN.size + len(padded)
+        _VALUE.pack_into(self._map, offset, 0.0)
+        self._used += entry_size
+        _HEADER.pack_into(self._map, 0, self._used)
+        self._positions[key] = offset
+        return offset
+
+    def inc(self, key: str, amount: float = 1.0) -> None:
+        offset = self._value_offset(key)
+        current = _VALUE.unpack_from(self._map, offset)[0]
+        _VALUE.pack_into(self._map, offset, current + amount)
+
+    def set(self, key: str, value: float) -> None:
+        _VALUE.pack_into(self._map, self._value_offset(key), value)
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+
+def _iter_entries(buffer, used: int) -> Iterator[tuple[str, int, float]]:
+    pos = _HEADER.size
+    while pos < used:
+        key_len = _KEY_LEN.unpack_from(buffer, pos)[0]
+        key_start = pos + _KEY_LEN.size
+        key = bytes(buffer[key_start:key_start + key_len]).decode("utf-8")
+        value_offset = key_start + len(_padded_key(key))
+        value = _VALUE.unpack_from(buffer, value_offset)[0]
+        yield key, value_offset, value
+        pos = value_offset + _VALUE.size
+
+
+def read_segment(path: Path) -> dict[str, float]:
+    """Read every entry of a segment file written by any process."""
+    data = Path(path).read_bytes()
+    if len(data) < _HEADER.size:
+        return {}
+    used = min(_HEADER.unpack_from(data, 0)[0], len(data))
+    return {key: value for key, _, value in _iter_entries(data, used)}
+
+
+def segment_path(directory: Path, pid: int) -> Path:
+    return Path(directory) / f"worker_{pid}.metrics"
+
+
+def iter_worker_segments(directory: Path) -> Iterator[tuple[int, dict[str, float]]]:
+    directory = Path(directory)
+    if not directory.is_dir():
+        return
+    for path in sorted(directory.glob("worker_*.metrics")):
+        try:
+            pid = int(path.stem.split("_", 1)[1])
+            yield pid, read_segment(path)
+        except (ValueError, OSError, struct.error, UnicodeDecodeError):
+            continue
+
+
+def pid_is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
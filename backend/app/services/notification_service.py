@@ -50,7 +50,9 @@ def create_notifications_for_users(
     type: str = "info",
     category: str = "system",
     link: str | None = None,
+    commit: bool = True,
 ) -> list[dict]:
+    """Notify each user once; with commit=False the rows join the caller's transaction."""
     deduped_ids = sorted(set([uid for uid in user_ids if uid]))
     if not deduped_ids:
         return []
@@ -68,6 +70,9 @@ def create_notifications_for_users(
         for user_id in deduped_ids
     ]
     db.add_all(notifications)
+    if not commit:
+        db.flush()
+        return [_serialize_notification(n) for n in notifications]
     db.commit()
     for notification in notifications:
         db.refresh(notification)
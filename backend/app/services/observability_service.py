@@ -1,82 +1,340 @@
-import re
-from collections import defaultdict, deque
+import math
+import os
+from bisect import bisect_left
+from collections import defaultdict
 from datetime import UTC, datetime
+from pathlib import Path
 from threading import Lock
 
+from app.config import METRICS_MULTIPROC_DIR
+from app.database import add_pool_listeners
+from app.services.metrics_segment import (
+    MmapMetricsSegment,
+    decode_key,
+    encode_key,
+    iter_worker_segments,
+    pid_is_alive,
+    segment_path,
+)
+
+
+# Fixed log-scale latency buckets (upper bounds, ms): 0.5ms doubling every two steps up to ~46s.
+# Every histogram shares these bounds, so merging is element-wise addition.
+LATENCY_BUCKETS_MS: tuple[float, ...] = tuple(round(0.5 * 2 ** (i / 2), 3) for i in range(34))
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class LatencyHistogram:
+    __slots__ = ("counts", "count", "sum_ms")
+
+    def __init__(self):
+        # One slot per finite bucket plus the +Inf overflow bucket.
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for idx, value in enumerate(other.counts):
+            self.counts[idx] += value
+        self.count += other.count
+        self.sum_ms += other.sum_ms
+
+    def copy(self) -> "LatencyHistogram":
+        clone = LatencyHistogram()
+        clone.merge(self)
+        return clone
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating inside the bucket that holds the target rank."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for idx, bucket_count in enumerate(self.counts):
+            if not bucket_count:
+                continue
+            if seen + bucket_count >= rank:
+                if idx >= len(LATENCY_BUCKETS_MS):
+                    return LATENCY_BUCKETS_MS[-1]
+                lower = LATENCY_BUCKETS_MS[idx - 1] if idx > 0 else 0.0
+                upper = LATENCY_BUCKETS_MS[idx]
+                fraction = (rank - seen) / bucket_count
+                return round(lower + (upper - lower) * fraction, 2)
+            seen += bucket_count
+        return LATENCY_BUCKETS_MS[-1]
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum_ms, 2),
+            "avg": round(self.sum_ms / self.count, 2) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
 
 _lock = Lock()
 _started_at = datetime.now(UTC)
 _in_flight = 0
 _requests_total = 0
 _status_counts: dict[str, int] = defaultdict(int)
-_path_counts: dict[str, int] = defaultdict(int)
-_durations_ms: deque[float] = deque(maxlen=2000)
+_latency_all = LatencyHistogram()
+# (route template, method, status class) -> histogram
+_route_latency: dict[tuple[str, str, str], LatencyHistogram] = defaultdict(LatencyHistogram)
+# (route template, method, status class) -> [SQL statements issued, DB time in ms]
+_route_db: dict[tuple[str, str, str], list[float]] = defaultdict(lambda: [0, 0.0])
+_pool_wait = LatencyHistogram()
+_pool_timeouts = 0
+_pool_usage: dict[str, tuple[int, int]] = {}  # pool name -> (checked out, capacity)
+_segment: MmapMetricsSegment | None = None
+_segment_pid: int | None = None
 
-_num_segment_re = re.compile(r"/\d+(?=/|$)")
-_uuid_segment_re = re.compile(
-    r"/[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}(?=/|$)"
-)
 
-
-def normalize_path(path: str) -> str:
-    normalized = _num_segment_re.sub("/:id", path)
-    normalized = _uuid_segment_re.sub("/:uuid", normalized)
-    return normalized
+def _worker_segment() -> MmapMetricsSegment | None:
+    """Return this process's shared-memory segment, (re)opening it after a fork. Caller holds _lock."""
+    global _segment, _segment_pid
+    if not METRICS_MULTIPROC_DIR:
+        return None
+    pid = os.getpid()
+    if _segment is None or _segment_pid != pid:
+        _segment = MmapMetricsSegment(segment_path(Path(METRICS_MULTIPROC_DIR), pid))
+        _segment_pid = pid
+        _segment.set(encode_key("started_at"), _started_at.timestamp())
+    return _segment
 
 
 def record_request_start() -> None:
     global _in_flight
     with _lock:
         _in_flight += 1
+        segment = _worker_segment()
+        if segment is not None:
+            segment.inc(encode_key("in_flight"))
 
 
-def record_request_end(path: str, status_code: int, duration_ms: float) -> None:
+def record_request_end(
+    status_code: int,
+    duration_ms: float,
+    method: str = "GET",
+    route: str | None = None,
+    db_queries: int = 0,
+    db_time_ms: float = 0.0,
+) -> None:
     global _in_flight, _requests_total
-    normalized = normalize_path(path)
+    # Prefer the matched route template; raw paths of unmatched requests would explode label cardinality.
+    route_label = route or UNMATCHED_ROUTE
     status_bucket = f"{status_code // 100}xx"
+    series = (route_label, method.upper(), status_bucket)
     with _lock:
         _in_flight = max(0, _in_flight - 1)
         _requests_total += 1
         _status_counts[status_bucket] += 1
-        _path_counts[normalized] += 1
-        _durations_ms.append(duration_ms)
+        _latency_all.observe(duration_ms)
+        _route_latency[series].observe(duration_ms)
+        route_db = _route_db[series]
+        route_db[0] += db_queries
+        route_db[1] += db_time_ms
+
+        segment = _worker_segment()
+        if segment is not None:
+            segment.inc(encode_key("in_flight"), -1)
+            segment.inc(encode_key("requests_total"))
+            segment.inc(encode_key("status", status_bucket))
+            segment.inc(encode_key("hist", *series, bisect_left(LATENCY_BUCKETS_MS, duration_ms)))
+            segment.inc(encode_key("hist_sum", *series), duration_ms)
+            if db_queries:
+                segment.inc(encode_key("db_queries", *series), db_queries)
+                segment.inc(encode_key("db_time_ms", *series), db_time_ms)
 
 
-def _percentile(values: list[float], p: float) -> float:
-    if not values:
-        return 0.0
-    values_sorted = sorted(values)
-    rank = int((len(values_sorted) - 1) * p)
-    return round(values_sorted[rank], 2)
+def record_pool_checkout(wait_ms: float, timed_out: bool = False) -> None:
+    global _pool_timeouts
+    with _lock:
+        _pool_wait.observe(wait_ms)
+        if timed_out:
+            _pool_timeouts += 1
+        segment = _worker_segment()
+        if segment is not None:
+            segment.inc(encode_key("pool_wait", bisect_left(LATENCY_BUCKETS_MS, wait_ms)))
+            segment.inc(encode_key("pool_wait_sum"), wait_ms)
+            if timed_out:
+                segment.inc(encode_key("pool_timeouts"))
 
 
-def get_metrics_snapshot() -> dict:
+def record_pool_usage(checked_out: int, capacity: int, pool_name: str = "sync") -> None:
+    """Gauge per pool (the sync and async engines each own one); the snapshot reports their sum."""
     with _lock:
-        durations = list(_durations_ms)
-        status_counts = dict(_status_counts)
-        path_counts = dict(_path_counts)
-        requests_total = _requests_total
-        in_flight = _in_flight
+        _pool_usage[pool_name] = (checked_out, capacity)
+        segment = _worker_segment()
+        if segment is not None:
+            segment.set(encode_key("pool_checked_out", pool_name), checked_out)
+            segment.set(encode_key("pool_capacity", pool_name), capacity)
+
+
+add_pool_listeners(record_pool_checkout, record_pool_usage)
+
+
+def collect_worker_metrics(directory: Path) -> dict:
+    """Merge the metric segments of every worker process found in directory."""
+    requests_total = 0
+    in_flight = 0
+    workers = 0
+    started_at = _started_at.timestamp()
+    status_counts: dict[str, int] = defaultdict(int)
+    route_latency: dict[tuple[str, str, str], LatencyHistogram] = defaultdict(LatencyHistogram)
+    route_db: dict[tuple[str, str, str], list[float]] = defaultdict(lambda: [0, 0.0])
+    pool_wait = LatencyHistogram()
+    pool = {"checked_out": 0, "capacity": 0, "timeouts": 0}
 
-    avg_latency_ms = round(sum(durations) / len(durations), 2) if durations else 0.0
-    top_paths = sorted(path_counts.items(), key=lambda item: item[1], reverse=True)[:15]
+    for pid, entries in iter_worker_segments(directory):
+        alive = pid_is_alive(pid)
+        workers += 1 if alive else 0
+        for key, value in entries.items():
+            name, *labels = decode_key(key)
+            if name == "requests_total":
+                requests_total += int(value)
+            elif name == "in_flight":
+                # A dead worker's in-flight gauge is stale; its counters still count toward totals.
+                in_flight += int(value) if alive else 0
+            elif name == "status":
+                status_counts[labels[0]] += int(value)
+            elif name == "hist":
+                route, method, status_bucket, idx = labels
+                hist = route_latency[(route, method, status_bucket)]
+                hist.counts[idx] += int(value)
+                hist.count += int(value)
+            elif name == "hist_sum":
+                route_latency[tuple(labels)].sum_ms += value
+            elif name == "db_queries":
+                route_db[tuple(labels)][0] += int(value)
+            elif name == "db_time_ms":
+                route_db[tuple(labels)][1] += value
+            elif name == "started_at":
+                started_at = min(started_at, value)
+            elif name == "pool_wait":
+                pool_wait.counts[labels[0]] += int(value)
+                pool_wait.count += int(value)
+            elif name == "pool_wait_sum":
+                pool_wait.sum_ms += value
+            elif name == "pool_timeouts":
+                pool["timeouts"] += int(value)
+            elif name in ("pool_checked_out", "pool_capacity") and alive:
+                pool[name.removeprefix("pool_")] += int(value)
 
+    latency_all = LatencyHistogram()
+    for hist in route_latency.values():
+        latency_all.merge(hist)
     return {
+        "requests_total": requests_total,
+        "in_flight": max(0, in_flight),
+        "workers": workers,
+        "started_at": datetime.fromtimestamp(started_at, UTC),
+        "status_counts": dict(status_counts),
+        "route_latency": dict(route_latency),
+        "route_db": dict(route_db),
+        "latency_all": latency_all,
+        "pool": pool,
+        "pool_wait": pool_wait,
+    }
+
+
+def _collect_local_metrics() -> dict:
+    with _lock:
+        return {
+            "requests_total": _requests_total,
+            "in_flight": _in_flight,
+            "workers": 1,
+            "started_at": _started_at,
+            "status_counts": dict(_status_counts),
+            "route_latency": {key: hist.copy() for key, hist in _route_latency.items()},
+            "route_db": {key: list(values) for key, values in _route_db.items()},
+            "latency_all": _latency_all.copy(),
+            "pool": {
+                "checked_out": sum(checked_out for checked_out, _ in _pool_usage.values()),
+                "capacity": sum(capacity for _, capacity in _pool_usage.values()),
+                "timeouts": _pool_timeouts,
+            },
+            "pool_wait": _pool_wait.copy(),
+        }
+
+
+def get_metrics_snapshot(include_buckets: bool = False) -> dict:
+    if METRICS_MULTIPROC_DIR:
+        with _lock:
+            _worker_segment()  # make sure this worker is visible even before its first request
+        collected = collect_worker_metrics(Path(METRICS_MULTIPROC_DIR))
+    else:
+        collected = _collect_local_metrics()
+    latency_all = collected["latency_all"]
+    route_latency = collected["route_latency"]
+    route_db = collected["route_db"]
+    status_counts = collected["status_counts"]
+    requests_total = collected["requests_total"]
+    in_flight = collected["in_flight"]
+    started_at = collected["started_at"]
+    pool = collected["pool"]
+
+    route_counts: dict[str, int] = defaultdict(int)
+    for (route, _, _), hist in route_latency.items():
+        route_counts[route] += hist.count
+    top_paths = sorted(route_counts.items(), key=lambda item: item[1], reverse=True)[:15]
+
+    overall = latency_all.summary()
+    routes = []
+    for (route, method, status_bucket), hist in sorted(route_latency.items()):
+        entry = {"route": route, "method": method, "status": status_bucket, **hist.summary()}
+        db_queries, db_time_ms = route_db.get((route, method, status_bucket), (0, 0.0))
+        entry["db_queries"] = int(db_queries)
+        entry["db_time_ms"] = round(db_time_ms, 2)
+        entry["db_queries_avg"] = round(db_queries / hist.count, 2) if hist.count else 0.0
+        if include_buckets:
+            entry["buckets"] = list(hist.counts)
+        routes.append(entry)
+
+    snapshot = {
         "service": "PaintFlow.ai",
-        "started_at": _started_at.isoformat(),
-        "uptime_seconds": int((datetime.now(UTC) - _started_at).total_seconds()),
+        "started_at": started_at.isoformat(),
+        "uptime_seconds": int((datetime.now(UTC) - started_at).total_seconds()),
+        "workers": collected["workers"],
         "requests": {
             "total": requests_total,
             "in_flight": in_flight,
             "by_status": status_counts,
             "latency_ms": {
-                "avg": avg_latency_ms,
-                "p50": _percentile(durations, 0.5),
-                "p95": _percentile(durations, 0.95),
+                "avg": overall["avg"],
+                "p50": overall["p50"],
+                "p95": overall["p95"],
+                "p99": overall["p99"],
             },
         },
+        "routes": routes,
+        "database_pool": {
+            "checked_out": pool["checked_out"],
+            "capacity": pool["capacity"],
+            "saturation": round(pool["checked_out"] / pool["capacity"], 3) if pool["capacity"] else 0.0,
+            "checkout_timeouts": pool["timeouts"],
+            "checkout_wait_ms": collected["pool_wait"].summary(),
+        },
         "top_paths": [{"path": path, "count": count} for path, count in top_paths],
     }
+    if include_buckets:
+        snapshot["latency_buckets_ms"] = list(LATENCY_BUCKETS_MS)
+        snapshot["database_pool"]["checkout_wait_buckets"] = list(collected["pool_wait"].counts)
+    return snapshot
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if math.isinf(bound) else repr(bound)
 
 
 def render_prometheus_metrics(snapshot: dict) -> str:
@@ -100,8 +358,63 @@ def render_prometheus_metrics(snapshot: dict) -> str:
     lines.append(f"paintflow_http_latency_ms_avg {latency.get('avg', 0.0)}")
     lines.append(f"paintflow_http_latency_ms_p50 {latency.get('p50', 0.0)}")
     lines.append(f"paintflow_http_latency_ms_p95 {latency.get('p95', 0.0)}")
+    lines.append(f"paintflow_http_latency_ms_p99 {latency.get('p99', 0.0)}")
+
+    bounds = [*snapshot.get("latency_buckets_ms", LATENCY_BUCKETS_MS), math.inf]
+    db_query_lines: list[str] = []
+    db_time_lines: list[str] = []
+    lines.append("# HELP paintflow_http_request_duration_ms HTTP request latency by route, method and status class.")
+    lines.append("# TYPE paintflow_http_request_duration_ms histogram")
+    for entry in snapshot.get("routes", []):
+        labels = (
+            f'route="{_escape_label(entry["route"])}",'
+            f'method="{entry["method"]}",'
+            f'status="{entry["status"]}"'
+        )
+        buckets = entry.get("buckets")
+        if buckets:
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, buckets):
+                cumulative += bucket_count
+                lines.append(
+                    f'paintflow_http_request_duration_ms_bucket{{{labels},le="{_format_bound(bound)}"}} {cumulative}'
+                )
+        lines.append(f"paintflow_http_request_duration_ms_sum{{{labels}}} {entry['sum']}")
+        lines.append(f"paintflow_http_request_duration_ms_count{{{labels}}} {entry['count']}")
+        db_query_lines.append(f"paintflow_http_db_queries_total{{{labels}}} {entry.get('db_queries', 0)}")
+        db_time_lines.append(f"paintflow_http_db_time_ms_total{{{labels}}} {entry.get('db_time_ms', 0.0)}")
+
+    lines.append("# HELP paintflow_http_db_queries_total SQL statements issued while serving requests.")
+    lines.append("# TYPE paintflow_http_db_queries_total counter")
+    lines.extend(db_query_lines)
+    lines.append("# HELP paintflow_http_db_time_ms_total Time spent in SQL statements while serving requests.")
+    lines.append("# TYPE paintflow_http_db_time_ms_total counter")
+    lines.extend(db_time_lines)
+
+    pool = snapshot.get("database_pool", {})
+    lines.append("# HELP paintflow_db_pool_checked_out Connections currently checked out of the pool.")
+    lines.append("# TYPE paintflow_db_pool_checked_out gauge")
+    lines.append(f"paintflow_db_pool_checked_out {pool.get('checked_out', 0)}")
+    lines.append("# HELP paintflow_db_pool_capacity Pool size plus max overflow.")
+    lines.append("# TYPE paintflow_db_pool_capacity gauge")
+    lines.append(f"paintflow_db_pool_capacity {pool.get('capacity', 0)}")
+    lines.append("# HELP paintflow_db_pool_checkout_timeouts_total Checkouts that timed out waiting for a connection.")
+    lines.append("# TYPE paintflow_db_pool_checkout_timeouts_total counter")
+    lines.append(f"paintflow_db_pool_checkout_timeouts_total {pool.get('checkout_timeouts', 0)}")
+    wait = pool.get("checkout_wait_ms", {})
+    lines.append("# HELP paintflow_db_pool_checkout_wait_ms Time spent waiting for a pooled connection.")
+    lines.append("# TYPE paintflow_db_pool_checkout_wait_ms histogram")
+    cumulative = 0
+    for bound, bucket_count in zip(bounds, pool.get("checkout_wait_buckets", [])):
+        cumulative += bucket_count
+        lines.append(f'paintflow_db_pool_checkout_wait_ms_bucket{{le="{_format_bound(bound)}"}} {cumulative}')
+    lines.append(f"paintflow_db_pool_checkout_wait_ms_sum {wait.get('sum', 0.0)}")
+    lines.append(f"paintflow_db_pool_checkout_wait_ms_count {wait.get('count', 0)}")
 
     lines.append("# HELP paintflow_process_uptime_seconds Service uptime in seconds.")
     lines.append("# TYPE paintflow_process_uptime_seconds gauge")
     lines.append(f"paintflow_process_uptime_seconds {snapshot.get('uptime_seconds', 0)}")
+    lines.append("# HELP paintflow_workers Live worker processes contributing to these metrics.")
+    lines.append("# TYPE paintflow_workers gauge")
+    lines.append(f"paintflow_workers {snapshot.get('workers', 1)}")
     return "\n".join(lines) + "\n"
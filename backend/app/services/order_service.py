@@ -1,9 +1,12 @@
 """Order lifecycle management for dealers."""
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from datetime import datetime
-from app.models import DealerOrder, Dealer, SKU, Shade
+from app.models import DealerOrder, Dealer, SKU, Shade, User
+from app.services.dealer_health_service import mark_dealer_orders_changed
+from app.services.notification_service import create_notifications_for_users
 
 VALID_TRANSITIONS = {
     "placed": ["confirmed", "cancelled"],
@@ -14,6 +17,77 @@ VALID_TRANSITIONS = {
 }
 
 
+def place_dealer_orders(
+    db: Session,
+    dealer_id: int,
+    lines: list[dict],
+    *,
+    order_source: str = "manual",
+    is_ai_suggested: bool = False,
+    notification: tuple[str, str] | None = None,
+) -> dict:
+    """
+    Place one order per line ({"sku_id", "quantity", optional "savings_amount"}) in a single
+    transaction: one catalog lookup, one multi-row INSERT and one aggregated admin notification.
+    """
+    if not lines:
+        return {"success": True, "orders_placed": 0, "order_ids": [], "total_units": 0, "total_value": 0, "total_savings": 0}
+
+    sku_ids = {line["sku_id"] for line in lines}
+    mrp_by_sku = dict(db.query(SKU.id, SKU.mrp).filter(SKU.id.in_(sku_ids)).all())
+    unknown = sorted(sku_ids - mrp_by_sku.keys())
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"SKU not found: {unknown}")
+
+    order_date = datetime.utcnow()
+    rows = [
+        {
+            "dealer_id": dealer_id,
+            "sku_id": line["sku_id"],
+            "quantity": line["quantity"],
+            "order_date": order_date,
+            "status": "placed",
+            "is_ai_suggested": is_ai_suggested,
+            "order_source": order_source,
+            "savings_amount": line.get("savings_amount", 0.0),
+        }
+        for line in lines
+    ]
+    total_units = sum(row["quantity"] for row in rows)
+    total_value = round(sum(row["quantity"] * mrp_by_sku[row["sku_id"]] for row in rows), 2)
+    total_savings = round(sum(row["savings_amount"] for row in rows), 0)
+    if notification is None:
+        notification = (
+            "Dealer Bulk Order Placed",
+            f"Dealer #{dealer_id} placed {len(rows)} orders ({total_units} units, \u20b9{total_value:,.0f}).",
+        )
+
+    try:
+        order_ids = sorted(db.scalars(
+            insert(DealerOrder).returning(DealerOrder.id),
+            rows,
+        ))
+        mark_dealer_orders_changed(db, dealer_id, [order_date])
+        admin_ids = [row[0] for row in db.query(User.id).filter(User.role == "admin", User.is_active == True).all()]
+        title, message = notification
+        create_notifications_for_users(
+            db, admin_ids, title=title, message=message, type="info", category="order", link="/admin", commit=False
+        )
+        db.commit()
+    except Exception as exc:
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Failed to place orders") from exc
+
+    return {
+        "success": True,
+        "orders_placed": len(order_ids),
+        "order_ids": order_ids,
+        "total_units": total_units,
+        "total_value": total_value,
+        "total_savings": total_savings,
+    }
+
+
 def update_order_status(db: Session, order_id: int, dealer_id: int, new_status: str):
     order = db.query(DealerOrder).filter(
         DealerOrder.id == order_id,
@@ -0,0 +1,158 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import CodeType, FrameType
+
+
+MAX_PROFILE_SECONDS = 60.0
+MIN_INTERVAL_MS = 1.0
+MAX_STACK_DEPTH = 128
+OTHER_ROUTE = "<no-route>"
+
+_profile_lock = threading.Lock()
+
+
+class ProfilerBusyError(RuntimeError):
+    pass
+
+
+def endpoint_code_map(routes) -> dict[CodeType, str]:
+    """Map each route endpoint's code object to its path template so samples can be attributed."""
+    mapping: dict[CodeType, str] = {}
+    for route in routes:
+        endpoint = getattr(route, "endpoint", None)
+        code = getattr(endpoint, "__code__", None)
+        if code is not None and getattr(route, "path", None):
+            mapping[code] = route.path
+    return mapping
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def _attributed_stack(frame: FrameType, endpoints: dict[CodeType, str]) -> tuple[str, tuple[str, ...]] | None:
+    """Return (route, frames from the endpoint down to the leaf), or None for idle/non-request threads."""
+    chain: list[FrameType] = []
+    current = frame
+    while current is not None:
+        chain.append(current)
+        current = current.f_back
+    chain.reverse()  # root first
+    for idx, candidate in enumerate(chain):
+        route = endpoints.get(candidate.f_code)
+        if route is not None:
+            return route, tuple(_frame_label(item) for item in chain[idx:idx + MAX_STACK_DEPTH])
+    return None
+
+
+class SamplingProfiler:
+    """Statistical wall-clock profiler: a daemon thread snapshots every thread's stack at a fixed interval."""
+
+    def __init__(self, endpoints: dict[CodeType, str], interval_ms: float = 10.0, include_idle: bool = False):
+        self.endpoints = endpoints
+        self.interval_s = max(MIN_INTERVAL_MS, interval_ms) / 1000
+        self.include_idle = include_idle
+        self.samples: Counter[tuple[str, tuple[str, ...]]] = Counter()
+        self.sample_count = 0
+        self.started_at = 0.0
+        self.stopped_at = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="paintflow-profiler", daemon=True)
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop.is_set():
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                attributed = _attributed_stack(frame, self.endpoints)
+                if attributed is None:
+                    if not self.include_idle:
+                        continue
+                    attributed = (OTHER_ROUTE, (_frame_label(frame),))
+                self.samples[attributed] += 1
+            self.sample_count += 1
+            self._stop.wait(self.interval_s)
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self.stopped_at = time.perf_counter()
+
+    def collapsed(self) -> str:
+        """Brendan Gregg collapsed-stack format with the route template as the root frame."""
+        lines = [
+            ";".join((route, *frames)) + f" {count}"
+            for (route, frames), count in sorted(self.samples.items(), key=lambda item: item[1], reverse=True)
+        ]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def speedscope(self) -> dict:
+        """Speedscope file with one sampled profile per route, sharing a frame table."""
+        frame_index: dict[str, int] = {}
+        frames: list[dict] = []
+        per_route: dict[str, list[tuple[list[int], int]]] = {}
+        interval_ms = round(self.interval_s * 1000, 3)
+
+        for (route, stack), count in self.samples.items():
+            indices = []
+            for label in stack:
+                if label not in frame_index:
+                    frame_index[label] = len(frames)
+                    frames.append({"name": label})
+                indices.append(frame_index[label])
+            per_route.setdefault(route, []).append((indices, count))
+
+        profiles = []
+        for route, stacks in sorted(per_route.items(), key=lambda item: -sum(count for _, count in item[1])):
+            weights = [count * interval_ms for _, count in stacks]
+            profiles.append(
+                {
+                    "type": "sampled",
+                    "name": route,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": round(sum(weights), 3),
+                    "samples": [indices for indices, _ in stacks],
+                    "weights": weights,
+                }
+            )
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": "PaintFlow.ai live profile",
+            "exporter": "paintflow-sampling-profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def summary(self) -> dict:
+        by_route: Counter[str] = Counter()
+        for (route, _), count in self.samples.items():
+            by_route[route] += count
+        return {
+            "duration_seconds": round(self.stopped_at - self.started_at, 3),
+            "interval_ms": round(self.interval_s * 1000, 3),
+            "ticks": self.sample_count,
+            "routes": [{"route": route, "samples": count} for route, count in by_route.most_common()],
+        }
+
+
+def acquire_profiler_slot() -> None:
+    """Only one profile may run per process; concurrent sampling would double the overhead."""
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profiling session is already running.")
+
+
+def release_profiler_slot() -> None:
+    _profile_lock.release()
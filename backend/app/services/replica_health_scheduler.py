@@ -0,0 +1,23 @@
+import asyncio
+
+from app.config import DB_REPLICA_CHECK_SECONDS
+from app.database import replica_router
+
+
+async def replica_health_loop(stop_event: asyncio.Event):
+    if not replica_router.replicas:
+        return
+
+    print(f"Replica health checker active. Checking {len(replica_router.replicas)} replica(s) every {DB_REPLICA_CHECK_SECONDS}s")
+
+    while not stop_event.is_set():
+        try:
+            # Probes block on the network, so they run in a worker thread; requests only read the result.
+            await asyncio.to_thread(replica_router.refresh, True)
+        except Exception as exc:
+            print(f"Warning: Replica health check failed: {exc}")
+
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=max(1, DB_REPLICA_CHECK_SECONDS))
+        except asyncio.TimeoutError:
+            continue
@@ -0,0 +1,25 @@
+import asyncio
+
+from app.config import RESERVATION_SWEEP_ENABLED, RESERVATION_SWEEP_SECONDS
+from app.services.reservation_service import sweep_expired_reservations
+
+
+async def reservation_sweep_loop(stop_event: asyncio.Event):
+    if not RESERVATION_SWEEP_ENABLED:
+        print("Reservation sweeper disabled (RESERVATION_SWEEP_ENABLED=false).")
+        return
+
+    print(f"Reservation sweeper active. Releasing expired stock holds every {RESERVATION_SWEEP_SECONDS}s")
+
+    while not stop_event.is_set():
+        try:
+            expired = await asyncio.to_thread(sweep_expired_reservations)
+            if expired:
+                print(f"Reservation sweeper released {expired} expired hold(s).")
+        except Exception as exc:
+            print(f"Warning: Reservation sweep failed: {exc}")
+
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=max(30, RESERVATION_SWEEP_SECONDS))
+        except asyncio.TimeoutError:
+            continue
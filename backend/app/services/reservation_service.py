@@ -0,0 +1,172 @@
+"""
+Stock reservations for customer orders.
+
+Checkout holds stock at the dealer's warehouse with one conditional UPDATE on inventory_levels
+(reserved_stock grows only where current_stock - reserved_stock covers the line), so concurrent
+checkouts can never promise the same units twice and no row is read before it is written. The
+reservation rows are inserted ahead of it, so the UPDATE is the last statement before commit and
+row locks on hot SKUs are held for as short as possible. A reservation is consumed when the dealer
+fulfils the order, released when it is cancelled, and expired by the sweeper
+(reservation_scheduler) after RESERVATION_TTL_HOURS.
+Closing flips the reservation's status conditionally first, so two closers can never both
+return the same units.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import case, func, insert, update
+from sqlalchemy.orm import Session
+
+from app.config import RESERVATION_TTL_HOURS
+from app.database import SessionLocal
+from app.geo import haversine_km
+from app.models import Cart, Dealer, InventoryLevel, StockReservation
+from app.services.catalog_cache import catalog_cache
+
+
+HELD = "held"
+CONSUMED = "consumed"
+RELEASED = "released"
+EXPIRED = "expired"
+NEARBY_RADIUS_KM = 50
+
+
+def available_to_promise():
+    return InventoryLevel.current_stock - InventoryLevel.reserved_stock
+
+
+def _per_sku(quantities: dict[int, int]):
+    return case(quantities, value=InventoryLevel.sku_id)
+
+
+def _floor_zero(column, amount):
+    return case((column > amount, column - amount), else_=0)
+
+
+def reserve_stock(db: Session, order_id: int, warehouse_id: int, quantities: dict[int, int]) -> None:
+    """Hold every line at the warehouse or raise 409; does not commit (roll back on error)."""
+    # Holds are inserted first; a 409 below rolls them back with the rest of the checkout.
+    now = datetime.utcnow()
+    expires_at = now + timedelta(hours=RESERVATION_TTL_HOURS)
+    db.execute(insert(StockReservation), [
+        {
+            "order_id": order_id,
+            "warehouse_id": warehouse_id,
+            "sku_id": sku_id,
+            "quantity": quantity,
+            "status": HELD,
+            "created_at": now,
+            "expires_at": expires_at,
+        }
+        for sku_id, quantity in quantities.items()
+    ])
+
+    needed = _per_sku(quantities)
+    reserved = db.scalars(
+        update(InventoryLevel)
+        .where(
+            InventoryLevel.warehouse_id == warehouse_id,
+            InventoryLevel.sku_id.in_(list(quantities)),
+            available_to_promise() >= needed,
+        )
+        .values(reserved_stock=InventoryLevel.reserved_stock + needed)
+        .returning(InventoryLevel.sku_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    short = sorted(set(quantities) - set(reserved))
+    if short:
+        skus = catalog_cache.skus()
+        codes = [skus[sku_id]["sku_code"] if sku_id in skus else str(sku_id) for sku_id in short]
+        raise HTTPException(status_code=409, detail=f"Insufficient stock at this dealer for: {', '.join(codes)}")
+
+
+def _close_reservations(db: Session, condition, new_status: str) -> int:
+    """Move matching held reservations to new_status and give their units back; does not commit."""
+    closed = db.execute(
+        update(StockReservation)
+        .where(StockReservation.status == HELD, condition)
+        .values(status=new_status, closed_at=datetime.utcnow())
+        .returning(StockReservation.warehouse_id, StockReservation.sku_id, StockReservation.quantity)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    by_warehouse: dict[int, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    for warehouse_id, sku_id, quantity in closed:
+        by_warehouse[warehouse_id][sku_id] += quantity
+    for warehouse_id, quantities in by_warehouse.items():
+        amount = _per_sku(dict(quantities))
+        values = {"reserved_stock": _floor_zero(InventoryLevel.reserved_stock, amount)}
+        if new_status == CONSUMED:
+            # Fulfilled units leave the warehouse; the next stock ingestion overwrites this with the WMS count.
+            values["current_stock"] = _floor_zero(InventoryLevel.current_stock, amount)
+        db.execute(
+            update(InventoryLevel)
+            .where(InventoryLevel.warehouse_id == warehouse_id, InventoryLevel.sku_id.in_(list(quantities)))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+    return len(closed)
+
+
+def consume_order_stock(db: Session, order_id: int) -> int:
+    return _close_reservations(db, StockReservation.order_id == order_id, CONSUMED)
+
+
+def release_order_stock(db: Session, order_id: int) -> int:
+    return _close_reservations(db, StockReservation.order_id == order_id, RELEASED)
+
+
+def expire_reservations(db: Session, now: datetime | None = None) -> int:
+    return _close_reservations(db, StockReservation.expires_at <= (now or datetime.utcnow()), EXPIRED)
+
+
+def sweep_expired_reservations() -> int:
+    """Expire overdue holds and commit in its own session (scheduler entry point)."""
+    db = SessionLocal()
+    try:
+        expired = expire_reservations(db)
+        db.commit()
+        return expired
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+# ─── Inventory-aware dealer routing ───
+
+def get_checkout_dealers(db: Session, user_id: int, lat: float, lng: float, limit: int = 10) -> dict:
+    """Nearby dealers flagged by whether their warehouse can fill the whole cart, plus the nearest one that can."""
+    cart = dict(db.query(Cart.sku_id, Cart.quantity).filter(Cart.user_id == user_id).all())
+    fillable: set[int] = set()
+    if cart:
+        fillable = {
+            warehouse_id
+            for (warehouse_id,) in db.query(InventoryLevel.warehouse_id)
+            .filter(InventoryLevel.sku_id.in_(list(cart)), available_to_promise() >= _per_sku(cart))
+            .group_by(InventoryLevel.warehouse_id)
+            .having(func.count() == len(cart))
+        }
+
+    ranked = sorted(
+        (
+            {
+                "id": dealer.id,
+                "name": dealer.name,
+                "city": dealer.city,
+                "distance_km": round(haversine_km(lat, lng, dealer.latitude, dealer.longitude), 1),
+                "can_fill_cart": dealer.warehouse_id in fillable,
+                "latitude": dealer.latitude,
+                "longitude": dealer.longitude,
+            }
+            for dealer in db.query(Dealer).all()
+        ),
+        key=lambda dealer: dealer["distance_km"],
+    )
+    return {
+        "suggested_dealer": next((dealer for dealer in ranked if dealer["can_fill_cart"]), None),
+        "dealers": [dealer for dealer in ranked if dealer["distance_km"] < NEARBY_RADIUS_KM][:limit],
+    }
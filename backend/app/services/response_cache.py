@@ -0,0 +1,279 @@
+"""
+Read-through response cache for dashboard and analytics endpoints.
+
+Entries are fresh for their TTL, then served stale for up to RESPONSE_CACHE_STALE_SECONDS
+while a single background refresh recomputes them. Concurrent misses on the same key share
+one computation (single flight). Every entry is tagged with the tables it reads; committing
+a session that wrote to one of those tables bumps the tag's generation, and entries built
+under an older generation are treated as misses.
+
+The in-memory backend is per process. Set RESPONSE_CACHE_URL=redis://... to share entries
+and tag generations between workers (requires the optional `redis` package).
+"""
+
+import json
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import (
+    RESPONSE_CACHE_ENABLED,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_STALE_SECONDS,
+    RESPONSE_CACHE_URL,
+    get_simulation_date_str,
+)
+from app.database import read_session
+
+
+logger = logging.getLogger("paintflow.cache")
+
+
+# ─── Backends ───
+
+class MemoryCacheBackend:
+    """Process-local LRU of Python objects."""
+
+    shared = False
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+        # Generations restart at zero with the process, so versions are only comparable within it.
+        self.epoch = secrets.token_hex(4)
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: dict, expire_seconds: float) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generations(self, tags: Iterable[str]) -> dict[str, int]:
+        with self._lock:
+            return {tag: self._generations.get(tag, 0) for tag in tags}
+
+    def bump(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCacheBackend:
+    """Shared backend: JSON entries with a Redis expiry, tag generations as Redis counters."""
+
+    shared = True
+
+    def __init__(self, url: str, prefix: str = "paintflow:cache:"):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    @property
+    def epoch(self) -> str:
+        # Shared by all workers; regenerated if Redis loses the counters.
+        self._client.set(f"{self._prefix}epoch", secrets.token_hex(4), nx=True)
+        return self._client.get(f"{self._prefix}epoch").decode()
+
+    def get(self, key: str) -> dict | None:
+        raw = self._client.get(self._prefix + key)
+        return json.loads(raw) if raw else None
+
+    def set(self, key: str, entry: dict, expire_seconds: float) -> None:
+        payload = dict(entry, value=jsonable_encoder(entry["value"]))
+        self._client.set(self._prefix + key, json.dumps(payload), ex=max(1, int(expire_seconds)))
+
+    def generations(self, tags: Iterable[str]) -> dict[str, int]:
+        tags = list(tags)
+        if not tags:
+            return {}
+        values = self._client.mget([f"{self._prefix}gen:{tag}" for tag in tags])
+        return {tag: int(value or 0) for tag, value in zip(tags, values)}
+
+    def bump(self, tags: Iterable[str]) -> None:
+        pipe = self._client.pipeline()
+        for tag in tags:
+            pipe.incr(f"{self._prefix}gen:{tag}")
+        pipe.execute()
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(f"{self._prefix}*"):
+            self._client.delete(key)
+
+
+def create_backend(url: str = RESPONSE_CACHE_URL, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheBackend(url)
+    return MemoryCacheBackend(max_entries)
+
+
+# ─── Cache ───
+
+class ResponseCache:
+    def __init__(self, backend, stale_seconds: float = 120.0, enabled: bool = True):
+        self.backend = backend
+        self.stale_seconds = stale_seconds
+        self.enabled = enabled
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "errors": 0}
+        self._inflight: dict[str, threading.Event] = {}
+        self._inflight_lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="paintflow-cache")
+
+    def _count(self, name: str) -> None:
+        with self._inflight_lock:
+            self.stats[name] += 1
+
+    def _compute(self, key: str, loader: Callable[[], Any], ttl: float, tags: tuple[str, ...]) -> Any:
+        # Snapshot generations before loading: a write that lands mid-load leaves the entry already stale.
+        generations = self.backend.generations(tags)
+        value = loader()
+        entry = {"value": value, "stored_at": time.time(), "ttl": ttl, "generations": generations}
+        self.backend.set(key, entry, ttl + self.stale_seconds)
+        return value
+
+    def _single_flight(self, key: str) -> tuple[threading.Event, bool]:
+        """Return (event, leader); only the leader computes, followers wait on the event."""
+        with self._inflight_lock:
+            pending = self._inflight.get(key)
+            if pending is not None:
+                return pending, False
+            pending = threading.Event()
+            self._inflight[key] = pending
+            return pending, True
+
+    def _finish(self, key: str, pending: threading.Event) -> None:
+        with self._inflight_lock:
+            self._inflight.pop(key, None)
+        pending.set()
+
+    def _refresh(self, key: str, loader: Callable[[], Any], ttl: float, tags: tuple[str, ...]) -> None:
+        pending, leader = self._single_flight(key)
+        if not leader:
+            return
+        try:
+            self._compute(key, loader, ttl, tags)
+            self._count("refreshes")
+        except Exception:
+            self._count("errors")
+            logger.exception("Background refresh failed for %s", key)
+        finally:
+            self._finish(key, pending)
+
+    def get_or_load(self, key: str, loader: Callable[[], Any], *, ttl: float, tags: Iterable[str] = ()) -> Any:
+        tags = tuple(sorted(set(tags)))
+        if not self.enabled:
+            return loader()
+
+        for _ in range(2):
+            entry = self.backend.get(key)
+            if entry is not None and entry["generations"] == self.backend.generations(tags):
+                age = time.time() - entry["stored_at"]
+                if age < entry["ttl"]:
+                    self._count("hits")
+                    return entry["value"]
+                if age < entry["ttl"] + self.stale_seconds:
+                    self._count("stale_hits")
+                    self._refresher.submit(self._refresh, key, loader, ttl, tags)
+                    return entry["value"]
+
+            pending, leader = self._single_flight(key)
+            if leader:
+                self._count("misses")
+                try:
+                    return self._compute(key, loader, ttl, tags)
+                finally:
+                    self._finish(key, pending)
+            # Another request is already computing this key: wait for it, then re-read.
+            pending.wait(timeout=30)
+        return loader()
+
+    def invalidate(self, *tags: str) -> None:
+        if tags:
+            self.backend.bump(tags)
+
+    def table_versions(self, tables: Iterable[str]) -> tuple[str, dict[str, int]]:
+        """(epoch, per-table write counters): changes whenever a committed write touches one of the tables."""
+        return self.backend.epoch, self.backend.generations(sorted(set(tables)))
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+
+response_cache = ResponseCache(
+    create_backend(),
+    stale_seconds=RESPONSE_CACHE_STALE_SECONDS,
+    enabled=RESPONSE_CACHE_ENABLED,
+)
+
+
+def cached_read(key: str, loader: Callable[[Session], Any], *, ttl: float, tags: Iterable[str]) -> Any:
+    """Serve loader(read_session) from the response cache; the session is only opened on a miss."""
+    def load():
+        with read_session() as db:
+            return loader(db)
+
+    # Analytics windows are relative to the simulation date, so entries never outlive the day.
+    return response_cache.get_or_load(f"{get_simulation_date_str()}:{key}", load, ttl=ttl, tags=tags)
+
+
+# ─── Invalidation from committed writes ───
+
+_WRITTEN_TABLES_KEY = "response_cache_written_tables"
+
+
+def _written_tables(session) -> set[str]:
+    return session.info.setdefault(_WRITTEN_TABLES_KEY, set())
+
+
+@event.listens_for(Session, "before_flush")
+def _track_flushed_tables(session, flush_context, instances):
+    tables = _written_tables(session)
+    # session.dirty also lists objects whose attributes were set to their current value.
+    dirty = [obj for obj in session.dirty if session.is_modified(obj)]
+    for obj in (*session.new, *dirty, *session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table:
+            tables.add(table)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_dml_tables(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _written_tables(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_written_tables(session):
+    tables = session.info.pop(_WRITTEN_TABLES_KEY, None)
+    if tables:
+        response_cache.invalidate(*tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_tables(session):
+    session.info.pop(_WRITTEN_TABLES_KEY, None)
@@ -0,0 +1,29 @@
+import asyncio
+from pathlib import Path
+
+from app.config import RETENTION_ARCHIVE_DIR, RETENTION_ENABLED, RETENTION_POLL_SECONDS
+from app.services.retention_service import apply_retention
+
+
+async def retention_loop(stop_event: asyncio.Event):
+    if not RETENTION_ENABLED:
+        print("Retention scheduler disabled (RETENTION_ENABLED=false).")
+        return
+
+    archive = Path(RETENTION_ARCHIVE_DIR)
+    print(f"Retention scheduler active. Archiving every {RETENTION_POLL_SECONDS}s to {archive}")
+
+    while not stop_event.is_set():
+        try:
+            # Batches are synchronous DB work; keep them off the event loop.
+            summary = await asyncio.to_thread(apply_retention, archive)
+            archived = {entity: info["archived"] for entity, info in summary.items() if info["archived"]}
+            if archived:
+                print(f"Retention scheduler archived rows: {archived}")
+        except Exception as exc:
+            print(f"Warning: Scheduled retention loop failed: {exc}")
+
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=max(60, RETENTION_POLL_SECONDS))
+        except asyncio.TimeoutError:
+            continue
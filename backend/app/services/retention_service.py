@@ -0,0 +1,227 @@
+import gzip
+import json
+import os
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.config import AUDIT_LOG_RETENTION_DAYS, INGESTION_RUN_RETENTION_DAYS, RETENTION_BATCH_SIZE
+from app.database import SessionLocal
+from app.file_lock import exclusive_lock
+from app.models import AuditLog, IngestionRun, LogArchivePartition
+
+
+# entity -> (model, timestamp column used for partitioning, retention days)
+RETENTION_POLICIES = {
+    "audit_logs": (AuditLog, AuditLog.created_at, AUDIT_LOG_RETENTION_DAYS),
+    "ingestion_runs": (IngestionRun, IngestionRun.started_at, INGESTION_RUN_RETENTION_DAYS),
+}
+
+
+def _serialize_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _serialize_row(row) -> dict:
+    return {column.name: _serialize_value(getattr(row, column.key)) for column in row.__table__.columns}
+
+
+def partition_path(archive_dir: Path, entity: str, day: date) -> Path:
+    return archive_dir / entity / f"{day:%Y}" / f"{day:%m}" / f"{entity}-{day.isoformat()}.ndjson.gz"
+
+
+def _append_partition(path: Path, rows: list[dict], committed_size: int) -> int:
+    """Append rows as a new gzip member; concatenated members read back as one stream.
+
+    Bytes past committed_size (the partition's size_bytes) were appended by a run that died
+    before its commit; they are cut off first so a retry never archives the same rows twice.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "r+b" if path.exists() else "wb") as raw:
+        raw.truncate(committed_size)
+        raw.seek(committed_size)
+        with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+            for row in rows:
+                gz.write(json.dumps(row, ensure_ascii=True).encode("utf-8"))
+                gz.write(b"\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+    return path.stat().st_size
+
+
+def archive_entity_batch(db: Session, entity: str, cutoff: datetime, archive_dir: Path, batch_size: int) -> int:
+    """Archive and delete one bounded batch of rows older than cutoff. Returns rows removed."""
+    model, ts_column, _ = RETENTION_POLICIES[entity]
+    rows = (
+        db.query(model)
+        .filter(ts_column < cutoff)
+        .order_by(model.id.asc())
+        .limit(batch_size)
+        .all()
+    )
+    if not rows:
+        return 0
+
+    by_day: dict[date, list] = defaultdict(list)
+    for row in rows:
+        stamp = getattr(row, ts_column.key)
+        by_day[stamp.date()].append(row)
+
+    existing = {
+        partition.partition_date: partition
+        for partition in db.query(LogArchivePartition).filter(
+            LogArchivePartition.entity == entity,
+            LogArchivePartition.partition_date.in_(list(by_day.keys())),
+        )
+    }
+
+    # Archive every row that is deleted below. A partition's ids are not increasing over time
+    # (ingestion_runs are inserted when they finish but partitioned by started_at), so
+    # min/max_row_id are only bounds; _append_partition handles retries after a crash.
+    now = datetime.utcnow()
+    for day, day_rows in by_day.items():
+        partition = existing.get(day)
+        path = partition_path(archive_dir, entity, day)
+        size_bytes = _append_partition(
+            path, [_serialize_row(row) for row in day_rows], partition.size_bytes if partition else 0
+        )
+        if partition is None:
+            partition = LogArchivePartition(
+                entity=entity,
+                partition_date=day,
+                file_path=str(path),
+                row_count=0,
+                created_at=now,
+            )
+            db.add(partition)
+        day_ids = [row.id for row in day_rows]
+        partition.row_count += len(day_rows)
+        partition.min_row_id = min(partition.min_row_id or min(day_ids), min(day_ids))
+        partition.max_row_id = max(partition.max_row_id or 0, max(day_ids))
+        partition.size_bytes = size_bytes
+        partition.updated_at = now
+
+    db.execute(delete(model).where(model.id.in_([row.id for row in rows])))
+    db.commit()
+    return len(rows)
+
+
+def apply_retention(
+    archive_dir: Path,
+    *,
+    now: datetime | None = None,
+    batch_size: int = RETENTION_BATCH_SIZE,
+    max_batches: int | None = None,
+) -> dict:
+    now = now or datetime.utcnow()
+    batch_size = max(1, batch_size)
+    archive_dir = Path(archive_dir)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    # Every worker runs the retention loop; only one at a time may append to the partition files.
+    with exclusive_lock(archive_dir / ".retention.lock"):
+        return _apply_retention(archive_dir, now, batch_size, max_batches)
+
+
+def _apply_retention(archive_dir: Path, now: datetime, batch_size: int, max_batches: int | None) -> dict:
+    summary = {}
+    for entity, (_, _, retention_days) in RETENTION_POLICIES.items():
+        cutoff = now - timedelta(days=retention_days)
+        archived = batches = 0
+        while max_batches is None or batches < max_batches:
+            db = SessionLocal()
+            try:
+                removed = archive_entity_batch(db, entity, cutoff, archive_dir, batch_size)
+            finally:
+                db.close()
+            if not removed:
+                break
+            archived += removed
+            batches += 1
+        summary[entity] = {
+            "cutoff": cutoff.isoformat(),
+            "archived": archived,
+            "batches": batches,
+        }
+    return summary
+
+
+def _serialize_partition(partition: LogArchivePartition) -> dict:
+    return {
+        "id": partition.id,
+        "entity": partition.entity,
+        "partition_date": partition.partition_date.isoformat(),
+        "file_path": partition.file_path,
+        "row_count": partition.row_count,
+        "min_row_id": partition.min_row_id,
+        "max_row_id": partition.max_row_id,
+        "size_bytes": partition.size_bytes,
+        "updated_at": partition.updated_at.isoformat() if partition.updated_at else None,
+    }
+
+
+def list_archive_partitions(
+    db: Session,
+    *,
+    entity: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    limit: int = 100,
+    offset: int = 0,
+) -> dict:
+    limit = max(1, min(limit, 500))
+    offset = max(0, offset)
+
+    query = db.query(LogArchivePartition)
+    if entity:
+        query = query.filter(LogArchivePartition.entity == entity)
+    if date_from is not None:
+        query = query.filter(LogArchivePartition.partition_date >= date_from)
+    if date_to is not None:
+        query = query.filter(LogArchivePartition.partition_date <= date_to)
+
+    total = query.count()
+    rows = (
+        query.order_by(LogArchivePartition.partition_date.desc(), LogArchivePartition.entity.asc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+    return {
+        "items": [_serialize_partition(row) for row in rows],
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "has_more": offset + len(rows) < total,
+    }
+
+
+def read_archive_partition(db: Session, partition_id: int, limit: int = 100, offset: int = 0) -> dict | None:
+    partition = db.query(LogArchivePartition).filter(LogArchivePartition.id == partition_id).first()
+    if not partition:
+        return None
+    limit = max(1, min(limit, 1000))
+    offset = max(0, offset)
+
+    items = []
+    path = Path(partition.file_path)
+    if path.exists():
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            for idx, line in enumerate(handle):
+                if idx < offset:
+                    continue
+                if len(items) >= limit:
+                    break
+                items.append(json.loads(line))
+
+    return {
+        "partition": _serialize_partition(partition),
+        "items": items,
+        "limit": limit,
+        "offset": offset,
+        "has_more": offset + len(items) < partition.row_count,
+    }
@@ -0,0 +1,195 @@
+"""
+Daily sales rollups (by region, product category and SKU).
+
+Analytics read these instead of SalesHistory, so their cost scales with the number of days in
+the window rather than the number of raw rows. Writers to SalesHistory fold their changes in
+with apply_sales_deltas inside the same transaction; rebuild_sales_rollups recomputes a date
+range from scratch (used by the seeder and for repairs).
+
+sales_daily_category is keyed by the denormalized Product.category, so catalog edits move sales
+between its keys: a Session hook records the categories touched by a category edit, a product,
+shade or SKU delete, or a shade/SKU moved to another parent, and rebuilds just those categories
+before the session commits. Bulk UPDATE/DELETE statements bypass the hook; rebuild afterwards.
+"""
+
+from collections import defaultdict
+from datetime import date
+
+from sqlalchemy import delete, event, func, inspect as sa_inspect, select
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models import Product, SKU, SalesDailyCategory, SalesDailyRegion, SalesDailySku, SalesHistory, Shade
+
+
+_UPSERT_CHUNK = 500
+_PENDING_KEY = "sales_category_pending"
+
+# rollup model -> (key column name, SalesHistory-side expression for that key)
+_ROLLUPS = {
+    SalesDailyRegion: ("region_id", SalesHistory.region_id),
+    SalesDailyCategory: ("category", Product.category),
+    SalesDailySku: ("sku_id", SalesHistory.sku_id),
+}
+
+
+def _upsert_increments(db: Session, model, key_column: str, totals: dict) -> None:
+    """Add (quantity, revenue) increments to rollup rows keyed by (date, key), creating missing rows."""
+    insert = dialect_insert(db)
+    items = [
+        {"date": day, key_column: key, "quantity_sold": qty, "revenue": revenue}
+        for (day, key), (qty, revenue) in totals.items()
+        if qty or revenue
+    ]
+    for start in range(0, len(items), _UPSERT_CHUNK):
+        stmt = insert(model).values(items[start:start + _UPSERT_CHUNK])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["date", key_column],
+            set_={
+                "quantity_sold": model.quantity_sold + stmt.excluded.quantity_sold,
+                "revenue": model.revenue + stmt.excluded.revenue,
+            },
+        )
+        db.execute(stmt)
+
+
+def _sku_categories(db: Session, sku_ids) -> dict[int, str]:
+    rows = (
+        db.query(SKU.id, Product.category)
+        .join(Shade, Shade.id == SKU.shade_id)
+        .join(Product, Product.id == Shade.product_id)
+        .filter(SKU.id.in_(list(sku_ids)))
+        .all()
+    )
+    return {sku_id: category for sku_id, category in rows}
+
+
+def apply_sales_deltas(db: Session, deltas: dict[tuple[int, int, date], tuple[int, float]]) -> None:
+    """Fold {(sku_id, region_id, date): (quantity delta, revenue delta)} into every rollup.
+
+    Does not commit: the caller's transaction covers both the raw rows and the rollups.
+    """
+    if not deltas:
+        return
+    categories = _sku_categories(db, {sku_id for sku_id, _, _ in deltas})
+
+    by_region: dict[tuple, list] = defaultdict(lambda: [0, 0.0])
+    by_category: dict[tuple, list] = defaultdict(lambda: [0, 0.0])
+    by_sku: dict[tuple, list] = defaultdict(lambda: [0, 0.0])
+    for (sku_id, region_id, day), (qty, revenue) in deltas.items():
+        for bucket in (by_region[(day, region_id)], by_sku[(day, sku_id)]):
+            bucket[0] += qty
+            bucket[1] += revenue
+        category = categories.get(sku_id)
+        if category is not None:
+            by_category[(day, category)][0] += qty
+            by_category[(day, category)][1] += revenue
+
+    _upsert_increments(db, SalesDailyRegion, "region_id", by_region)
+    _upsert_increments(db, SalesDailyCategory, "category", by_category)
+    _upsert_increments(db, SalesDailySku, "sku_id", by_sku)
+
+
+def _category_source():
+    return (
+        select(SalesHistory.date, Product.category, func.sum(SalesHistory.quantity_sold), func.sum(SalesHistory.revenue))
+        .join(SKU, SKU.id == SalesHistory.sku_id)
+        .join(Shade, Shade.id == SKU.shade_id)
+        .join(Product, Product.id == Shade.product_id)
+    )
+
+
+def rebuild_sales_rollups(db: Session, start: date | None = None, end: date | None = None) -> dict:
+    """Recompute the rollups for [start, end] (whole history when omitted) from SalesHistory."""
+    summary = {}
+    for model, (key_column, key_expr) in _ROLLUPS.items():
+        cleanup = delete(model)
+        if model is SalesDailyCategory:
+            source = _category_source()
+        else:
+            source = select(
+                SalesHistory.date,
+                key_expr,
+                func.sum(SalesHistory.quantity_sold),
+                func.sum(SalesHistory.revenue),
+            )
+        if start is not None:
+            cleanup = cleanup.where(model.date >= start)
+            source = source.where(SalesHistory.date >= start)
+        if end is not None:
+            cleanup = cleanup.where(model.date <= end)
+            source = source.where(SalesHistory.date <= end)
+        source = source.group_by(SalesHistory.date, key_expr)
+
+        db.execute(cleanup)
+        result = db.execute(
+            model.__table__.insert().from_select(["date", key_column, "quantity_sold", "revenue"], source)
+        )
+        summary[model.__tablename__] = result.rowcount
+    return summary
+
+
+def rebuild_category_rollups(db: Session, categories) -> int:
+    """Recompute every day of sales_daily_category for the given categories (does not commit)."""
+    categories = [category for category in set(categories) if category is not None]
+    if not categories:
+        return 0
+    db.execute(delete(SalesDailyCategory).where(SalesDailyCategory.category.in_(categories)))
+    source = _category_source().where(Product.category.in_(categories)).group_by(SalesHistory.date, Product.category)
+    return db.execute(
+        SalesDailyCategory.__table__.insert().from_select(["date", "category", "quantity_sold", "revenue"], source)
+    ).rowcount
+
+
+# ─── Change tracking for the category rollup ───
+
+def _history_values(state, attribute: str) -> set:
+    history = state.attrs[attribute].history
+    return {value for value in (*history.added, *history.unchanged, *history.deleted) if value is not None}
+
+
+def _pending(session) -> dict:
+    return session.info.setdefault(_PENDING_KEY, {"categories": set(), "products": set(), "shades": set()})
+
+
+@event.listens_for(Session, "after_flush")
+def _record_category_moves(session, flush_context):
+    for obj in (*session.dirty, *session.deleted):
+        if not isinstance(obj, (Product, Shade, SKU)):
+            continue
+        state = sa_inspect(obj)
+        deleted = obj in session.deleted
+        if isinstance(obj, Product):
+            if deleted or state.attrs.category.history.has_changes():
+                _pending(session)["categories"].update(_history_values(state, "category"))
+        elif isinstance(obj, Shade):
+            if deleted or state.attrs.product_id.history.has_changes():
+                _pending(session)["products"].update(_history_values(state, "product_id"))
+        elif deleted or state.attrs.shade_id.history.has_changes():
+            _pending(session)["shades"].update(_history_values(state, "shade_id"))
+
+
+@event.listens_for(Session, "before_commit")
+def _rebuild_moved_categories(session):
+    if _PENDING_KEY not in session.info and not (session.dirty or session.deleted):
+        return
+    session.flush()
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    categories = set(pending["categories"])
+    products = set(pending["products"])
+    if pending["shades"]:
+        products.update(product_id for (product_id,) in session.query(Shade.product_id).filter(
+            Shade.id.in_(pending["shades"])
+        ))
+    if products:
+        categories.update(category for (category,) in session.query(Product.category).filter(
+            Product.id.in_(products)
+        ))
+    rebuild_category_rollups(session, categories)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_categories(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,271 @@
+"""
+Customer shade catalog read model.
+
+One query joins every shade with its product and lowest SKU price into an in-memory index:
+NumPy columns for the filters (family, category, trending, price band), a sorted token list for
+prefix search, trigram postings for fuzzy search, and a precomputed rank per sort order. A page
+is a few vectorized masks plus a partial sort, so its cost does not grow with a Product lookup
+per shade. The index is rebuilt on the next read after any committed write to shades, products
+or skus (admin edits bump their response-cache generations, see response_cache.table_versions).
+One request rebuilds it in a worker thread while the others keep serving the previous index.
+
+The "featured" sort ranks the families passed in first (in that order), then trending shades,
+then names, so a scenario's priority palette leads the whole catalog rather than each page.
+
+Pages use keyset cursors (app.pagination): the cursor is the sort key of the last shade served,
+so pages stay consistent across a rebuild.
+"""
+
+import asyncio
+from bisect import bisect_left
+from collections import defaultdict
+
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Product, SKU, Shade
+from app.pagination import decode_cursor, encode_cursor
+from app.services.response_cache import response_cache
+
+
+_TABLES = ("shades", "products", "skus")
+SORTS = ("relevance", "featured", "id", "name", "price_asc", "price_desc")
+# Fuzzy matches need this Dice similarity between query and shade-name trigrams.
+FUZZY_THRESHOLD = 0.4
+_NO_PRICE = float("inf")
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CatalogIndex:
+    def __init__(self, rows):
+        rows = sorted(rows, key=lambda row: row.id)
+        self.items = [
+            {
+                "id": row.id,
+                "shade_code": row.shade_code,
+                "shade_name": row.shade_name,
+                "hex_color": row.hex_color,
+                "shade_family": row.shade_family,
+                "is_trending": row.is_trending,
+                "product_name": row.product_name or "",
+                "product_category": row.product_category or "",
+                "finish": row.finish or "",
+                "price_from": row.price_from,
+            }
+            for row in rows
+        ]
+        size = len(self.items)
+        self.ids = np.array([item["id"] for item in self.items], dtype=np.int64)
+        self.names = [item["shade_name"].lower() for item in self.items]
+        self.prices = np.array(
+            [_NO_PRICE if item["price_from"] is None else item["price_from"] for item in self.items], dtype=float
+        )
+        self.trending = np.array([bool(item["is_trending"]) for item in self.items], dtype=bool)
+        self.families = self._codes("shade_family")
+        self.categories = self._codes("product_category")
+
+        # Per sort: primary[sort] holds the primary key in sorted order (ties broken by id, kept
+        # in sorted_ids[sort]), and rank[sort][i] is shade i's position in that order.
+        names = np.array(self.names, dtype=str)
+        primaries = {"id": self.ids, "name": names, "price_asc": self.prices, "price_desc": -self.prices}
+        self.primary: dict[str, np.ndarray] = {}
+        self.sorted_ids: dict[str, np.ndarray] = {}
+        self.rank: dict[str, np.ndarray] = {}
+        for sort, primary in primaries.items():
+            order = np.lexsort((self.ids, primary))
+            self.primary[sort] = primary[order]
+            self.sorted_ids[sort] = self.ids[order]
+            rank = np.empty(size, dtype=np.int64)
+            rank[order] = np.arange(size)
+            self.rank[sort] = rank
+
+        # Prefix search: every word of the name, the whole name and the shade code.
+        tokens = sorted(
+            (token, i)
+            for i, item in enumerate(self.items)
+            for token in {*self.names[i].split(), self.names[i], item["shade_code"].lower()}
+        )
+        self.tokens = [token for token, _ in tokens]
+        self.token_shades = np.array([i for _, i in tokens], dtype=np.int64)
+
+        postings: dict[str, list[int]] = defaultdict(list)
+        for i, name in enumerate(self.names):
+            for gram in _trigrams(name):
+                postings[gram].append(i)
+        self.postings = {gram: np.array(ids, dtype=np.int64) for gram, ids in postings.items()}
+        self.gram_counts = np.array([len(_trigrams(name)) for name in self.names], dtype=float)
+
+    def _codes(self, field: str) -> dict[str, np.ndarray]:
+        by_value: dict[str, list[int]] = defaultdict(list)
+        for i, item in enumerate(self.items):
+            by_value[item[field]].append(i)
+        masks = {}
+        for value, ids in by_value.items():
+            mask = np.zeros(len(self.items), dtype=bool)
+            mask[ids] = True
+            masks[value] = mask
+        return masks
+
+    def _prefix_matches(self, word: str) -> np.ndarray:
+        start = bisect_left(self.tokens, word)
+        end = bisect_left(self.tokens, word + "\uffff")
+        mask = np.zeros(len(self.items), dtype=bool)
+        mask[self.token_shades[start:end]] = True
+        return mask
+
+    def _name_prefix_matches(self, query: str) -> np.ndarray:
+        names = self.primary["name"]
+        start, end = np.searchsorted(names, [query, query + "\uffff"])
+        return (self.rank["name"] >= start) & (self.rank["name"] < end)
+
+    def _after(self, sort: str, primary, row_id: int) -> int:
+        """Position of the first shade sorting strictly after (primary, row_id)."""
+        keys = self.primary[sort]
+        lo = np.searchsorted(keys, primary, side="left")
+        hi = np.searchsorted(keys, primary, side="right")
+        return int(lo + np.searchsorted(self.sorted_ids[sort][lo:hi], row_id, side="right"))
+
+    def _fuzzy_matches(self, query: str) -> np.ndarray:
+        grams = [self.postings[gram] for gram in _trigrams(query) if gram in self.postings]
+        if not grams:
+            return np.zeros(len(self.items), dtype=bool)
+        shared = np.bincount(np.concatenate(grams), minlength=len(self.items))
+        return 2 * shared / (len(_trigrams(query)) + self.gram_counts) >= FUZZY_THRESHOLD
+
+    def _tiers(self, query: str) -> np.ndarray:
+        """0: name starts with the query, 1: every query word prefixes a token, 2: fuzzy, 3: no match."""
+        tiers = np.full(len(self.items), 3, dtype=np.int64)
+        tiers[self._fuzzy_matches(query)] = 2
+        words = query.split()
+        prefixed = np.ones(len(self.items), dtype=bool)
+        for word in words:
+            prefixed &= self._prefix_matches(word)
+        tiers[prefixed] = 1
+        tiers[self._name_prefix_matches(query)] = 0
+        return tiers
+
+    def page(
+        self,
+        *,
+        family: str | None = None,
+        category: str | None = None,
+        trending: bool | None = None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        q: str | None = None,
+        sort: str | None = None,
+        families: list[str] | None = None,
+        limit: int = 48,
+        cursor: str | None = None,
+    ) -> dict:
+        size = len(self.items)
+        query = " ".join((q or "").lower().split())
+        sort = sort or ("relevance" if query else "id")
+        if sort not in SORTS:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"sort must be one of {list(SORTS)}")
+
+        mask = np.ones(size, dtype=bool)
+        if family:
+            mask &= self.families.get(family, np.zeros(size, dtype=bool))
+        if category:
+            mask &= self.categories.get(category, np.zeros(size, dtype=bool))
+        if trending is not None:
+            mask &= self.trending == trending
+        if min_price is not None:
+            mask &= self.prices >= min_price
+        if max_price is not None:
+            mask &= self.prices <= max_price
+
+        tiers = self._tiers(query) if query else np.zeros(size, dtype=np.int64)
+        if query:
+            mask &= tiers < 3
+        total = int(np.count_nonzero(mask))
+
+        if sort == "relevance":
+            # Within a tier, shades are ordered by name.
+            position = tiers * size + self.rank["name"]
+            key_of = lambda i: (int(tiers[i]), self.names[i], int(self.ids[i]))
+            if cursor:
+                tier, name, row_id = decode_cursor(cursor, int, str, int)
+                mask &= position >= tier * size + self._after("name", name, row_id)
+        elif sort == "featured":
+            # Priority family (unlisted ones last), then trending first, then name.
+            priority = np.full(size, len(families or ()), dtype=np.int64)
+            for rank, priority_family in reversed(list(enumerate(families or ()))):
+                priority[self.families.get(priority_family, np.zeros(size, dtype=bool))] = rank
+            group = priority * 2 + ~self.trending
+            position = group * size + self.rank["name"]
+            key_of = lambda i: (int(group[i]), self.names[i], int(self.ids[i]))
+            if cursor:
+                group_key, name, row_id = decode_cursor(cursor, int, str, int)
+                mask &= position >= group_key * size + self._after("name", name, row_id)
+        else:
+            position = self.rank[sort]
+            key_of = lambda i: (self.primary[sort][position[i]].item(), int(self.ids[i]))
+            if cursor:
+                kind = int if sort == "id" else float if sort.startswith("price") else str
+                primary, row_id = decode_cursor(cursor, kind, int)
+                mask &= position >= self._after(sort, primary, row_id)
+
+        matches = np.flatnonzero(mask)
+        if len(matches) > limit + 1:
+            matches = matches[np.argpartition(position[matches], limit)[:limit + 1]]
+        matches = matches[np.argsort(position[matches], kind="stable")]
+        page, extra = matches[:limit], matches[limit:]
+        return {
+            "items": [self.items[i] for i in page],
+            "total": total,
+            "next_cursor": encode_cursor(*key_of(page[-1])) if len(extra) else None,
+        }
+
+
+class ShadeCatalog:
+    """The current CatalogIndex, rebuilt when shades, products or skus change."""
+
+    def __init__(self):
+        self._version = None
+        self._index: CatalogIndex | None = None
+        self._rebuild = asyncio.Lock()
+
+    async def index(self, db: AsyncSession) -> CatalogIndex:
+        version = response_cache.table_versions(_TABLES)
+        if self._index is not None and (version == self._version or self._rebuild.locked()):
+            return self._index
+        # Single flight: one request rebuilds; later ones serve the previous index meanwhile
+        # (or wait here when there is none yet).
+        async with self._rebuild:
+            if self._index is not None and version == self._version:
+                return self._index
+            rows = (await db.execute(
+                select(
+                    Shade.id,
+                    Shade.shade_code,
+                    Shade.shade_name,
+                    Shade.hex_color,
+                    Shade.shade_family,
+                    Shade.is_trending,
+                    Product.name.label("product_name"),
+                    Product.category.label("product_category"),
+                    Product.finish,
+                    func.min(SKU.mrp).label("price_from"),
+                )
+                .outerjoin(Product, Product.id == Shade.product_id)
+                .outerjoin(SKU, SKU.shade_id == Shade.id)
+                .group_by(Shade.id, Product.id)
+            )).all()
+            # Building takes about a second for 30k shades; keep it off the event loop.
+            self._index, self._version = await asyncio.to_thread(CatalogIndex, rows), version
+            return self._index
+
+    def clear(self) -> None:
+        self._version = None
+        self._index = None
+
+
+shade_catalog = ShadeCatalog()
@@ -0,0 +1,34 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from app.config import SMART_ORDER_REFRESH_ENABLED, SMART_ORDER_REFRESH_HOUR_UTC
+from app.services.smart_order_service import refresh_smart_orders
+
+
+def _seconds_until_next_run(now: datetime) -> float:
+    next_run = now.replace(hour=SMART_ORDER_REFRESH_HOUR_UTC % 24, minute=0, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+
+async def smart_order_loop(stop_event: asyncio.Event):
+    if not SMART_ORDER_REFRESH_ENABLED:
+        print("Smart-order scheduler disabled (SMART_ORDER_REFRESH_ENABLED=false).")
+        return
+
+    print(f"Smart-order scheduler active. Rebuilding recommendations daily at {SMART_ORDER_REFRESH_HOUR_UTC:02d}:00 UTC")
+
+    while not stop_event.is_set():
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=_seconds_until_next_run(datetime.utcnow()))
+            break
+        except asyncio.TimeoutError:
+            pass
+
+        try:
+            # One batch pass over every dealer; synchronous DB work, so keep it off the event loop.
+            written = await asyncio.to_thread(refresh_smart_orders)
+            print(f"Smart-order scheduler stored {written} recommendation(s).")
+        except Exception as exc:
+            print(f"Warning: Scheduled smart-order rebuild failed: {exc}")
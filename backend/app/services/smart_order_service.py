@@ -0,0 +1,220 @@
+"""
+Batch smart-order engine.
+
+Restock recommendations for every dealer are computed in one pass: a single windowed query
+picks each dealer's lowest-cover inventory rows, demand for all (SKU, region) pairs comes from
+one batched forecast call, and quantities, costs and urgencies are evaluated as NumPy arrays.
+Results are stored in smart_order_recommendations, so viewing recommendations and accepting a
+bundle read the same rows. The batch runs nightly (smart_order_scheduler) and at startup when
+the stored batch is missing or was computed for a different simulation date; a committed
+inventory ingestion rebuilds only the dealers at the warehouses it touched.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from app.config import get_simulation_date
+from app.database import SessionLocal
+from app.models import Dealer, InventoryLevel, Product, SKU, Shade, SmartOrderRecommendation
+from app.services.forecast_service import get_forecast_demand
+
+
+logger = logging.getLogger("paintflow.smart_orders")
+
+MAX_RECOMMENDATIONS = 15
+LOW_COVER_DAYS = 30
+FORECAST_HORIZON_DAYS = 30
+_URGENCY_ORDER = {"CRITICAL": 0, "RECOMMENDED": 1, "OPTIONAL": 2}
+
+
+def _next_diwali_reference_date(sim_date: date) -> date:
+    this_year = date(sim_date.year, 10, 25)
+    if sim_date <= this_year:
+        return this_year
+    return date(sim_date.year + 1, 10, 25)
+
+
+def _recommendation_reason(row, sim_date: date, days_to_diwali: int) -> str:
+    """Context-aware reason for a recommendation."""
+    if 0 < days_to_diwali <= 21:
+        return f"Diwali in {days_to_diwali} days - demand expected to surge 60%"
+
+    if row.shade_name == "Bridal Red":
+        return "Wedding season peak - 'Bridal Red' trending +40% in your region"
+
+    if row.is_trending:
+        return f"'{row.shade_name}' is trending - 40% increase in customer searches"
+
+    if row.days_of_cover < 3:
+        return f"CRITICAL: Stock will last only {row.days_of_cover:.0f} days at current sell-through"
+
+    if sim_date.month in (6, 7, 8, 9) and row.category == "Waterproofing":
+        return "Peak monsoon season - waterproofing demand at annual high"
+
+    return f"Stock will last {row.days_of_cover:.0f} days - restock recommended before depletion"
+
+
+# ─── Batch computation ───
+
+def _low_stock_rows(db: Session, dealer_ids: list[int] | None):
+    """Each dealer's MAX_RECOMMENDATIONS lowest-cover rows below LOW_COVER_DAYS, in one query."""
+    position = func.row_number().over(
+        partition_by=Dealer.id,
+        order_by=(InventoryLevel.days_of_cover.asc(), InventoryLevel.id.asc()),
+    ).label("position")
+    query = (
+        db.query(
+            Dealer.id.label("dealer_id"),
+            Dealer.region_id,
+            SKU.id.label("sku_id"),
+            SKU.sku_code,
+            SKU.size,
+            SKU.mrp,
+            Shade.shade_name,
+            Shade.hex_color,
+            Shade.shade_family,
+            Shade.is_trending,
+            Product.category,
+            InventoryLevel.current_stock,
+            InventoryLevel.days_of_cover,
+            position,
+        )
+        .join(InventoryLevel, InventoryLevel.warehouse_id == Dealer.warehouse_id)
+        .join(SKU, SKU.id == InventoryLevel.sku_id)
+        .join(Shade, Shade.id == SKU.shade_id)
+        .outerjoin(Product, Product.id == Shade.product_id)
+        .filter(InventoryLevel.days_of_cover < LOW_COVER_DAYS)
+    )
+    if dealer_ids is not None:
+        query = query.filter(Dealer.id.in_(dealer_ids))
+    ranked = query.subquery()
+    return db.query(ranked).filter(ranked.c.position <= MAX_RECOMMENDATIONS).all()
+
+
+def compute_smart_orders(db: Session, dealer_ids: list[int] | None = None) -> dict[int, list[dict]]:
+    """Recommendations per dealer (all dealers when dealer_ids is None), ordered for display."""
+    rows = _low_stock_rows(db, dealer_ids)
+    recommendations: dict[int, list[dict]] = {}
+    if not rows:
+        return recommendations
+
+    sim_date = get_simulation_date()
+    demand_by_pair = get_forecast_demand(
+        [(row.sku_id, row.region_id) for row in rows], horizon=FORECAST_HORIZON_DAYS
+    )
+    demand = np.array([demand_by_pair[(row.sku_id, row.region_id)] for row in rows], dtype=float)
+    stock = np.array([row.current_stock for row in rows], dtype=float)
+    cover = np.array([row.days_of_cover for row in rows], dtype=float)
+    mrp = np.array([row.mrp for row in rows], dtype=float)
+
+    recommended = np.maximum(10, np.trunc(demand * 1.2 - stock)).astype(np.int64)
+    manual_cost = recommended * mrp
+    ai_cost = manual_cost * 0.92  # 8% savings through optimized logistics
+    savings = np.round(manual_cost - ai_cost, 0)
+    total_cost = np.round(ai_cost, 0)
+    urgency = np.select([cover < 3, cover < 14], ["CRITICAL", "RECOMMENDED"], default="OPTIONAL")
+    stockout_offsets = np.trunc(cover).astype(np.int64)
+
+    days_to_diwali = (_next_diwali_reference_date(sim_date) - sim_date).days
+    for idx, row in enumerate(rows):
+        recommendations.setdefault(row.dealer_id, []).append({
+            "sku_id": row.sku_id,
+            "sku_code": row.sku_code,
+            "shade_name": row.shade_name,
+            "shade_hex": row.hex_color,
+            "shade_family": row.shade_family,
+            "size": row.size,
+            "current_stock": row.current_stock,
+            "days_of_cover": row.days_of_cover,
+            "predicted_demand": float(demand[idx]),
+            "recommended_qty": int(recommended[idx]),
+            "urgency": str(urgency[idx]),
+            "reason": _recommendation_reason(row, sim_date, days_to_diwali),
+            "predicted_stockout_date": sim_date + timedelta(days=int(stockout_offsets[idx])),
+            "savings_amount": float(savings[idx]),
+            "mrp_per_unit": row.mrp,
+            "total_cost": float(total_cost[idx]),
+        })
+
+    for items in recommendations.values():
+        items.sort(key=lambda item: (_URGENCY_ORDER[item["urgency"]], item["predicted_stockout_date"]))
+    return recommendations
+
+
+def rebuild_smart_orders(db: Session, dealer_ids: list[int] | None = None) -> int:
+    """Replace stored recommendations for the given dealers (all when None); does not commit."""
+    computed = compute_smart_orders(db, dealer_ids)
+    sim_date = get_simulation_date()
+    now = datetime.utcnow()
+    stale = db.query(SmartOrderRecommendation)
+    if dealer_ids is not None:
+        stale = stale.filter(SmartOrderRecommendation.dealer_id.in_(dealer_ids))
+    stale.delete(synchronize_session=False)
+
+    values = [
+        dict(item, dealer_id=dealer_id, rank=rank, generated_for=sim_date, generated_at=now)
+        for dealer_id, items in computed.items()
+        for rank, item in enumerate(items, start=1)
+    ]
+    if values:
+        db.execute(insert(SmartOrderRecommendation), values)
+    return len(values)
+
+
+def refresh_smart_orders() -> int:
+    """Rebuild and commit the whole batch in its own session (scheduler entry point)."""
+    db = SessionLocal()
+    try:
+        written = rebuild_smart_orders(db)
+        db.commit()
+        return written
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def ensure_smart_orders(db: Session) -> int:
+    """Rebuild at startup when nothing is stored yet or the batch predates the simulation date."""
+    generated_for = db.query(func.max(SmartOrderRecommendation.generated_for)).scalar()
+    if generated_for == get_simulation_date():
+        return 0
+    written = rebuild_smart_orders(db)
+    db.commit()
+    return written
+
+
+# ─── Reads ───
+
+def get_smart_orders(db: Session, dealer_id: int) -> list[dict]:
+    """Stored AI-driven order recommendations for a dealer."""
+    rows = (
+        db.query(SmartOrderRecommendation)
+        .filter(SmartOrderRecommendation.dealer_id == dealer_id)
+        .order_by(SmartOrderRecommendation.rank)
+        .all()
+    )
+    return [
+        {
+            "sku_id": row.sku_id,
+            "sku_code": row.sku_code,
+            "shade_name": row.shade_name,
+            "shade_hex": row.shade_hex,
+            "shade_family": row.shade_family,
+            "size": row.size,
+            "current_stock": row.current_stock,
+            "recommended_qty": row.recommended_qty,
+            "urgency": row.urgency,
+            "reason": row.reason,
+            "predicted_stockout_date": row.predicted_stockout_date.isoformat(),
+            "savings_amount": row.savings_amount,
+            "mrp_per_unit": row.mrp_per_unit,
+            "total_cost": row.total_cost,
+        }
+        for row in rows
+    ]
@@ -0,0 +1,94 @@
+"""
+Serialization and compression benchmark for the largest JSON endpoints.
+
+Compares the previous path (jsonable_encoder + stdlib json, as rendered by Starlette's
+JSONResponse) with FastJSONResponse (orjson, no jsonable_encoder pass), and reports the
+bytes on the wire uncompressed, gzip and Brotli through the app's CompressionMiddleware.
+
+Run from backend/ against a seeded database:
+
+    python -m benchmarks.serialization_benchmark [--repeat 20]
+"""
+
+import argparse
+import json
+import logging
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.database import SessionLocal
+from app.main import app
+from app.models import InventoryLevel, SalesHistory, User
+from app.responses import dumps
+from app.routers.forecast import get_sku_forecast
+from app.services.audit_service import list_audit_logs
+from app.services.auth_service import create_access_token
+from app.services.inventory_service import get_warehouse_inventory, get_warehouse_map_data
+from sqlalchemy import func
+
+
+def _payloads(db) -> dict[str, tuple[str, object]]:
+    warehouse_id = (
+        db.query(InventoryLevel.warehouse_id)
+        .group_by(InventoryLevel.warehouse_id)
+        .order_by(func.count().desc())
+        .first()[0]
+    )
+    sku_id = db.query(SalesHistory.sku_id).order_by(SalesHistory.id).first()[0]
+    return {
+        "inventory map": ("/api/admin/inventory/map", get_warehouse_map_data(db)),
+        "warehouse inventory": (
+            f"/api/admin/inventory/warehouse/{warehouse_id}",
+            get_warehouse_inventory(db, warehouse_id),
+        ),
+        "forecast (90 days)": (
+            f"/api/forecast/{sku_id}?horizon=90",
+            get_sku_forecast(sku_id=sku_id, region_id=1, horizon=90, db=db),
+        ),
+        "audit logs (500)": ("/api/admin/audit/logs?limit=500", list_audit_logs(db, limit=500)),
+    }
+
+
+def _time_ms(fn, repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def _wire_bytes(client: TestClient, path: str, headers: dict, encoding: str) -> int:
+    response = client.get(path, headers={**headers, "Accept-Encoding": encoding})
+    response.raise_for_status()
+    return response.num_bytes_downloaded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    db = SessionLocal()
+    try:
+        admin = db.query(User).filter(User.role == "admin", User.is_active == True).first()
+        headers = {"Authorization": f"Bearer {create_access_token(admin.id, admin.role)}"}
+        payloads = _payloads(db)
+    finally:
+        db.close()
+
+    client = TestClient(app)
+    print(f"{'endpoint':<22}{'stdlib ms':>10}{'orjson ms':>10}{'speedup':>9}{'raw B':>10}{'gzip B':>9}{'br B':>9}")
+    for name, (path, content) in payloads.items():
+        assert json.loads(dumps(content)) == json.loads(JSONResponse(jsonable_encoder(content)).body)
+        before = _time_ms(lambda: JSONResponse(jsonable_encoder(content)).body, args.repeat)
+        after = _time_ms(lambda: dumps(content), args.repeat)
+        raw, gzipped, brotli = (_wire_bytes(client, path, headers, enc) for enc in ("identity", "gzip", "br"))
+        print(f"{name:<22}{before:>10.2f}{after:>10.2f}{before / after:>8.1f}x{raw:>10}{gzipped:>9}{brotli:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,9 @@ from app.models import (
     InventoryLevel, InventoryTransfer, Dealer, DealerOrder, SalesHistory,
     CustomerOrderRequest, CustomerOrder, CustomerOrderItem, User,
 )
+from app.services.dealer_health_service import rebuild_dealer_health
+from app.services.sales_rollup_service import rebuild_sales_rollups
+from app.services.smart_order_service import rebuild_smart_orders
 from seed.paint_catalog import (
     PRODUCTS, SHADES, SIZE_MULTIPLIERS, hex_to_rgb, get_shade_code, get_sku_code,
 )
@@ -210,6 +213,12 @@ def seed_sales_history(db: Session, shades: list[Shade], skus: list[SKU], produc
     print(f"  Created {total_records} sales records.")
 
 
+def seed_sales_rollups(db: Session):
+    print("Building daily sales rollups...")
+    counts = rebuild_sales_rollups(db)
+    print("  " + ", ".join(f"{table}: {count}" for table, count in counts.items()))
+
+
 def seed_inventory_levels(db: Session, warehouses: list[Warehouse], skus: list[SKU], shades: list[Shade]):
     print("Seeding inventory levels with deliberate imbalances...")
     shade_lookup = {s.id: s for s in shades}
@@ -386,6 +395,16 @@ def seed_dealer_orders(db: Session, dealers: list[Dealer], skus: list[SKU]):
     print(f"  Created {orders_created} dealer orders.")
 
 
+def seed_dealer_health(db: Session):
+    print("Computing dealer health scores...")
+    print(f"  Wrote {rebuild_dealer_health(db)} dealer health rows.")
+
+
+def seed_smart_orders(db: Session):
+    print("Computing smart-order recommendations...")
+    print(f"  Wrote {rebuild_smart_orders(db)} recommendations.")
+
+
 def seed_users(db: Session, dealers: list[Dealer]):
     """Seed default users: 1 admin, 1 user per dealer, 2 customers."""
     from app.services.auth_service import hash_password
@@ -497,9 +516,12 @@ def run_seed():
         warehouses = seed_warehouses(db, regions)
         dealers = seed_dealers(db, regions, warehouses)
         seed_sales_history(db, shades, skus, products)
+        seed_sales_rollups(db)
         seed_inventory_levels(db, warehouses, skus, shades)
         seed_transfers(db, warehouses, skus, shades)
         seed_dealer_orders(db, dealers, skus)
+        seed_dealer_health(db)
+        seed_smart_orders(db)
         seed_users(db, dealers)
         seed_customer_orders(db, skus, dealers)
         db.commit()
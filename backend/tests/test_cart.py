@@ -0,0 +1,125 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+from app.database import SessionLocal
+from app.main import app
+from app.models import Cart, SKU, User
+from app.services.auth_service import create_access_token
+from app.services.catalog_cache import catalog_cache
+from app.services.customer_service import add_to_cart, get_cart, remove_from_cart, set_cart, update_cart_item
+from tests.test_dealer_dashboard import _count_queries
+
+
+client = TestClient(app)
+
+
+def _customer(db) -> User:
+    return db.query(User).filter(User.role == "customer", User.is_active.is_(True)).order_by(User.id).first()
+
+
+def test_cart_mutations_are_single_statements():
+    db = SessionLocal()
+    try:
+        user_id = _customer(db).id
+        original = [(item["sku_id"], item["quantity"]) for item in get_cart(db, user_id)["items"]]
+        in_cart = [sku_id for sku_id, _ in original]
+        sku_id = db.query(SKU.id).filter(SKU.id.not_in(in_cart)).order_by(SKU.id).limit(1).scalar()
+        catalog_cache.skus()
+        try:
+            with _count_queries() as statements:
+                added = add_to_cart(db, user_id, sku_id, 2)
+            assert len(statements) == 1
+            assert added["message"] == "Added to cart"
+
+            with _count_queries() as statements:
+                again = add_to_cart(db, user_id, sku_id, 3)
+            assert len(statements) == 1
+            assert again == {"message": "Cart updated", "cart_id": added["cart_id"], "quantity": 5}
+
+            with _count_queries() as statements:
+                updated = update_cart_item(db, user_id, added["cart_id"], 7)
+            assert len(statements) == 1
+            assert updated["quantity"] == 7
+
+            with _count_queries() as statements:
+                cart = get_cart(db, user_id)
+            assert len(statements) == 1
+            line = next(item for item in cart["items"] if item["sku_id"] == sku_id)
+            assert line["subtotal"] == round(catalog_cache.get(sku_id)["mrp"] * 7, 2)
+
+            with _count_queries() as statements:
+                remove_from_cart(db, user_id, added["cart_id"])
+            assert len(statements) == 1
+            assert db.query(Cart).filter(Cart.user_id == user_id, Cart.sku_id == sku_id).count() == 0
+        finally:
+            set_cart(db, user_id, original)
+    finally:
+        db.close()
+
+
+def test_concurrent_adds_merge_into_one_row():
+    db = SessionLocal()
+    try:
+        user_id = _customer(db).id
+        original = [(item["sku_id"], item["quantity"]) for item in get_cart(db, user_id)["items"]]
+        sku_id = db.query(SKU.id).order_by(SKU.id.desc()).limit(1).scalar()
+        set_cart(db, user_id, [line for line in original if line[0] != sku_id])
+
+        def add(_):
+            session = SessionLocal()
+            try:
+                return add_to_cart(session, user_id, sku_id, 1)["cart_id"]
+            finally:
+                session.close()
+
+        try:
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                cart_ids = set(pool.map(add, range(12)))
+            rows = db.query(Cart).filter(Cart.user_id == user_id, Cart.sku_id == sku_id).all()
+            assert len(rows) == 1 and cart_ids == {rows[0].id}
+            assert rows[0].quantity == 12
+        finally:
+            set_cart(db, user_id, original)
+    finally:
+        db.close()
+
+
+def test_set_cart_replaces_the_cart_in_one_call():
+    db = SessionLocal()
+    try:
+        user = _customer(db)
+        user_id = user.id
+        headers = {"Authorization": f"Bearer {create_access_token(user.id, user.role)}"}
+        original = [(item["sku_id"], item["quantity"]) for item in get_cart(db, user_id)["items"]]
+        sku_ids = [sku_id for (sku_id,) in db.query(SKU.id).order_by(SKU.id).limit(3)]
+        try:
+            first = client.put("/api/customer/me/cart", headers=headers, json={"items": [
+                {"sku_id": sku_ids[0], "quantity": 1},
+                {"sku_id": sku_ids[1], "quantity": 4},
+            ]})
+            assert first.status_code == 200
+            kept_cart_id = next(item["cart_id"] for item in first.json()["items"] if item["sku_id"] == sku_ids[1])
+
+            second = client.put("/api/customer/me/cart", headers=headers, json={"items": [
+                {"sku_id": sku_ids[1], "quantity": 2},
+                {"sku_id": sku_ids[2], "quantity": 3},
+            ]})
+            assert second.status_code == 200
+            assert second.json() == client.get("/api/customer/me/cart", headers=headers).json()
+            items = second.json()["items"]
+            assert [(item["sku_id"], item["quantity"]) for item in items] == [(sku_ids[1], 2), (sku_ids[2], 3)]
+            assert items[0]["cart_id"] == kept_cart_id
+
+            missing = client.put("/api/customer/me/cart", headers=headers, json={"items": [
+                {"sku_id": sku_ids[0], "quantity": 1},
+                {"sku_id": 10**9, "quantity": 1},
+            ]})
+            assert missing.status_code == 404
+            assert client.get("/api/customer/me/cart", headers=headers).json() == second.json()
+
+            assert client.put("/api/customer/me/cart", headers=headers, json={"items": []}).json()["count"] == 0
+        finally:
+            set_cart(db, user_id, original)
+    finally:
+        db.close()
@@ -0,0 +1,120 @@
+from datetime import date
+
+from sqlalchemy import func
+
+from app.database import SessionLocal
+from app.models import Product, Region, SKU, SalesHistory
+from app.schemas.ingestion import SalesHistoryIn
+from app.services import analytics_service
+from app.services.admin_crud_service import update_product
+from app.services.columnar_store import SalesColumnStore
+from app.services.ingestion_service import ingest_sales_history
+from app.services.sales_rollup_service import rebuild_sales_rollups
+
+
+def test_columnar_aggregates_match_sql(tmp_path):
+    store = SalesColumnStore(tmp_path / "store")
+    db = SessionLocal()
+    try:
+        assert store.sync(db)["exported"]
+        assert store.sync(db)["exported"] == []
+
+        start, end = db.query(func.min(SalesHistory.date), func.max(SalesHistory.date)).one()
+        expected = {
+            region_id: (qty, revenue)
+            for region_id, qty, revenue in db.query(
+                SalesHistory.region_id, func.sum(SalesHistory.quantity_sold), func.sum(SalesHistory.revenue)
+            ).group_by(SalesHistory.region_id)
+        }
+    finally:
+        db.close()
+
+    by_region = {row["region"]: (row["quantity_sold"], row["revenue"]) for row in store.aggregate(start, end, ("region",))}
+    assert by_region.keys() == expected.keys()
+    for region_id, (qty, revenue) in expected.items():
+        assert by_region[region_id][0] == qty
+        assert abs(by_region[region_id][1] - revenue) < 0.01
+
+    by_year_category = store.aggregate(start, end, ("year", "category"))
+    assert {row["year"] for row in by_year_category} == set(range(start.year, end.year + 1))
+    assert abs(sum(row["revenue"] for row in by_year_category) - sum(r for _, r in expected.values())) < 0.01
+
+
+def test_columnar_store_reexports_changed_months(tmp_path):
+    store = SalesColumnStore(tmp_path / "store")
+    day = date(2099, 3, 15)
+    db = SessionLocal()
+    try:
+        store.sync(db)
+        (first_id, first_code), (second_id, second_code) = db.query(SKU.id, SKU.sku_code).order_by(SKU.id).limit(2)
+        region_name = db.query(Region.name).order_by(Region.id).first()[0]
+
+        def ingest(first_qty: int, second_qty: int):
+            ingest_sales_history(db, [
+                SalesHistoryIn(sku_code=code, region_name=region_name, date=day, quantity_sold=qty, revenue=qty * 100.0)
+                for code, qty in ((first_code, first_qty), (second_code, second_qty))
+            ], dry_run=False)
+
+        ingest(7, 3)
+        assert store.sync(db)["exported"] == ["2099-03"]
+        assert [item["revenue"] for item in store.aggregate(day, day, ("day",))] == [1000.0]
+
+        # A correction that moves sales between SKUs leaves the month's totals unchanged.
+        ingest(3, 7)
+        assert store.sync(db)["exported"] == ["2099-03"]
+        by_sku = {item["sku"]: item["revenue"] for item in store.aggregate(day, day, ("sku",))}
+        assert by_sku == {first_id: 300.0, second_id: 700.0}
+    finally:
+        db.query(SalesHistory).filter(SalesHistory.date == day).delete()
+        rebuild_sales_rollups(db, day, day)
+        db.commit()
+        assert store.sync(db)["removed"] == ["2099-03"]
+        db.close()
+    assert store.aggregate(day, day, ("day",)) == []
+
+
+def test_columnar_store_reexports_everything_when_a_category_changes(tmp_path):
+    store = SalesColumnStore(tmp_path / "store")
+    db = SessionLocal()
+    try:
+        months = store.sync(db)["months"]
+        product = db.query(Product).order_by(Product.id).first()
+        product_id, original = product.id, product.category
+        try:
+            update_product(db, product_id, category="Columnar Test Category")
+            assert len(store.sync(db)["exported"]) == months
+            categories = {row["category"] for row in store.aggregate(date(1970, 1, 1), date(2100, 1, 1), ("category",))}
+            assert "Columnar Test Category" in categories
+        finally:
+            update_product(db, product_id, category=original)
+        assert len(store.sync(db)["exported"]) == months
+    finally:
+        db.close()
+
+
+def test_breakdowns_stay_on_rollups_and_the_cube_matches_sql(tmp_path, monkeypatch):
+    store = SalesColumnStore(tmp_path / "store")
+    monkeypatch.setattr(analytics_service, "sales_column_store", store)
+    db = SessionLocal()
+    try:
+        def unexpected(*args, **kwargs):
+            raise AssertionError("single-dimension breakdowns must be served from the rollups")
+
+        monkeypatch.setattr(store, "aggregate", unexpected)
+        analytics_service.get_revenue_breakdown(db, days=365)
+        analytics_service.get_revenue_year_over_year(db, years=2, group_by="category")
+        monkeypatch.undo()
+        monkeypatch.setattr(analytics_service, "sales_column_store", store)
+
+        # Until the background sync has exported the store, the cube is answered in SQL.
+        assert not store.is_ready()
+        store.sync(db)
+        for group_by in (("region", "category"), ("sku", "month"), ("year", "category")):
+            monkeypatch.setattr(analytics_service, "ANALYTICS_COLUMNAR_ENABLED", False)
+            from_sql = analytics_service.get_revenue_cube(db, days=730, group_by=group_by)
+            monkeypatch.setattr(analytics_service, "ANALYTICS_COLUMNAR_ENABLED", True)
+            from_columns = analytics_service.get_revenue_cube(db, days=730, group_by=group_by)
+            assert from_columns == from_sql
+            assert from_columns["rows"]
+    finally:
+        db.close()
@@ -0,0 +1,39 @@
+import gzip
+import json
+
+import brotli
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+client = TestClient(app)
+
+
+def _raw(path: str, encoding: str):
+    with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+def test_large_json_is_compressed_with_preferred_encoding():
+    plain = client.get("/api/customer/shades", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    expected = plain.json()
+
+    response, body = _raw("/api/customer/shades", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert json.loads(gzip.decompress(body)) == expected
+
+    response, body = _raw("/api/customer/shades", "gzip, br")
+    assert response.headers["content-encoding"] == "br"
+    assert int(response.headers["content-length"]) == len(body) < len(plain.content)
+    assert json.loads(brotli.decompress(body)) == expected
+    # The conditional-GET dependency's headers survive the orjson fast path.
+    assert response.headers["etag"] == plain.headers["etag"]
+
+
+def test_small_responses_are_not_compressed():
+    response = client.get("/api/health/live", headers={"Accept-Encoding": "gzip, br"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
@@ -0,0 +1,85 @@
+import time
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from app.database import SessionLocal
+from app.main import app
+from app.middleware import conditional
+from app.models import Dealer, User
+from app.services.auth_service import create_access_token
+
+
+client = TestClient(app)
+
+
+def _admin_headers():
+    db = SessionLocal()
+    try:
+        admin = db.query(User).filter(User.role == "admin", User.is_active == True).first()
+        return {"Authorization": f"Bearer {create_access_token(admin.id, admin.role)}"}
+    finally:
+        db.close()
+
+
+def test_public_catalog_revalidates_with_304():
+    first = client.get("/api/customer/shades", params={"family": "Blues"})
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "public, no-cache"
+
+    repeat = client.get("/api/customer/shades", params={"family": "Blues"}, headers={"If-None-Match": etag})
+    assert repeat.status_code == 304
+    assert repeat.content == b""
+    assert repeat.headers["etag"] == etag
+
+    other_query = client.get("/api/customer/shades", params={"family": "Reds"}, headers={"If-None-Match": etag})
+    assert other_query.status_code == 200
+
+
+def test_write_to_dependent_table_changes_etag():
+    etag = client.get("/api/auth/dealers-list").headers["etag"]
+    assert client.get("/api/auth/dealers-list", headers={"If-None-Match": etag}).status_code == 304
+
+    db = SessionLocal()
+    try:
+        dealer = db.query(Dealer).order_by(Dealer.id).first()
+        original_city = dealer.city
+        dealer.city = f"{original_city} (moved)"
+        db.commit()
+        changed = client.get("/api/auth/dealers-list", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+    finally:
+        dealer.city = original_city
+        db.commit()
+        db.close()
+
+
+def test_admin_304_still_requires_auth():
+    headers = _admin_headers()
+    first = client.get("/api/admin/analytics/dealer-distribution", headers=headers)
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "private, no-cache"
+    etag = first.headers["etag"]
+
+    assert client.get(
+        "/api/admin/analytics/dealer-distribution", headers={**headers, "If-None-Match": etag}
+    ).status_code == 304
+    assert client.get("/api/admin/analytics/dealer-distribution", headers={"If-None-Match": etag}).status_code in (401, 403)
+
+
+def test_no_etag_when_workers_do_not_share_write_counters(monkeypatch):
+    monkeypatch.setattr(conditional, "WEB_CONCURRENCY", 4)
+    response = client.get("/api/auth/dealers-list", headers={"If-None-Match": "*"})
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+
+
+def test_etag_rolls_over_with_the_time_bucket(monkeypatch):
+    etag = client.get("/api/auth/dealers-list").headers["etag"]
+    later = time.time() + conditional.ETAG_MAX_AGE_SECONDS
+    monkeypatch.setattr(conditional, "time", SimpleNamespace(time=lambda: later))
+    rolled = client.get("/api/auth/dealers-list", headers={"If-None-Match": etag})
+    assert rolled.status_code == 200
+    assert rolled.headers["etag"] != etag
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+from app.database import SessionLocal
+from app.models import CustomerOrder, CustomerOrderItem, Dealer, SKU, User
+from app.services.customer_service import get_dealer_customer_requests, get_my_orders
+from tests.test_dealer_dashboard import _count_queries
+
+
+def _create_history(db, customer: User, dealer_id: int, orders: int = 25) -> list[int]:
+    skus = db.query(SKU).order_by(SKU.id).limit(3).all()
+    created = []
+    start = datetime(2020, 1, 1)
+    for idx in range(orders):
+        # Pairs of orders share a timestamp so pages have to break ties on id.
+        order = CustomerOrder(
+            user_id=customer.id,
+            dealer_id=dealer_id,
+            status="placed",
+            total_amount=sum(sku.mrp for sku in skus),
+            created_at=start + timedelta(days=idx // 2),
+        )
+        db.add(order)
+        db.flush()
+        db.add_all(CustomerOrderItem(order_id=order.id, sku_id=sku.id, quantity=1, unit_price=sku.mrp) for sku in skus)
+        created.append(order.id)
+    db.commit()
+    return created
+
+
+def _walk(fetch, key: str) -> tuple[list[dict], list[int]]:
+    rows, query_counts, cursor = [], [], None
+    while True:
+        with _count_queries() as statements:
+            page = fetch(cursor)
+        query_counts.append(len(statements))
+        rows.extend(page[key])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return rows, query_counts
+
+
+def test_order_history_pages_cost_a_fixed_number_of_queries():
+    db = SessionLocal()
+    customer = db.query(User).filter(User.role == "customer").order_by(User.id).first()
+    dealer_id = db.query(Dealer.id).order_by(Dealer.id.desc()).limit(1).scalar()
+    created = _create_history(db, customer, dealer_id)
+    customer_id, email = customer.id, customer.email
+    try:
+        db.expunge_all()
+        orders, counts = _walk(lambda cursor: get_my_orders(db, customer_id, limit=7, cursor=cursor), "orders")
+        assert set(counts) == {2}
+        mine = [order for order in orders if order["order_id"] in created]
+        assert len(mine) == len(created)
+        assert all(len(order["items"]) == 3 for order in mine)
+        keys = [(order["created_at"], order["order_id"]) for order in orders]
+        assert keys == sorted(keys, reverse=True)
+
+        requests, counts = _walk(
+            lambda cursor: get_dealer_customer_requests(db, dealer_id, per_page=7, cursor=cursor), "requests"
+        )
+        assert set(counts) == {4}
+        assert {request["order_id"] for request in requests} >= set(created)
+        assert all(
+            request["customer"]["email"] == email and len(request["items"]) == 3
+            for request in requests
+            if request["order_id"] in created
+        )
+    finally:
+        db.rollback()
+        for order in db.query(CustomerOrder).filter(CustomerOrder.id.in_(created)):
+            for item in db.query(CustomerOrderItem).filter(CustomerOrderItem.order_id == order.id):
+                db.delete(item)
+            db.delete(order)
+        db.commit()
+        db.close()
@@ -0,0 +1,204 @@
+import inspect
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app import database
+from app.database import (
+    ReadSessionLocal,
+    Replica,
+    ReplicaRouter,
+    SessionLocal,
+    WriterQueue,
+    async_database_url,
+    build_engine_options,
+    pool_settings,
+    sqlite_writer_queue,
+)
+from app.main import app
+from app.models import Shade
+from app.models.audit import AuditLog
+from app.models.user import User
+from app.services.auth_service import create_access_token
+
+
+client = TestClient(app)
+
+
+def test_pool_settings_split_connection_budget_across_workers(monkeypatch):
+    monkeypatch.setattr(database, "DB_MAX_CONNECTIONS", 80)
+    monkeypatch.setattr(database, "WEB_CONCURRENCY", 4)
+    monkeypatch.setattr(database, "APP_THREADPOOL_SIZE", 40)
+    monkeypatch.setattr(database, "DB_POOL_SIZE", None)
+    monkeypatch.setattr(database, "DB_MAX_OVERFLOW", None)
+
+    settings = pool_settings()
+    assert settings["pool_size"] == 10
+    assert settings["pool_size"] + settings["max_overflow"] == 20
+
+
+def test_postgres_engine_options_set_statement_timeout_and_pre_ping(monkeypatch):
+    monkeypatch.setattr(database, "DB_STATEMENT_TIMEOUT_MS", 15000)
+    options = build_engine_options("postgresql+psycopg://user:pass@db:5432/paintflow")
+    assert options["pool_pre_ping"] is True
+    assert options["poolclass"] is database.InstrumentedQueuePool
+    assert options["connect_args"]["options"] == "-c statement_timeout=15000"
+
+    memory = build_engine_options("sqlite://")
+    assert "poolclass" not in memory
+
+
+def test_writer_queue_serves_writers_in_arrival_order():
+    queue = WriterQueue()
+    order = []
+
+    assert queue.acquire(timeout=1)
+
+    def writer(name):
+        if queue.acquire(timeout=5):
+            order.append(name)
+            queue.release()
+
+    first = threading.Thread(target=writer, args=("first",))
+    first.start()
+    time.sleep(0.05)
+    second = threading.Thread(target=writer, args=("second",))
+    second.start()
+    time.sleep(0.05)
+
+    assert order == []
+    queue.release()
+    first.join()
+    second.join()
+    assert order == ["first", "second"]
+    assert queue.pending() == 0
+
+
+def test_writer_queue_skips_abandoned_tickets():
+    queue = WriterQueue()
+    assert queue.acquire(timeout=1)
+    assert queue.acquire(timeout=0.01) is False
+    queue.release()
+    assert queue.acquire(timeout=0.1) is True
+    queue.release()
+
+
+def test_sqlite_sessions_release_writer_turn_after_commit():
+    if not database.IS_SQLITE_FILE or not database.SQLITE_SERIALIZE_WRITES:
+        pytest.skip("writer queue is only installed for file-backed SQLite with SQLITE_SERIALIZE_WRITES")
+    db = SessionLocal()
+    try:
+        db.add(AuditLog(method="POST", path="/api/writer-queue-test", action="test", status_code=200))
+        db.flush()
+        assert db.info.get("sqlite_writer_turn") is True
+        db.rollback()
+        assert "sqlite_writer_turn" not in db.info
+    finally:
+        db.close()
+    assert sqlite_writer_queue.pending() == 0
+
+
+def test_replica_router_skips_unhealthy_replicas_and_falls_back(tmp_path):
+    good = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    bad = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    router = ReplicaRouter([Replica("bad", bad), Replica("good", good)], max_lag_seconds=5, check_seconds=60)
+
+    # Nothing is probed on the read path: unchecked replicas are skipped until refresh() runs.
+    assert router.choose() is None
+    router.refresh()
+    assert router.choose() is good
+    assert router.choose() is good
+    statuses = {item["url"]: item["healthy"] for item in router.status()}
+    assert list(statuses.values()).count(True) == 1
+
+    router.mark_failed(good, RuntimeError("connection reset"))
+    assert router.choose() is None
+    assert ReplicaRouter([], max_lag_seconds=5, check_seconds=60).choose() is None
+
+
+def test_hung_replica_check_does_not_block_reads(tmp_path):
+    good = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    released = threading.Event()
+
+    class HungEngine:
+        dialect = good.dialect
+        url = good.url
+
+        def connect(self):
+            released.wait(5)
+            raise TimeoutError("connect timed out")
+
+    hung = Replica("hung", HungEngine())
+    router = ReplicaRouter([Replica("good", good), hung], max_lag_seconds=5, check_seconds=60)
+    hung.checked_at = time.monotonic()
+    router.refresh()
+    hung.checked_at = 0.0
+
+    checker = threading.Thread(target=router.refresh)
+    checker.start()
+    try:
+        started = time.perf_counter()
+        assert router.choose() is good
+        assert router.status()[0]["healthy"] is True
+        assert time.perf_counter() - started < 0.5
+    finally:
+        released.set()
+        checker.join()
+    assert router.status()[1]["healthy"] is False
+
+
+def test_replica_pools_are_sized_apart_from_the_primary(monkeypatch):
+    monkeypatch.setattr(database, "DB_REPLICA_POOL_SIZE", 3)
+    monkeypatch.setattr(database, "DB_REPLICA_MAX_OVERFLOW", 1)
+    options = database.build_engine_options("postgresql://u:p@replica/db", pool_name="replica0", replica=True)
+    assert (options["pool_size"], options["max_overflow"]) == (3, 1)
+    assert options["connect_args"]["connect_timeout"] == database.DB_REPLICA_CONNECT_TIMEOUT_SECONDS
+    assert "connect_timeout" not in database.build_engine_options("postgresql://u:p@primary/db")["connect_args"]
+
+
+def test_read_session_rejects_writes():
+    db = ReadSessionLocal(bind=database.engine)
+    try:
+        db.add(AuditLog(method="POST", path="/api/read-only-test", action="test", status_code=200))
+        with pytest.raises(RuntimeError):
+            db.flush()
+    finally:
+        db.close()
+
+
+def test_async_database_url_swaps_in_async_drivers():
+    assert async_database_url("sqlite:////data/paintflow.db") == "sqlite+aiosqlite:////data/paintflow.db"
+    assert async_database_url("postgresql://u:p@db/paintflow") == "postgresql+psycopg://u:p@db/paintflow"
+    assert async_database_url("postgresql+psycopg://u:p@db/paintflow") == "postgresql+psycopg://u:p@db/paintflow"
+    options = build_engine_options("sqlite:////data/paintflow.db", pool_name="async", asynchronous=True)
+    assert options["poolclass"] is database.InstrumentedAsyncQueuePool
+
+
+def test_async_endpoints_serve_from_async_session():
+    routes = {(route.path, method): route.endpoint for route in app.routes for method in getattr(route, "methods", ())}
+    for key in [
+        ("/api/notifications", "GET"),
+        ("/api/customer/shades", "GET"),
+        ("/api/customer/snap-find", "POST"),
+        ("/api/dealer/me/dashboard", "GET"),
+    ]:
+        assert inspect.iscoroutinefunction(routes[key]), key
+
+    db = SessionLocal()
+    try:
+        dealer = db.query(User).filter(User.role == "dealer", User.is_active == True).first()
+        assert dealer is not None
+        headers = {"Authorization": f"Bearer {create_access_token(dealer.id, dealer.role)}"}
+        shade_count = db.query(Shade).count()
+    finally:
+        db.close()
+
+    dashboard = client.get("/api/dealer/me/dashboard", headers=headers)
+    assert dashboard.status_code == 200
+    assert int(dashboard.headers["x-db-queries"]) > 0
+    assert client.get("/api/notifications/unread-count", headers=headers).status_code == 200
+    assert client.get("/api/dealer/me/dashboard").status_code == 401
+    assert client.get("/api/customer/shades").json()["total"] == shade_count
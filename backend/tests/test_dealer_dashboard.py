@@ -0,0 +1,120 @@
+from contextlib import contextmanager
+from datetime import datetime, time
+
+from sqlalchemy import event
+
+from app.config import get_simulation_date
+from app.database import SessionLocal, engine
+from app.models import Dealer, DealerOrder, InventoryLevel
+from app.services.analytics_service import get_dealer_revenue_trend
+from app.services.dealer_service import get_dealer_dashboard, get_dealer_dashboard_activity, get_dealer_trends
+
+
+@contextmanager
+def _count_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_dealer_dashboard_costs_two_queries():
+    db = SessionLocal()
+    try:
+        dealer = db.query(Dealer).order_by(Dealer.id).first()
+        db.expunge_all()
+        with _count_queries() as statements:
+            dashboard = get_dealer_dashboard(db, dealer.id)
+
+        assert len(statements) == 2
+        assert dashboard["total_orders"] == db.query(DealerOrder).filter(DealerOrder.dealer_id == dealer.id).count()
+        assert dashboard["ai_recommendations_pending"] == db.query(InventoryLevel).filter(
+            InventoryLevel.warehouse_id == dealer.warehouse_id, InventoryLevel.days_of_cover < 14
+        ).count()
+        assert 0 <= dashboard["health_score"] <= 100
+    finally:
+        db.close()
+
+
+def test_trend_series_query_count_is_independent_of_months():
+    db = SessionLocal()
+    try:
+        dealer_id = db.query(Dealer.id).order_by(Dealer.id).limit(1).scalar()
+        for months in (1, 6, 24):
+            with _count_queries() as statements:
+                trends = get_dealer_trends(db, dealer_id, months=months)
+            # Dealer check, stored rows, then the current month computed live (dealer + orders).
+            assert len(statements) == 4
+            assert len(trends["points"]) == months
+
+            with _count_queries() as statements:
+                revenue = get_dealer_revenue_trend(db, dealer_id, months=months)
+            assert len(statements) == 1
+            assert [point["month"] for point in revenue["points"]] == [
+                point["month_key"] for point in trends["points"]
+            ]
+    finally:
+        db.close()
+
+
+def test_activity_feed_pages_are_keyset_slices_of_one_timeline():
+    db = SessionLocal()
+    try:
+        dealer_id = db.query(Dealer.id).order_by(Dealer.id).limit(1).scalar()
+        timeline = get_dealer_dashboard_activity(db, dealer_id, limit=100)["items"]
+        assert len(timeline) > 10
+
+        pages, cursor = [], None
+        while True:
+            with _count_queries() as statements:
+                page = get_dealer_dashboard_activity(db, dealer_id, limit=7, cursor=cursor)
+            assert len(statements) == 5
+            pages.extend(page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert pages == timeline
+        assert [item["created_at"] for item in pages] == sorted((item["created_at"] for item in pages), reverse=True)
+    finally:
+        db.close()
+
+
+def test_activity_feed_keeps_critical_stock_without_a_timestamp():
+    db = SessionLocal()
+    level = None
+    try:
+        dealer = db.query(Dealer).order_by(Dealer.id).first()
+        level = (
+            db.query(InventoryLevel)
+            .filter(InventoryLevel.warehouse_id == dealer.warehouse_id)
+            .order_by(InventoryLevel.days_of_cover.asc())
+            .first()
+        )
+        original = (level.days_of_cover, level.last_updated)
+        level.days_of_cover, level.last_updated = 0.0, None
+        db.commit()
+
+        timeline = get_dealer_dashboard_activity(db, dealer.id, limit=500)["items"]
+        undated = datetime.combine(get_simulation_date(), time.min).isoformat()
+        alerts = [item for item in timeline if item["type"] == "stock_alert" and item["created_at"] == undated]
+        assert any(item["message"].endswith("has 0.0 days cover left") for item in alerts)
+
+        pages, cursor = [], None
+        while True:
+            page = get_dealer_dashboard_activity(db, dealer.id, limit=9, cursor=cursor)
+            pages.extend(page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert pages == timeline
+    finally:
+        if level is not None:
+            level.days_of_cover, level.last_updated = original
+            db.commit()
+        db.close()
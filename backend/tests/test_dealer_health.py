@@ -0,0 +1,176 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from app import database
+from app.config import get_simulation_date
+from app.database import SessionLocal
+from app.models import Dealer, DealerHealthScore, DealerOrder, InventoryLevel, SKU, Warehouse
+from app.schemas.ingestion import DealerOrderIn
+from app.services.dealer_health_service import (
+    LIFETIME,
+    compute_dealer_health,
+    get_dealer_health,
+    month_period,
+    monthly_health_score,
+    refresh_dealer_health,
+    stock_signal,
+)
+from app.services.ingestion_service import ingest_dealer_orders
+from app.services.order_service import update_order_status
+
+
+def _stored(db, dealer_id: int, period: str) -> DealerHealthScore | None:
+    db.expire_all()
+    return db.query(DealerHealthScore).filter_by(dealer_id=dealer_id, period=period).first()
+
+
+def _assert_fresh(db, dealer_id: int, period: str):
+    row = _stored(db, dealer_id, period)
+    expected = compute_dealer_health(db, {dealer_id: {period}})[(dealer_id, period)]
+    assert {field: getattr(row, field) for field in expected} == expected
+    return row
+
+
+def test_order_status_change_refreshes_lifetime_and_month_rows():
+    db = SessionLocal()
+    try:
+        order = (
+            db.query(DealerOrder)
+            .filter(DealerOrder.status == "shipped")
+            .order_by(DealerOrder.id)
+            .first()
+        )
+        period = month_period(order.order_date)
+        before = _stored(db, order.dealer_id, LIFETIME)
+        version, delivered = before.version, before.delivered_orders
+
+        update_order_status(db, order.id, order.dealer_id, "delivered")
+
+        after = _assert_fresh(db, order.dealer_id, LIFETIME)
+        assert after.delivered_orders == delivered + 1
+        assert after.version == version + 1
+        _assert_fresh(db, order.dealer_id, period)
+    finally:
+        # Bulk UPDATEs bypass the flush hook, so restore the scores explicitly.
+        db.query(DealerOrder).filter(DealerOrder.id == order.id).update({"status": "shipped"})
+        refresh_dealer_health(db, {order.dealer_id: {LIFETIME, period}})
+        db.commit()
+        db.close()
+
+
+def test_ingested_orders_and_inventory_changes_update_scores():
+    db = SessionLocal()
+    dealer = None
+    try:
+        dealer = db.query(Dealer).order_by(Dealer.id.desc()).first()
+        sku_code = db.query(SKU.sku_code).order_by(SKU.id).first()[0]
+        row = DealerOrderIn(
+            dealer_code=dealer.code, sku_code=sku_code, quantity=5,
+            order_date=datetime(2099, 5, 2), status="delivered",
+        )
+        ingest_dealer_orders(db, [row], dry_run=True)
+        assert _stored(db, dealer.id, "2099-05") is None
+
+        ingest_dealer_orders(db, [row], dry_run=False)
+        # The stored month counts the whole month; reads only count it once the simulation date gets there.
+        assert _assert_fresh(db, dealer.id, "2099-05").total_orders == 1
+        assert get_dealer_health(db, dealer.id, {"2099-05"}) == {}
+        _assert_fresh(db, dealer.id, LIFETIME)
+
+        past = (
+            db.query(DealerHealthScore)
+            .filter(DealerHealthScore.dealer_id == dealer.id, DealerHealthScore.period < month_period(get_simulation_date()))
+            .order_by(DealerHealthScore.period.desc())
+            .first()
+        )
+        past_version = past.version
+        level = (
+            db.query(InventoryLevel)
+            .filter(InventoryLevel.warehouse_id == dealer.warehouse_id)
+            .order_by(InventoryLevel.id)
+            .first()
+        )
+        original_cover = level.days_of_cover
+        level.days_of_cover = 0.5 if original_cover >= 3 else 45.0
+        db.commit()
+        lifetime = _assert_fresh(db, dealer.id, LIFETIME)
+        version = lifetime.version
+        # Monthly rows hold no stock; their scores pick up the new stock signal at read time.
+        assert _stored(db, dealer.id, past.period).version == past_version
+        month = get_dealer_health(db, dealer.id, {past.period})[past.period]
+        assert month["health_score"] == monthly_health_score(
+            past.total_orders, past.delivered_orders, past.unique_skus, stock_signal(lifetime.avg_days_of_cover),
+        )
+
+        level.days_of_cover = original_cover
+        db.commit()
+        assert _stored(db, dealer.id, LIFETIME).version == version + 1
+    finally:
+        if dealer is not None:
+            db.query(DealerOrder).filter(
+                DealerOrder.dealer_id == dealer.id, DealerOrder.order_date == datetime(2099, 5, 2)
+            ).delete()
+            db.query(DealerHealthScore).filter_by(dealer_id=dealer.id, period="2099-05").delete()
+            refresh_dealer_health(db, {dealer.id: {LIFETIME}})
+            db.commit()
+        db.close()
+
+
+def test_dealer_warehouse_move_refreshes_lifetime_score():
+    db = SessionLocal()
+    dealer = None
+    try:
+        dealer = db.query(Dealer).order_by(Dealer.id).first()
+        original_warehouse = dealer.warehouse_id
+        other = db.query(Warehouse.id).filter(Warehouse.id != original_warehouse).order_by(Warehouse.id).first()[0]
+
+        dealer.warehouse_id = other
+        db.commit()
+        assert _assert_fresh(db, dealer.id, LIFETIME).inventory_levels == (
+            db.query(InventoryLevel).filter(InventoryLevel.warehouse_id == other).count()
+        )
+    finally:
+        if dealer is not None:
+            dealer.warehouse_id = original_warehouse
+            db.commit()
+            _assert_fresh(db, dealer.id, LIFETIME)
+        db.close()
+
+
+# SQLite lets one writer at a time flush, so both transactions can only overlap on a server database.
+@pytest.mark.skipif(database.IS_SQLITE, reason="needs concurrent writers (SQLite serialises them)")
+def test_concurrent_order_commits_for_one_dealer_keep_both_orders():
+    db = SessionLocal()
+    try:
+        dealer_id = db.query(Dealer.id).order_by(Dealer.id).first()[0]
+        sku_id = db.query(SKU.id).order_by(SKU.id).first()[0]
+    finally:
+        db.close()
+    order_date = datetime(2099, 6, 3)
+    start = threading.Barrier(2)
+
+    def place(_):
+        session = SessionLocal()
+        try:
+            session.add(DealerOrder(dealer_id=dealer_id, sku_id=sku_id, quantity=1, order_date=order_date, status="pending"))
+            session.flush()
+            start.wait(timeout=10)
+            session.commit()
+        finally:
+            session.close()
+
+    db = SessionLocal()
+    try:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(place, range(2)))
+        assert _assert_fresh(db, dealer_id, "2099-06").total_orders == 2
+        _assert_fresh(db, dealer_id, LIFETIME)
+    finally:
+        db.query(DealerOrder).filter(DealerOrder.dealer_id == dealer_id, DealerOrder.order_date == order_date).delete()
+        db.query(DealerHealthScore).filter_by(dealer_id=dealer_id, period="2099-06").delete()
+        refresh_dealer_health(db, {dealer_id: {LIFETIME}})
+        db.commit()
+        db.close()
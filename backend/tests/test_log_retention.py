@@ -0,0 +1,160 @@
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.database import Base, SessionLocal, engine
+from app.models.audit import AuditLog
+from app.models.retention import LogArchivePartition
+from app.services.retention_service import (
+    RETENTION_POLICIES,
+    apply_retention,
+    archive_entity_batch,
+    list_archive_partitions,
+    read_archive_partition,
+)
+
+
+Base.metadata.create_all(bind=engine)
+
+
+def test_retention_archives_old_audit_rows_into_day_partitions(tmp_path):
+    request_id = f"retention-{uuid.uuid4().hex[:8]}"
+    old_day = datetime.utcnow() - timedelta(days=400)
+
+    db = SessionLocal()
+    try:
+        for offset in range(5):
+            db.add(
+                AuditLog(
+                    method="POST",
+                    path="/api/retention-test",
+                    action="POST:/api/retention-test",
+                    status_code=200,
+                    request_id=request_id,
+                    created_at=old_day + timedelta(minutes=offset),
+                )
+            )
+        db.commit()
+    finally:
+        db.close()
+
+    summary = apply_retention(tmp_path, batch_size=2)
+    assert summary["audit_logs"]["archived"] >= 5
+    assert summary["audit_logs"]["batches"] >= 3
+
+    db = SessionLocal()
+    try:
+        assert db.query(AuditLog).filter(AuditLog.request_id == request_id).count() == 0
+
+        listing = list_archive_partitions(db, entity="audit_logs", date_from=old_day.date(), date_to=old_day.date())
+        assert listing["total"] == 1
+        partition = listing["items"][0]
+        assert partition["row_count"] >= 5
+
+        archived = read_archive_partition(db, partition["id"], limit=1000)
+        archived_ids = [row["request_id"] for row in archived["items"]]
+        assert archived_ids.count(request_id) == 5
+
+        db.query(LogArchivePartition).filter(LogArchivePartition.id == partition["id"]).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_retry_after_a_failed_commit_does_not_duplicate_archived_rows(tmp_path):
+    request_id = f"retention-{uuid.uuid4().hex[:8]}"
+    old_day = datetime.utcnow() - timedelta(days=500)
+
+    db = SessionLocal()
+    try:
+        for offset in range(3):
+            db.add(
+                AuditLog(
+                    method="POST",
+                    path="/api/retention-test",
+                    action="POST:/api/retention-test",
+                    status_code=200,
+                    request_id=request_id,
+                    created_at=old_day + timedelta(minutes=offset),
+                )
+            )
+        db.commit()
+    finally:
+        db.close()
+
+    cutoff = datetime.utcnow() - timedelta(days=450)
+    db = SessionLocal()
+    try:
+        def crash():
+            raise RuntimeError("crashed before commit")
+
+        db.commit = crash
+        try:
+            archive_entity_batch(db, "audit_logs", cutoff, tmp_path, 10)
+        except RuntimeError:
+            db.rollback()
+        else:
+            raise AssertionError("commit should have failed")
+    finally:
+        db.close()
+
+    apply_retention(tmp_path, batch_size=10)
+
+    db = SessionLocal()
+    try:
+        partition = (
+            db.query(LogArchivePartition)
+            .filter(LogArchivePartition.entity == "audit_logs", LogArchivePartition.partition_date == old_day.date())
+            .one()
+        )
+        archived = read_archive_partition(db, partition.id, limit=1000)
+        assert [row["request_id"] for row in archived["items"]].count(request_id) == 3
+        assert partition.size_bytes == Path(partition.file_path).stat().st_size
+
+        db.delete(partition)
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_rows_with_lower_ids_reaching_a_partition_later_are_still_archived(tmp_path):
+    request_id = f"retention-{uuid.uuid4().hex[:8]}"
+    day = (datetime.utcnow() - timedelta(days=600)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    db = SessionLocal()
+    try:
+        # The lower id is stamped later in the day, like an ingestion run that started late.
+        for hour in (23, 1):
+            db.add(
+                AuditLog(
+                    method="POST",
+                    path="/api/retention-test",
+                    action="POST:/api/retention-test",
+                    status_code=200,
+                    request_id=request_id,
+                    created_at=day + timedelta(hours=hour),
+                )
+            )
+            db.commit()
+    finally:
+        db.close()
+
+    retention_days = RETENTION_POLICIES["audit_logs"][2]
+    apply_retention(tmp_path, now=day + timedelta(days=retention_days, hours=12))
+    apply_retention(tmp_path, now=day + timedelta(days=retention_days + 1))
+
+    db = SessionLocal()
+    try:
+        assert db.query(AuditLog).filter(AuditLog.request_id == request_id).count() == 0
+        partition = (
+            db.query(LogArchivePartition)
+            .filter(LogArchivePartition.entity == "audit_logs", LogArchivePartition.partition_date == day.date())
+            .one()
+        )
+        archived = read_archive_partition(db, partition.id, limit=1000)
+        assert [row["request_id"] for row in archived["items"]].count(request_id) == 2
+
+        db.delete(partition)
+        db.commit()
+    finally:
+        db.close()
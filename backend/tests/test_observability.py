@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.metrics_segment import MmapMetricsSegment, encode_key, segment_path
+from app.services.observability_service import LATENCY_BUCKETS_MS, LatencyHistogram, collect_worker_metrics
+from app.services.profiling_service import SamplingProfiler
+
+
+client = TestClient(app)
+
+
+def test_latency_histogram_quantiles_and_merge():
+    fast = LatencyHistogram()
+    slow = LatencyHistogram()
+    for _ in range(990):
+        fast.observe(4.0)
+    for _ in range(10):
+        slow.observe(900.0)
+
+    fast.merge(slow)
+    assert fast.count == 1000
+    assert sum(fast.counts) == 1000
+    assert fast.quantile(0.5) <= 4.0
+    assert fast.quantile(0.999) > 500.0
+
+
+def test_prometheus_histogram_series_use_route_templates():
+    client.get("/api/simulate/scenario/UNKNOWN_SCENARIO/data")
+
+    snapshot = client.get("/api/metrics").json()
+    routes = {(entry["route"], entry["method"], entry["status"]) for entry in snapshot["routes"]}
+    assert ("/api/simulate/scenario/{scenario_id}/data", "GET", "4xx") in routes
+    assert "p99" in snapshot["requests"]["latency_ms"]
+
+    prom = client.get("/api/metrics?format=prometheus").text
+    labels = 'route="/api/simulate/scenario/{scenario_id}/data",method="GET",status="4xx"'
+    assert f'paintflow_http_request_duration_ms_bucket{{{labels},le="+Inf"}}' in prom
+    assert f"paintflow_http_request_duration_ms_count{{{labels}}}" in prom
+    bucket_lines = [line for line in prom.splitlines() if line.startswith(f"paintflow_http_request_duration_ms_bucket{{{labels}")]
+    assert len(bucket_lines) == len(LATENCY_BUCKETS_MS) + 1
+
+
+def test_worker_segments_are_merged_at_scrape_time(tmp_path):
+    series = ("/api/meta", "GET", "2xx")
+    for pid, requests in ((os.getpid(), 3), (2**22 + 17, 2)):
+        segment = MmapMetricsSegment(segment_path(tmp_path, pid))
+        for _ in range(requests):
+            segment.inc(encode_key("requests_total"))
+            segment.inc(encode_key("status", "2xx"))
+            segment.inc(encode_key("hist", *series, 4))
+            segment.inc(encode_key("hist_sum", *series), 1.5)
+        segment.inc(encode_key("in_flight"), 2)
+        segment.close()
+
+    merged = collect_worker_metrics(tmp_path)
+    assert merged["requests_total"] == 5
+    assert merged["status_counts"] == {"2xx": 5}
+    assert merged["workers"] == 1
+    # The second pid is not running, so its in-flight gauge is ignored.
+    assert merged["in_flight"] == 2
+    hist = merged["route_latency"][series]
+    assert hist.count == 5
+    assert hist.counts[4] == 5
+    assert round(hist.sum_ms, 2) == 7.5
+
+
+def test_db_query_headers_and_route_aggregates():
+    response = client.get("/api/health/ready")
+    assert response.status_code == 200
+    assert int(response.headers["x-db-queries"]) >= 1
+    assert float(response.headers["x-db-time-ms"]) >= 0
+
+    snapshot = client.get("/api/metrics").json()
+    ready = [entry for entry in snapshot["routes"] if entry["route"] == "/api/health/ready"]
+    assert ready and ready[0]["db_queries"] >= 1
+
+
+def test_profile_endpoint_requires_admin():
+    response = client.get("/api/profile?seconds=0.1")
+    assert response.status_code == 401
+
+
+def test_sampling_profiler_attributes_stacks_to_routes():
+    def busy_endpoint():
+        deadline = time.perf_counter() + 0.3
+        while time.perf_counter() < deadline:
+            sum(range(200))
+
+    profiler = SamplingProfiler({busy_endpoint.__code__: "/api/busy"}, interval_ms=2)
+    profiler.start()
+    worker = threading.Thread(target=busy_endpoint)
+    worker.start()
+    worker.join()
+    profiler.stop()
+
+    summary = profiler.summary()
+    assert summary["routes"][0]["route"] == "/api/busy"
+    assert profiler.collapsed().startswith("/api/busy;")
+    speedscope = profiler.speedscope()
+    assert speedscope["profiles"][0]["name"] == "/api/busy"
+    assert len(speedscope["profiles"][0]["samples"]) == len(speedscope["profiles"][0]["weights"])
@@ -0,0 +1,107 @@
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app import database
+from app.database import SessionLocal
+from app.main import app
+from app.models.user import User
+from app.services.auth_service import create_access_token
+from app.services.catalog_cache import catalog_cache
+
+
+client = TestClient(app)
+
+# Tables that grow with traffic. Catalog and reference tables (regions, warehouses, dealers,
+# products, shades) are small and fully cached by SQLite, so scanning them is acceptable.
+GROWING_TABLES = {
+    "cart",
+    "customer_order_items",
+    "customer_order_requests",
+    "customer_orders",
+    "dealer_orders",
+    "inventory_levels",
+    "notifications",
+    "sales_history",
+    "skus",
+    "users",
+    "wishlist",
+}
+
+DEALER_ENDPOINTS = [
+    "/api/notifications",
+    "/api/notifications/unread-count",
+    "/api/dealer/me/dashboard",
+    "/api/dealer/me/dashboard/activity",
+    "/api/dealer/me/dashboard/pipeline",
+    "/api/dealer/me/dashboard/trends",
+    "/api/dealer/me/orders",
+    "/api/dealer/me/customer-requests",
+    "/api/dealer/me/alerts",
+]
+
+CUSTOMER_ENDPOINTS = [
+    "/api/customer/me/cart",
+    "/api/customer/me/orders",
+    "/api/customer/me/wishlist",
+    "/api/customer/shades/1",
+    "/api/customer/shades/1/availability?lat=28.6&lng=77.2",
+]
+
+_SCAN = re.compile(r"^SCAN (\w+)")
+
+
+def _headers_for(role: str) -> dict:
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.role == role, User.is_active == True).first()
+        assert user is not None
+        return {"Authorization": f"Bearer {create_access_token(user.id, user.role)}"}
+    finally:
+        db.close()
+
+
+def _captured_selects(path: str, headers: dict) -> list[tuple[str, tuple]]:
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not executemany:
+            statements.append((statement, tuple(parameters or ())))
+
+    engines = (database.engine, database.async_engine.sync_engine)
+    for target in engines:
+        event.listen(target, "before_cursor_execute", capture)
+    try:
+        response = client.get(path, headers=headers)
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", capture)
+    assert response.status_code == 200, (path, response.text)
+    return statements
+
+
+def full_scans(statements: list[tuple[str, tuple]]) -> list[tuple[str, str]]:
+    """Return (table, statement) for each plan step that scans a growing table end to end."""
+    found = []
+    with database.engine.connect() as conn:
+        for statement, parameters in statements:
+            for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters):
+                match = _SCAN.match(row[-1])
+                if match and match.group(1) in GROWING_TABLES:
+                    found.append((match.group(1), " ".join(statement.split())))
+    return found
+
+
+@pytest.mark.skipif(not database.IS_SQLITE, reason="query plans are checked with SQLite EXPLAIN QUERY PLAN")
+@pytest.mark.parametrize(
+    "path,role",
+    [(path, "dealer") for path in DEALER_ENDPOINTS] + [(path, "customer") for path in CUSTOMER_ENDPOINTS],
+)
+def test_key_endpoints_avoid_full_scans(path, role):
+    # The catalog snapshot reads every SKU once per catalog version, not per request.
+    catalog_cache.skus()
+    statements = _captured_selects(path, _headers_for(role))
+    assert statements, path
+    assert full_scans(statements) == []
@@ -0,0 +1,197 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import or_
+
+from app.database import SessionLocal
+from app.geo import haversine_km
+from app.main import app
+from app.models import CustomerOrder, CustomerOrderItem, Dealer, InventoryLevel, Notification, StockReservation, User
+from app.services.auth_service import create_access_token
+from app.services.customer_service import get_cart, set_cart, update_dealer_customer_request_status
+from app.services.reservation_service import expire_reservations, get_checkout_dealers, reserve_stock
+from tests.test_dealer_dashboard import _count_queries
+
+
+client = TestClient(app)
+
+
+def _customer(db) -> User:
+    return db.query(User).filter(User.role == "customer", User.is_active.is_(True)).order_by(User.id).first()
+
+
+def _stock(db, warehouse_id: int, sku_id: int) -> tuple[int, int]:
+    """(current_stock, reserved_stock) as committed."""
+    db.expire_all()
+    level = db.query(InventoryLevel).filter(
+        InventoryLevel.warehouse_id == warehouse_id, InventoryLevel.sku_id == sku_id
+    ).one()
+    return level.current_stock, level.reserved_stock
+
+
+def _stocked_level(db, dealer: Dealer) -> InventoryLevel:
+    return (
+        db.query(InventoryLevel)
+        .filter(InventoryLevel.warehouse_id == dealer.warehouse_id, InventoryLevel.current_stock >= 20)
+        .order_by(InventoryLevel.id)
+        .first()
+    )
+
+
+def _delete_orders(db, order_ids: list[int], since: datetime | None = None) -> None:
+    if since is not None:
+        db.query(Notification).filter(
+            Notification.title == "Order Request Update", Notification.created_at >= since
+        ).delete(synchronize_session=False)
+    if not order_ids:
+        db.commit()
+        return
+    db.query(StockReservation).filter(StockReservation.order_id.in_(order_ids)).delete()
+    db.query(CustomerOrderItem).filter(CustomerOrderItem.order_id.in_(order_ids)).delete()
+    db.query(CustomerOrder).filter(CustomerOrder.id.in_(order_ids)).delete()
+    db.query(Notification).filter(
+        or_(*(Notification.message.contains(f"request #{order_id} ") for order_id in order_ids))
+    ).delete(synchronize_session=False)
+    db.commit()
+
+
+def test_checkout_reserves_stock_and_closing_the_request_returns_it():
+    db = SessionLocal()
+    try:
+        customer = _customer(db)
+        customer_id = customer.id
+        headers = {"Authorization": f"Bearer {create_access_token(customer.id, customer.role)}"}
+        dealer = db.query(Dealer).order_by(Dealer.id).first()
+        dealer_id = dealer.id
+        level = _stocked_level(db, dealer)
+        warehouse_id, sku_id = level.warehouse_id, level.sku_id
+        stock, reserved = _stock(db, warehouse_id, sku_id)
+        original = [(item["sku_id"], item["quantity"]) for item in get_cart(db, customer_id)["items"]]
+        order_ids = []
+        started = datetime.utcnow()
+
+        def place(quantity: int):
+            set_cart(db, customer_id, [(sku_id, quantity)])
+            return client.post("/api/customer/me/checkout", headers=headers, json={"dealer_id": dealer_id})
+
+        try:
+            short = place(stock - reserved + 1)
+            assert short.status_code == 409
+            assert _stock(db, warehouse_id, sku_id) == (stock, reserved)
+            assert get_cart(db, customer_id)["count"] == 1
+
+            cancelled = place(3)
+            assert cancelled.status_code == 200
+            order_ids.append(cancelled.json()["order_id"])
+            assert _stock(db, warehouse_id, sku_id) == (stock, reserved + 3)
+            update_dealer_customer_request_status(db, dealer_id, order_ids[-1], "cancelled")
+            assert _stock(db, warehouse_id, sku_id) == (stock, reserved)
+
+            fulfilled = place(2)
+            order_ids.append(fulfilled.json()["order_id"])
+            update_dealer_customer_request_status(db, dealer_id, order_ids[-1], "contacted")
+            update_dealer_customer_request_status(db, dealer_id, order_ids[-1], "fulfilled")
+            assert _stock(db, warehouse_id, sku_id) == (stock - 2, reserved)
+
+            statuses = dict(
+                db.query(StockReservation.order_id, StockReservation.status)
+                .filter(StockReservation.order_id.in_(order_ids))
+            )
+            assert statuses == {order_ids[0]: "released", order_ids[1]: "consumed"}
+        finally:
+            set_cart(db, customer_id, original)
+            _delete_orders(db, order_ids, since=started)
+            db.query(InventoryLevel).filter(
+                InventoryLevel.warehouse_id == warehouse_id, InventoryLevel.sku_id == sku_id
+            ).update({"current_stock": stock, "reserved_stock": reserved})
+            db.commit()
+    finally:
+        db.close()
+
+
+def test_concurrent_reservations_never_oversell():
+    db = SessionLocal()
+    try:
+        customer = _customer(db)
+        dealer = db.query(Dealer).order_by(Dealer.id).first()
+        level = _stocked_level(db, dealer)
+        warehouse_id, sku_id = level.warehouse_id, level.sku_id
+        stock, reserved = _stock(db, warehouse_id, sku_id)
+        order = CustomerOrder(user_id=customer.id, dealer_id=dealer.id, status="requested", total_amount=0.0)
+        db.add(order)
+        db.commit()
+        order_id = order.id
+        # Only four units are available to promise.
+        db.query(InventoryLevel).filter(InventoryLevel.id == level.id).update({"reserved_stock": stock - 4})
+        db.commit()
+
+        def reserve(_) -> bool:
+            session = SessionLocal()
+            try:
+                reserve_stock(session, order_id, warehouse_id, {sku_id: 1})
+                session.commit()
+                return True
+            except HTTPException as exc:
+                session.rollback()
+                assert exc.status_code == 409
+                return False
+            finally:
+                session.close()
+
+        try:
+            # The conditional UPDATE that takes the row locks is the last statement sent.
+            with _count_queries() as statements:
+                assert reserve(None) is True
+            assert statements[-1].lstrip().upper().startswith("UPDATE INVENTORY_LEVELS")
+
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                results = list(pool.map(reserve, range(10)))
+            assert results.count(True) == 3
+            assert _stock(db, warehouse_id, sku_id) == (stock, stock)
+            assert db.query(StockReservation).filter(StockReservation.order_id == order_id).count() == 4
+
+            assert expire_reservations(db, now=datetime.utcnow() - timedelta(minutes=1)) == 0
+            assert expire_reservations(db, now=datetime.utcnow() + timedelta(days=30)) >= 4
+            db.commit()
+            assert _stock(db, warehouse_id, sku_id) == (stock, stock - 4)
+        finally:
+            _delete_orders(db, [order_id])
+            db.query(InventoryLevel).filter(InventoryLevel.id == level.id).update({"reserved_stock": reserved})
+            db.commit()
+    finally:
+        db.close()
+
+
+def test_checkout_dealers_suggests_the_nearest_dealer_that_can_fill_the_cart():
+    db = SessionLocal()
+    try:
+        customer_id = _customer(db).id
+        dealers = db.query(Dealer).order_by(Dealer.id).all()
+        origin = dealers[0]
+        level = _stocked_level(db, origin)
+        sku_id, needed = level.sku_id, level.current_stock - level.reserved_stock
+        fillable = {
+            warehouse_id
+            for (warehouse_id,) in db.query(InventoryLevel.warehouse_id).filter(
+                InventoryLevel.sku_id == sku_id, InventoryLevel.current_stock - InventoryLevel.reserved_stock >= needed
+            )
+        }
+        nearest = min(
+            haversine_km(origin.latitude, origin.longitude, dealer.latitude, dealer.longitude)
+            for dealer in dealers
+            if dealer.warehouse_id in fillable
+        )
+        original = [(item["sku_id"], item["quantity"]) for item in get_cart(db, customer_id)["items"]]
+        try:
+            set_cart(db, customer_id, [(sku_id, needed)])
+            result = get_checkout_dealers(db, customer_id, origin.latitude, origin.longitude)
+            suggested = result["suggested_dealer"]
+            assert suggested is not None and suggested["can_fill_cart"]
+            assert suggested["distance_km"] == round(nearest, 1)
+            assert all(dealer["distance_km"] < 50 for dealer in result["dealers"])
+        finally:
+            set_cart(db, customer_id, original)
+    finally:
+        db.close()
@@ -0,0 +1,113 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app.database import SessionLocal
+from app.main import app
+from app.models import User, Warehouse
+from app.services.auth_service import create_access_token
+from app.services import response_cache as response_cache_module
+from app.services.response_cache import MemoryCacheBackend, ResponseCache, cached_read, response_cache
+
+
+def test_concurrent_misses_share_one_load():
+    cache = ResponseCache(MemoryCacheBackend(), stale_seconds=60)
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"value": len(calls)}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_load("k", slow_loader, ttl=60, tags=("t",))))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"value": 1}] * 8
+
+
+def test_stale_entry_is_served_while_refreshing():
+    cache = ResponseCache(MemoryCacheBackend(), stale_seconds=60)
+    versions = iter(range(10))
+    cache.get_or_load("k", lambda: next(versions), ttl=0.05, tags=())
+    time.sleep(0.1)
+
+    assert cache.get_or_load("k", lambda: next(versions), ttl=0.05, tags=()) == 0
+    deadline = time.time() + 2
+    while cache.stats["refreshes"] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert cache.get_or_load("k", lambda: next(versions), ttl=60, tags=()) == 1
+
+
+def test_invalidated_tag_forces_reload():
+    cache = ResponseCache(MemoryCacheBackend(), stale_seconds=60)
+    versions = iter(range(10))
+    assert cache.get_or_load("k", lambda: next(versions), ttl=60, tags=("warehouses",)) == 0
+    assert cache.get_or_load("k", lambda: next(versions), ttl=60, tags=("warehouses",)) == 0
+    cache.invalidate("regions")
+    assert cache.get_or_load("k", lambda: next(versions), ttl=60, tags=("warehouses",)) == 0
+    cache.invalidate("warehouses")
+    assert cache.get_or_load("k", lambda: next(versions), ttl=60, tags=("warehouses",)) == 1
+
+
+def test_committed_write_invalidates_admin_dashboard():
+    client = TestClient(app)
+    db = SessionLocal()
+    try:
+        admin = db.query(User).filter(User.role == "admin", User.is_active == True).first()
+        headers = {"Authorization": f"Bearer {create_access_token(admin.id, admin.role)}"}
+    finally:
+        db.close()
+
+    first = client.get("/api/admin/analytics/warehouse-utilization", headers=headers)
+    assert first.status_code == 200
+    hits = response_cache.stats["hits"]
+    assert client.get("/api/admin/analytics/warehouse-utilization", headers=headers).json() == first.json()
+    assert response_cache.stats["hits"] == hits + 1
+
+    db = SessionLocal()
+    try:
+        warehouse = db.query(Warehouse).order_by(Warehouse.id).first()
+        original_name = warehouse.name
+        warehouse.name = original_name
+        db.add(warehouse)
+        db.flush()
+        db.commit()
+        misses = response_cache.stats["misses"]
+        client.get("/api/admin/analytics/warehouse-utilization", headers=headers)
+        # Touching the session with no dirty state does not count as a write.
+        assert response_cache.stats["misses"] == misses
+
+        warehouse.name = original_name + " (renamed)"
+        db.commit()
+        client.get("/api/admin/analytics/warehouse-utilization", headers=headers)
+        assert response_cache.stats["misses"] == misses + 1
+    finally:
+        warehouse.name = original_name
+        db.commit()
+        db.close()
+
+
+def test_cached_reads_are_keyed_by_simulation_date(monkeypatch):
+    loads = []
+
+    def loader(db):
+        loads.append(1)
+        return len(loads)
+
+    key = f"test:sim-date:{time.time()}"
+    monkeypatch.setattr(response_cache_module, "get_simulation_date_str", lambda: "2030-01-01")
+    assert cached_read(key, loader, ttl=60, tags=("regions",)) == 1
+    assert cached_read(key, loader, ttl=60, tags=("regions",)) == 1
+
+    # A day rollover shifts every date-relative window, so the entry must not be reused.
+    monkeypatch.setattr(response_cache_module, "get_simulation_date_str", lambda: "2030-01-02")
+    assert cached_read(key, loader, ttl=60, tags=("regions",)) == 2
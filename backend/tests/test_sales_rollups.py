@@ -0,0 +1,104 @@
+from datetime import date, timedelta
+
+from sqlalchemy import func
+
+from app.config import get_simulation_date
+from app.database import SessionLocal
+from app.models import Product, Region, SKU, SalesDailyCategory, SalesDailyRegion, SalesDailySku, SalesHistory, Shade
+from app.schemas.ingestion import SalesHistoryIn
+from app.services.admin_crud_service import update_product
+from app.services.analytics_service import get_revenue_breakdown
+from app.services.ingestion_service import ingest_sales_history
+from app.services.sales_rollup_service import rebuild_sales_rollups
+
+
+TEST_DAY = date(2099, 1, 1)
+
+
+def _rollup_totals(db, day: date) -> list[tuple]:
+    return [
+        db.query(model.quantity_sold, model.revenue).filter(model.date == day).all()
+        for model in (SalesDailyRegion, SalesDailyCategory, SalesDailySku)
+    ]
+
+
+def test_ingestion_keeps_rollups_in_step_with_raw_rows():
+    db = SessionLocal()
+    try:
+        sku_code = db.query(SKU.sku_code).order_by(SKU.id).first()[0]
+        region_name = db.query(Region.name).order_by(Region.id).first()[0]
+
+        def row(qty, revenue):
+            return SalesHistoryIn(
+                sku_code=sku_code, region_name=region_name, date=TEST_DAY, quantity_sold=qty, revenue=revenue
+            )
+
+        ingest_sales_history(db, [row(10, 1000.0)], dry_run=True)
+        assert _rollup_totals(db, TEST_DAY) == [[], [], []]
+
+        ingest_sales_history(db, [row(10, 1000.0)], dry_run=False)
+        assert _rollup_totals(db, TEST_DAY) == [[(10, 1000.0)]] * 3
+
+        ingest_sales_history(db, [row(4, 400.0)], dry_run=False)
+        assert _rollup_totals(db, TEST_DAY) == [[(4, 400.0)]] * 3
+    finally:
+        db.query(SalesHistory).filter(SalesHistory.date == TEST_DAY).delete()
+        rebuild_sales_rollups(db, TEST_DAY, TEST_DAY)
+        db.commit()
+        assert _rollup_totals(db, TEST_DAY) == [[], [], []]
+        db.close()
+
+
+def test_revenue_breakdown_from_rollups_matches_raw_sales():
+    db = SessionLocal()
+    try:
+        sim_date = get_simulation_date()
+        start = sim_date - timedelta(days=29)
+        raw_total = (
+            db.query(func.sum(SalesHistory.revenue))
+            .filter(SalesHistory.date >= start, SalesHistory.date <= sim_date)
+            .scalar()
+            or 0
+        )
+        breakdown = get_revenue_breakdown(db, days=30)
+    finally:
+        db.close()
+
+    for dimension in ("by_region", "by_category", "by_day"):
+        assert abs(sum(item["revenue"] for item in breakdown[dimension]) - raw_total) <= len(breakdown[dimension])
+
+
+def _category_revenue(db) -> tuple[dict, dict]:
+    stored = dict(
+        db.query(SalesDailyCategory.category, func.sum(SalesDailyCategory.revenue)).group_by(SalesDailyCategory.category)
+    )
+    raw = dict(
+        db.query(Product.category, func.sum(SalesHistory.revenue))
+        .join(SKU, SKU.id == SalesHistory.sku_id)
+        .join(Shade, Shade.id == SKU.shade_id)
+        .join(Product, Product.id == Shade.product_id)
+        .group_by(Product.category)
+    )
+    return {key: round(value, 2) for key, value in stored.items() if value}, {
+        key: round(value, 2) for key, value in raw.items()
+    }
+
+
+def test_category_edit_moves_product_sales_to_the_new_category_rollup():
+    db = SessionLocal()
+    try:
+        product = db.query(Product).join(Shade).join(SKU).join(SalesHistory).order_by(Product.id).first()
+        product_id, original = product.id, product.category
+        stored, raw = _category_revenue(db)
+        assert stored == raw
+        try:
+            update_product(db, product_id, category="Rollup Test Category")
+            stored, raw = _category_revenue(db)
+            assert "Rollup Test Category" in stored
+            assert stored == raw
+        finally:
+            update_product(db, product_id, category=original)
+        stored, raw = _category_revenue(db)
+        assert stored == raw and "Rollup Test Category" not in stored
+    finally:
+        db.close()
@@ -0,0 +1,186 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+
+from app.database import AsyncSessionLocal, SessionLocal
+from app.main import app
+from app.models import Product, SKU, Shade
+from app.services import shade_catalog as shade_catalog_module
+from app.services.shade_catalog import CatalogIndex, ShadeCatalog
+
+
+client = TestClient(app)
+
+
+def _walk(index: CatalogIndex, **params) -> list[dict]:
+    items, cursor = [], None
+    while True:
+        page = index.page(cursor=cursor, **params)
+        items.extend(page["items"])
+        assert page["total"] >= len(items)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items
+
+
+def test_catalog_filters_match_the_database_and_pages_cover_every_shade():
+    db = SessionLocal()
+    try:
+        family, category = db.query(Shade.shade_family, Product.category).join(Product).order_by(Shade.id).first()
+        price_from = dict(db.query(SKU.shade_id, func.min(SKU.mrp)).group_by(SKU.shade_id).all())
+        expected = [
+            shade_id
+            for (shade_id,) in db.query(Shade.id)
+            .join(Product, Product.id == Shade.product_id)
+            .filter(Shade.shade_family == family, Product.category == category)
+            .order_by(Shade.id)
+        ]
+        all_ids = [shade_id for (shade_id,) in db.query(Shade.id).order_by(Shade.id)]
+    finally:
+        db.close()
+
+    ids, cursor = [], None
+    while True:
+        response = client.get("/api/customer/shades", params={"limit": 7, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        ids.extend(item["id"] for item in response.json()["items"])
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            break
+    assert ids == all_ids
+    assert int(response.headers["x-db-queries"]) == 0
+
+    filtered = client.get("/api/customer/shades", params={"family": family, "category": category, "limit": 200}).json()
+    assert [item["id"] for item in filtered["items"]] == expected
+    assert filtered["total"] == len(expected)
+
+    band = client.get("/api/customer/shades", params={"min_price": 300, "max_price": 500, "limit": 200}).json()
+    assert {item["id"] for item in band["items"]} == {
+        shade_id for shade_id, price in price_from.items() if 300 <= price <= 500
+    }
+    family_ids = {
+        item["id"] for item in client.get("/api/customer/shades", params={"family": family, "limit": 200}).json()["items"]
+    }
+    featured = client.get(
+        "/api/customer/shades", params={"sort": "featured", "families": f"{family}, Unknown", "limit": 200}
+    ).json()
+    assert {item["id"] for item in featured["items"][:len(family_ids)]} == family_ids
+    assert client.get("/api/customer/shades", params={"sort": "newest"}).status_code == 400
+    assert client.get("/api/customer/shades", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_catalog_search_ranks_prefix_matches_before_fuzzy_ones():
+    db = SessionLocal()
+    try:
+        shade = db.query(Shade).order_by(Shade.id).first()
+        shade_id, name, code = shade.id, shade.shade_name, shade.shade_code
+    finally:
+        db.close()
+
+    def search(q: str) -> list[int]:
+        return [item["id"] for item in client.get("/api/customer/shades", params={"q": q}).json()["items"]]
+
+    assert search(name[:4])[0] == shade_id
+    assert shade_id in search(code.lower())
+    assert shade_id in search(name.split()[-1][:3])
+    # One dropped letter is still found by the trigram fallback.
+    typo = name[:2] + name[3:]
+    assert shade_id in search(typo)
+    assert search("zzqxv") == []
+
+
+def test_catalog_index_is_rebuilt_after_a_shade_edit():
+    db = SessionLocal()
+    try:
+        shade = db.query(Shade).order_by(Shade.id).first()
+        original = shade.shade_name
+        assert client.get("/api/customer/shades", params={"q": "Quokka Teal"}).json()["total"] == 0
+        try:
+            shade.shade_name = "Quokka Teal"
+            db.commit()
+            found = client.get("/api/customer/shades", params={"q": "quokka"}).json()["items"]
+            assert [item["id"] for item in found] == [shade.id]
+        finally:
+            shade.shade_name = original
+            db.commit()
+        assert client.get("/api/customer/shades", params={"q": "quokka"}).json()["total"] == 0
+    finally:
+        db.close()
+
+
+def test_catalog_rebuilds_once_in_a_thread_while_serving_the_previous_index(monkeypatch):
+    builds = []
+
+    def build(rows):
+        builds.append(threading.current_thread() is threading.main_thread())
+        return CatalogIndex(rows)
+
+    monkeypatch.setattr(shade_catalog_module, "CatalogIndex", build)
+    catalog = ShadeCatalog()
+
+    async def read():
+        async with AsyncSessionLocal() as db:
+            return await catalog.index(db)
+
+    async def scenario():
+        first = await read()
+        catalog._version = None  # as if shades changed
+        return first, await asyncio.gather(*(read() for _ in range(5)))
+
+    first, indexes = asyncio.run(scenario())
+    assert builds == [False, False]
+    rebuilt = [index for index in indexes if index is not first]
+    assert len(rebuilt) == 1 and indexes.count(first) == 4
+
+
+def test_keyset_pages_are_stable_across_ties_on_a_large_catalog():
+    rows = [
+        SimpleNamespace(
+            id=shade_id,
+            shade_code=f"SH-{shade_id:05d}",
+            shade_name=f"Shade {shade_id % 97}",
+            hex_color="#FFFFFF",
+            shade_family=("Reds", "Blues", "Greens")[shade_id % 3],
+            is_trending=shade_id % 5 == 0,
+            product_name="Interior Emulsion",
+            product_category="Interior Wall",
+            finish="Matt",
+            price_from=None if shade_id % 1000 == 0 else float(100 + shade_id % 40),
+        )
+        for shade_id in range(1, 20001)
+    ]
+    index = CatalogIndex(rows)
+
+    by_name = _walk(index, sort="name", family="Blues", limit=500)
+    assert [(item["shade_name"].lower(), item["id"]) for item in by_name] == sorted(
+        (row.shade_name.lower(), row.id) for row in rows if row.shade_family == "Blues"
+    )
+
+    by_price = _walk(index, sort="price_desc", trending=True, limit=333)
+    assert [item["id"] for item in by_price] == [
+        row.id for row in sorted(
+            (row for row in rows if row.is_trending),
+            key=lambda row: (-(row.price_from if row.price_from is not None else float("inf")), row.id),
+        )
+    ]
+
+    relevant = _walk(index, q="shade 4", limit=250)
+    assert relevant[0]["shade_name"] == "Shade 4"
+    assert len({item["id"] for item in relevant}) == len(relevant)
+
+    priority = ["Greens", "Reds"]
+    featured = _walk(index, sort="featured", families=priority, limit=400)
+    assert [item["id"] for item in featured] == [
+        row.id for row in sorted(
+            rows,
+            key=lambda row: (
+                priority.index(row.shade_family) if row.shade_family in priority else len(priority),
+                not row.is_trending,
+                row.shade_name.lower(),
+                row.id,
+            ),
+        )
+    ]
@@ -0,0 +1,180 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+
+from app.database import SessionLocal
+from app.main import app
+from app.models import (
+    Dealer,
+    DealerOrder,
+    InventoryLevel,
+    Notification,
+    SKU,
+    SmartOrderRecommendation,
+    User,
+    Warehouse,
+)
+from app.schemas.ingestion import InventoryLevelIn
+from app.services.auth_service import create_access_token
+from app.services.forecast_service import get_forecast, get_forecast_demand
+from app.services.ingestion_service import ingest_inventory_levels
+from app.services.smart_order_service import MAX_RECOMMENDATIONS, compute_smart_orders, get_smart_orders
+from tests.test_dealer_dashboard import _count_queries
+
+
+client = TestClient(app)
+
+
+def _stored_matches_engine(db, dealer_id: int) -> list[dict]:
+    stored = get_smart_orders(db, dealer_id)
+    computed = compute_smart_orders(db, [dealer_id]).get(dealer_id, [])
+    assert [(rec["sku_id"], rec["recommended_qty"], rec["urgency"]) for rec in stored] == [
+        (rec["sku_id"], rec["recommended_qty"], rec["urgency"]) for rec in computed
+    ]
+    return stored
+
+
+def test_batched_forecast_demand_matches_per_pair_forecasts():
+    db = SessionLocal()
+    try:
+        sku_ids = [sku_id for (sku_id,) in db.query(SKU.id).order_by(SKU.id).limit(25)]
+        region_ids = sorted({region_id for (region_id,) in db.query(Warehouse.region_id)})
+    finally:
+        db.close()
+    pairs = [(sku_id, region_id) for sku_id in sku_ids for region_id in region_ids]
+    for horizon in (7, 30):
+        totals = get_forecast_demand(pairs, horizon=horizon)
+        assert totals == {
+            pair: sum(day["predicted"] for day in get_forecast(*pair, horizon=horizon)["forecast"])
+            for pair in pairs
+        }
+
+
+def test_stored_recommendations_match_engine_and_read_in_one_query():
+    db = SessionLocal()
+    try:
+        dealer_ids = [dealer_id for (dealer_id,) in db.query(Dealer.id).order_by(Dealer.id)]
+        batch = compute_smart_orders(db)
+        for dealer_id in dealer_ids:
+            with _count_queries() as statements:
+                stored = get_smart_orders(db, dealer_id)
+            assert len(statements) == 1
+            assert len(stored) <= MAX_RECOMMENDATIONS
+            assert [rec["sku_id"] for rec in stored] == [rec["sku_id"] for rec in batch.get(dealer_id, [])]
+    finally:
+        db.close()
+
+
+def test_ingestion_rebuilds_stored_recommendations():
+    db = SessionLocal()
+    try:
+        dealer = db.query(Dealer).order_by(Dealer.id).first()
+        warehouse = db.get(Warehouse, dealer.warehouse_id)
+        level, sku_code = (
+            db.query(InventoryLevel, SKU.sku_code)
+            .join(SKU, SKU.id == InventoryLevel.sku_id)
+            .filter(InventoryLevel.warehouse_id == warehouse.id, InventoryLevel.days_of_cover >= 30)
+            .order_by(InventoryLevel.id)
+            .first()
+        )
+        original = {"current_stock": level.current_stock, "days_of_cover": level.days_of_cover}
+
+        def ingest(current_stock: int, days_of_cover: float):
+            row = InventoryLevelIn(
+                warehouse_code=warehouse.code,
+                sku_code=sku_code,
+                current_stock=current_stock,
+                days_of_cover=days_of_cover,
+            )
+            ingest_inventory_levels(db, [row], dry_run=False)
+
+        other = db.query(Dealer.id).filter(Dealer.warehouse_id != warehouse.id).order_by(Dealer.id).first()[0]
+
+        def generated_at(dealer_id: int):
+            db.expire_all()
+            return db.query(func.max(SmartOrderRecommendation.generated_at)).filter(
+                SmartOrderRecommendation.dealer_id == dealer_id
+            ).scalar()
+
+        other_generated = generated_at(other)
+        try:
+            ingest(0, 0.0)
+            stored = _stored_matches_engine(db, dealer.id)
+            assert stored[0]["sku_code"] == sku_code
+            assert stored[0]["urgency"] == "CRITICAL"
+            # Only dealers at the ingested warehouse are rebuilt.
+            assert generated_at(other) == other_generated
+        finally:
+            ingest(**original)
+        assert sku_code not in {rec["sku_code"] for rec in _stored_matches_engine(db, dealer.id)}
+    finally:
+        db.close()
+
+
+def test_bundle_places_the_recommendations_shown_to_the_dealer():
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.role == "dealer", User.is_active.is_(True)).order_by(User.id).first()
+        headers = {"Authorization": f"Bearer {create_access_token(user.id, user.role)}"}
+        shown = client.get("/api/dealer/me/smart-orders", headers=headers).json()
+        expected = sorted(
+            (rec["sku_id"], rec["recommended_qty"]) for rec in shown if rec["urgency"] in ("CRITICAL", "RECOMMENDED")
+        )
+        last_order_id = db.query(DealerOrder.id).order_by(DealerOrder.id.desc()).limit(1).scalar()
+
+        response = client.post("/api/dealer/me/orders/bundle", headers=headers)
+        placed = (
+            db.query(DealerOrder)
+            .filter(DealerOrder.dealer_id == user.dealer_id, DealerOrder.id > last_order_id)
+            .all()
+        )
+        try:
+            assert response.status_code == 200
+            assert response.json()["orders_placed"] == len(expected)
+            assert sorted((order.sku_id, order.quantity) for order in placed) == expected
+        finally:
+            # ORM deletes, so the dealer health scores are refreshed on commit as well.
+            for order in placed:
+                db.delete(order)
+            db.query(Notification).filter(Notification.title == "Dealer Accepted AI Bundle").delete()
+            db.commit()
+    finally:
+        db.close()
+
+
+def test_bulk_order_places_every_line_in_constant_queries():
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.role == "dealer", User.is_active.is_(True)).order_by(User.id).first()
+        headers = {"Authorization": f"Bearer {create_access_token(user.id, user.role)}"}
+        sku_ids = [sku_id for (sku_id,) in db.query(SKU.id).order_by(SKU.id).limit(200)]
+        lines = [{"sku_id": sku_id, "quantity": idx % 7 + 1} for idx, sku_id in enumerate(sku_ids)]
+
+        orders_before = db.query(DealerOrder).filter(DealerOrder.dealer_id == user.dealer_id).count()
+        missing = client.post(
+            "/api/dealer/me/orders/bulk", headers=headers, json={"lines": [*lines[:2], {"sku_id": 10**9, "quantity": 1}]}
+        )
+        assert missing.status_code == 404
+        assert db.query(DealerOrder).filter(DealerOrder.dealer_id == user.dealer_id).count() == orders_before
+
+        small = client.post("/api/dealer/me/orders/bulk", headers=headers, json={"lines": lines[:2]})
+        large = client.post("/api/dealer/me/orders/bulk", headers=headers, json={"lines": lines})
+        order_ids = [*small.json()["order_ids"], *large.json()["order_ids"]]
+        try:
+            assert small.status_code == large.status_code == 200
+            assert large.headers["x-db-queries"] == small.headers["x-db-queries"]
+            placed = db.query(DealerOrder).filter(DealerOrder.id.in_(large.json()["order_ids"])).all()
+            assert sorted((order.sku_id, order.quantity) for order in placed) == sorted(
+                (line["sku_id"], line["quantity"]) for line in lines
+            )
+            assert large.json()["total_units"] == sum(line["quantity"] for line in lines)
+            assert db.query(Notification).filter(
+                Notification.title == "Dealer Bulk Order Placed",
+                Notification.message.contains(f"placed {len(lines)} orders"),
+            ).count() == db.query(User).filter(User.role == "admin", User.is_active.is_(True)).count()
+        finally:
+            for order in db.query(DealerOrder).filter(DealerOrder.id.in_(order_ids)):
+                db.delete(order)
+            db.query(Notification).filter(Notification.title == "Dealer Bulk Order Placed").delete()
+            db.commit()
+    finally:
+        db.close()
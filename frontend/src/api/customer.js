@@ -27,6 +27,8 @@ export const updateCartItem = (cartId, quantityOrPayload) => {
 }
 export const removeCartItem = (cartId) =>
   api.delete(`/customer/me/cart/${cartId}`)
+// Replace the whole cart: items is [{ sku_id, quantity }]
+export const setCart = (items) => api.put('/customer/me/cart', { items })
 
 export const fetchWishlist = () => api.get('/customer/me/wishlist')
 export const addToWishlist = (shadeId) =>
@@ -40,6 +42,9 @@ export const checkoutCart = (dealerIdOrPayload) => {
     : { dealer_id: dealerIdOrPayload }
   return api.post('/customer/me/checkout', payload)
 }
-export const fetchMyOrders = () => api.get('/customer/me/orders')
+// Nearby dealers flagged by whether they can fill the cart, plus the nearest one that can
+export const fetchCheckoutDealers = (lat, lng) =>
+  api.get('/customer/me/checkout/dealers', { params: { lat, lng } })
+export const fetchMyOrders = (params) => api.get('/customer/me/orders', { params })
 export const fetchMyOrderDetail = (orderId) =>
   api.get(`/customer/me/orders/${orderId}`)
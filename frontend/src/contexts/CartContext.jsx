@@ -43,10 +43,19 @@ export function CartProvider({ children }) {
     }
   }
 
+  // Send the whole cart in one call; the response is the updated cart.
+  const syncCart = async (items) => {
+    const res = await customerApi.setCart(
+      items.map(item => ({ sku_id: item.sku_id, quantity: item.quantity }))
+    )
+    setCart(res.data || { items: [], total: 0, count: 0 })
+  }
+
   const updateQuantity = async (cartId, quantity) => {
     try {
-      await customerApi.updateCartItem(cartId, { quantity })
-      await refreshCart()
+      await syncCart(cartItems.map(item => (
+        item.cart_id === cartId ? { ...item, quantity } : item
+      )))
     } catch (err) {
       toast.error('Failed to update quantity')
     }
@@ -54,9 +63,8 @@ export function CartProvider({ children }) {
 
   const removeItem = async (cartId) => {
     try {
-      await customerApi.removeCartItem(cartId)
+      await syncCart(cartItems.filter(item => item.cart_id !== cartId))
       toast.success('Removed from cart')
-      await refreshCart()
     } catch (err) {
       toast.error('Failed to remove item')
     }
@@ -83,6 +91,7 @@ export function CartProvider({ children }) {
       addToCart,
       updateQuantity,
       removeItem,
+      syncCart,
       checkout,
       refreshCart,
       loading,
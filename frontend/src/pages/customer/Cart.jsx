@@ -2,13 +2,8 @@ import { useState, useEffect } from 'react'
 import { useNavigate, Link } from 'react-router-dom'
 import LoadingSpinner from '../../components/common/LoadingSpinner'
 import { useToast } from '../../contexts/ToastContext'
-import {
-  fetchCart,
-  updateCartItem,
-  removeCartItem,
-  fetchNearbyDealers,
-  checkoutCart,
-} from '../../api/customer'
+import { useCart } from '../../contexts/CartContext'
+import { fetchCheckoutDealers } from '../../api/customer'
 import { formatCurrency } from '../../utils/formatters'
 import {
   TrashIcon,
@@ -21,37 +16,35 @@ import { getBrowserLocation, readUserLocation } from '../../utils/location'
 export default function Cart() {
   const navigate = useNavigate()
   const toast = useToast()
+  const { cart, loading, refreshCart, updateQuantity, removeItem, checkout } = useCart()
 
-  const [cart, setCart] = useState(null)
-  const [loading, setLoading] = useState(true)
   const [dealers, setDealers] = useState([])
+  const [suggestedDealer, setSuggestedDealer] = useState(null)
   const [selectedDealerId, setSelectedDealerId] = useState('')
   const [checkingOut, setCheckingOut] = useState(false)
   const [locationMessage, setLocationMessage] = useState('')
 
-  useEffect(() => {
-    loadCart()
-    loadNearbyDealers()
-  }, [])
-
-  function loadCart() {
-    setLoading(true)
-    fetchCart()
-      .then(r => setCart(r.data))
-      .catch(err => console.error('Failed to load cart:', err))
-      .finally(() => setLoading(false))
-  }
+  // Which dealers can fill the cart depends on what is in it.
+  const cartKey = (cart?.items || []).map(item => `${item.sku_id}:${item.quantity}`).join(',')
+
+  useEffect(() => { refreshCart() }, [refreshCart])
+  useEffect(() => { loadNearbyDealers() }, [cartKey])
 
   async function loadNearbyDealers() {
     try {
       let coords = readUserLocation()
       if (!coords) coords = await getBrowserLocation()
-      const res = await fetchNearbyDealers(coords.lat, coords.lng)
-      setDealers(res.data || [])
+      const res = await fetchCheckoutDealers(coords.lat, coords.lng)
+      const suggested = res.data?.suggested_dealer || null
+      const nearby = res.data?.dealers || []
+      setDealers(suggested && !nearby.some(d => d.id === suggested.id) ? [suggested, ...nearby] : nearby)
+      setSuggestedDealer(suggested)
+      setSelectedDealerId(prev => prev || (suggested ? String(suggested.id) : ''))
       setLocationMessage('')
     } catch (err) {
       console.error('Failed to load dealers:', err)
       setDealers([])
+      setSuggestedDealer(null)
       setLocationMessage('Enable location access to load nearby dealers.')
     }
   }
@@ -59,22 +52,11 @@ export default function Cart() {
   async function handleUpdateQuantity(cartId, currentQty, delta) {
     const newQty = currentQty + delta
     if (newQty < 1) return
-    try {
-      await updateCartItem(cartId, newQty)
-      loadCart()
-    } catch (err) {
-      toast.error('Failed to update quantity')
-    }
+    await updateQuantity(cartId, newQty)
   }
 
   async function handleRemoveItem(cartId) {
-    try {
-      await removeCartItem(cartId)
-      toast.success('Item removed from cart')
-      loadCart()
-    } catch (err) {
-      toast.error('Failed to remove item')
-    }
+    await removeItem(cartId)
   }
 
   async function handleCheckout() {
@@ -84,11 +66,10 @@ export default function Cart() {
     }
     setCheckingOut(true)
     try {
-      await checkoutCart(selectedDealerId)
-      toast.success('Order placed successfully!')
+      await checkout(Number(selectedDealerId))
       navigate('/customer/orders')
     } catch (err) {
-      toast.error(err.response?.data?.detail || 'Checkout failed. Please try again.')
+      // checkout() has already shown the error
     } finally {
       setCheckingOut(false)
     }
@@ -191,6 +172,11 @@ export default function Cart() {
       <div className="bg-white rounded-xl shadow-sm border border-gray-200 p-6 space-y-4">
         <h2 className="text-lg font-semibold text-gray-900">Checkout</h2>
         <p className="text-sm text-gray-500">Select a nearby dealer to fulfill your order.</p>
+        {suggestedDealer ? (
+          <p className="text-xs text-green-700">
+            Nearest dealer with your whole cart in stock: {suggestedDealer.name} ({suggestedDealer.distance_km} km)
+          </p>
+        ) : null}
         {locationMessage ? (
           <div className="flex items-center justify-between gap-3 rounded-lg border border-orange-200 bg-orange-50 px-3 py-2">
             <p className="text-xs text-orange-700">{locationMessage}</p>
@@ -212,7 +198,7 @@ export default function Cart() {
           <option value="">Choose a dealer...</option>
           {dealers.map(d => (
             <option key={d.id} value={d.id}>
-              {d.name} &mdash; {d.city}
+              {d.name} &mdash; {d.city}{d.can_fill_cart ? '' : ' (limited stock)'}
             </option>
           ))}
         </select>
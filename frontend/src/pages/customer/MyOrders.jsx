@@ -8,15 +8,31 @@ import { Link } from 'react-router-dom'
 
 export default function MyOrders() {
   const [orders, setOrders] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
 
   useEffect(() => {
     fetchMyOrders()
-      .then(r => setOrders(r.data))
+      .then(r => {
+        setOrders(r.data.orders)
+        setNextCursor(r.data.next_cursor)
+      })
       .catch(err => console.error('Orders load failed:', err))
       .finally(() => setLoading(false))
   }, [])
 
+  const loadMore = () => {
+    setLoadingMore(true)
+    fetchMyOrders({ cursor: nextCursor })
+      .then(r => {
+        setOrders(prev => [...prev, ...r.data.orders])
+        setNextCursor(r.data.next_cursor)
+      })
+      .catch(err => console.error('Orders load failed:', err))
+      .finally(() => setLoadingMore(false))
+  }
+
   if (loading) return <LoadingSpinner text="Loading your orders..." />
 
   return (
@@ -91,6 +107,15 @@ export default function MyOrders() {
               )}
             </div>
           ))}
+          {nextCursor && (
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="w-full py-2 text-sm font-medium text-orange-600 hover:text-orange-700 disabled:opacity-50"
+            >
+              {loadingMore ? 'Loading...' : 'Load more orders'}
+            </button>
+          )}
         </div>
       )}
     </div>
@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react'
-import { FireIcon, SparklesIcon, ShieldCheckIcon, SunIcon } from '@heroicons/react/24/outline'
+import { FireIcon, MagnifyingGlassIcon, SparklesIcon, ShieldCheckIcon, SunIcon } from '@heroicons/react/24/outline'
 import ShadeSwatchGrid from '../../components/paint/ShadeSwatchGrid'
 import LoadingSpinner from '../../components/common/LoadingSpinner'
 import { fetchShades } from '../../api/customer'
@@ -8,6 +8,12 @@ import { getScenarioVisuals } from '../../utils/scenarioEffects'
 
 const families = ['All', 'Reds', 'Blues', 'Greens', 'Yellows', 'Neutrals', 'Whites']
 const categories = ['All', 'Interior Wall', 'Exterior Wall', 'Wood & Metal', 'Waterproofing']
+const sortOptions = [
+  { value: '', label: 'Featured' },
+  { value: 'name', label: 'Name' },
+  { value: 'price_asc', label: 'Price: low to high' },
+  { value: 'price_desc', label: 'Price: high to low' },
+]
 const familyPriorityByScenario = {
   TRUCK_STRIKE: ['Reds', 'Neutrals', 'Whites'],
   HEATWAVE: ['Whites', 'Yellows', 'Neutrals'],
@@ -16,7 +22,13 @@ const familyPriorityByScenario = {
 
 export default function ShadeCatalog() {
   const [shades, setShades] = useState([])
+  const [total, setTotal] = useState(0)
+  const [nextCursor, setNextCursor] = useState(null)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
+  const [search, setSearch] = useState('')
+  const [query, setQuery] = useState('')
+  const [sort, setSort] = useState('')
   const [family, setFamily] = useState('All')
   const [category, setCategory] = useState('All')
   const [trending, setTrending] = useState(false)
@@ -24,17 +36,45 @@ export default function ShadeCatalog() {
   const visuals = getScenarioVisuals(scenario)
 
   useEffect(() => {
-    setLoading(true)
-    const params = {}
-    if (family !== 'All') params.family = family
-    if (category !== 'All') params.category = category
-    if (trending) params.trending = true
+    const timer = setTimeout(() => setQuery(search.trim()), 250)
+    return () => clearTimeout(timer)
+  }, [search])
+
+  const priorityFamilies = familyPriorityByScenario[scenario] || []
+  const params = {}
+  if (family !== 'All') params.family = family
+  if (category !== 'All') params.category = category
+  if (trending) params.trending = true
+  if (query) params.q = query
+  if (sort) params.sort = sort
+  // Featured ranks the scenario's priority families across the whole catalog, server-side.
+  if (!query && !sort) {
+    params.sort = 'featured'
+    if (priorityFamilies.length) params.families = priorityFamilies.join(',')
+  }
 
+  useEffect(() => {
+    setLoading(true)
     fetchShades(params)
-      .then(r => setShades(r.data))
+      .then(r => {
+        setShades(r.data.items)
+        setTotal(r.data.total)
+        setNextCursor(r.data.next_cursor)
+      })
       .catch(err => console.error('Shades load failed:', err))
       .finally(() => setLoading(false))
-  }, [family, category, trending])
+  }, [family, category, trending, query, sort, scenario])
+
+  const loadMore = () => {
+    setLoadingMore(true)
+    fetchShades({ ...params, cursor: nextCursor })
+      .then(r => {
+        setShades(prev => [...prev, ...r.data.items])
+        setNextCursor(r.data.next_cursor)
+      })
+      .catch(err => console.error('Shades load failed:', err))
+      .finally(() => setLoadingMore(false))
+  }
 
   const quickFilters = [
     {
@@ -65,15 +105,6 @@ export default function ShadeCatalog() {
       className: 'from-emerald-500/35 via-teal-500/25 to-emerald-100/30 border-emerald-300/50',
     },
   ]
-  const priorityFamilies = familyPriorityByScenario[scenario] || []
-  const displayedShades = [...shades].sort((a, b) => {
-    const aRank = priorityFamilies.includes(a.shade_family) ? priorityFamilies.indexOf(a.shade_family) : 99
-    const bRank = priorityFamilies.includes(b.shade_family) ? priorityFamilies.indexOf(b.shade_family) : 99
-    if (aRank !== bRank) return aRank - bRank
-    if (a.is_trending !== b.is_trending) return a.is_trending ? -1 : 1
-    return a.shade_name.localeCompare(b.shade_name)
-  })
-
   return (
     <div className="space-y-6">
       <div className={`paint-banner relative isolate overflow-hidden rounded-3xl border border-orange-300/60 p-6 bg-gradient-to-r ${visuals.bannerClass.replaceAll('/50', '/20')}`}>
@@ -123,6 +154,17 @@ export default function ShadeCatalog() {
 
       {/* Filters */}
       <div className="paint-panel flex flex-wrap gap-3 items-center" style={{ animationDelay: '240ms' }}>
+        <div className="relative flex-1 min-w-[200px]">
+          <MagnifyingGlassIcon className="w-4 h-4 text-gray-400 absolute left-3 top-1/2 -translate-y-1/2" />
+          <input
+            type="search"
+            value={search}
+            onChange={e => setSearch(e.target.value)}
+            placeholder="Search shades by name or code"
+            className="w-full bg-white border border-gray-200 text-gray-700 text-sm rounded-lg pl-9 pr-3 py-1.5 outline-none"
+          />
+        </div>
+
         <div className="flex gap-1">
           {families.map(f => (
             <button
@@ -158,6 +200,16 @@ export default function ShadeCatalog() {
           />
           Trending Only
         </label>
+
+        <select
+          value={sort}
+          onChange={e => setSort(e.target.value)}
+          className="bg-white border border-gray-200 text-gray-700 text-sm rounded-lg px-3 py-1.5 outline-none"
+        >
+          {sortOptions.map(o => (
+            <option key={o.value} value={o.value}>{query && !o.value ? 'Best match' : o.label}</option>
+          ))}
+        </select>
       </div>
 
       {loading ? (
@@ -165,14 +217,23 @@ export default function ShadeCatalog() {
       ) : (
         <>
           <div className="paint-panel flex items-center justify-between" style={{ animationDelay: '280ms' }}>
-            <p className="text-sm text-gray-500">{displayedShades.length} shades found</p>
-            {scenario !== 'NORMAL' ? (
+            <p className="text-sm text-gray-500">{total} shades found</p>
+            {scenario !== 'NORMAL' && !query && !sort ? (
               <span className="text-xs px-2 py-1 rounded-full bg-orange-100 text-orange-700 border border-orange-200">
                 Scenario-prioritized ranking
               </span>
             ) : null}
           </div>
-          <ShadeSwatchGrid shades={displayedShades} />
+          <ShadeSwatchGrid shades={shades} />
+          {nextCursor && (
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="w-full py-2 text-sm font-medium text-orange-600 hover:text-orange-700 disabled:opacity-50"
+            >
+              {loadingMore ? 'Loading...' : 'Load more shades'}
+            </button>
+          )}
         </>
       )}
     </div>